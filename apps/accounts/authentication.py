@@ -0,0 +1,132 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .tokens import USER_VERSION_CLAIM, user_version
+
+CACHE_ALIAS = "auth"
+PROFILES = ("patient_profile", "doctor_profile")
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached user so the next request reloads it.
+    """
+    caches[CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def _fields(instance, exclude=()):
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in exclude
+    }
+
+
+def _restore(model, fields):
+    names = [field.attname for field in model._meta.concrete_fields]
+    return model.from_db(None, names, [fields.get(name, DEFERRED) for name in names])
+
+
+def _dump(user):
+    """
+    Return what the cache keeps of ``user``: their version, their fields
+    but the password hash, and those of their profiles.
+    """
+    entry = {
+        "version": user_version(user),
+        "user": _fields(user, exclude=("password",)),
+    }
+    if api_settings.CHECK_REVOKE_TOKEN:
+        entry["password_hash"] = get_md5_hash_password(user.password)
+    for name in PROFILES:
+        profile = getattr(user, name, None)
+        entry[name] = None if profile is None else _fields(profile)
+    return entry
+
+
+def _load(user_model, entry):
+    """
+    Rebuild a user from a cache entry. The password is left deferred, so
+    reading it queries the database and saving the user never writes it.
+    """
+    user = _restore(user_model, entry["user"])
+    for name in PROFILES:
+        relation = user_model._meta.get_field(name)
+        profile = entry[name]
+        if profile is not None:
+            profile = _restore(relation.related_model, profile)
+            relation.remote_field.set_cached_value(profile, user)
+        relation.set_cached_value(user, profile)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user from a cache.
+
+    The user is cached together with their patient or doctor profile, so the
+    role and profile checks in ``apps.accounts.permissions`` run without
+    touching the database. The password hash is never cached. Cached
+    entries are dropped whenever the user or one of their profiles is saved
+    or deleted.
+
+    Entries also record the user's version, which tokens carry in their
+    ``user_version`` claim. A token of another version reloads the user,
+    and is rejected if it still does not match, so a changed password or
+    active flag shows up without ``invalidate_user`` being called: at once
+    for new tokens, and once the entry expires for old ones. Tokens without
+    the claim skip the check.
+    """
+
+    def get_user(self, validated_token):
+        """
+        Return the token's user from the cache, loading it on a miss.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = validated_token.get(USER_VERSION_CLAIM)
+        cache = caches[CACHE_ALIAS]
+        entry = cache.get(user_cache_key(user_id))
+        if entry is None or version not in (None, entry.get("version")):
+            try:
+                user = self.user_model.objects.select_related(*PROFILES).get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = _dump(user)
+            cache.set(
+                user_cache_key(user_id), entry, timeout=settings.AUTH_USER_CACHE_TIMEOUT
+            )
+        user = _load(self.user_model, entry)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if version is not None and version != entry["version"]:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry.get(
+                "password_hash"
+            ):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:51
+
+import apps.core.identifiers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="doctorprofile",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="patientprofile",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
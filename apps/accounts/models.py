@@ -1,11 +1,11 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.core.models import BaseModel
 
 from . import managers
+from .tokens import VersionedRefreshToken
 
 
 class Role(models.TextChoices):
@@ -59,7 +59,7 @@ class User(AbstractBaseUser, BaseModel, PermissionsMixin):
 
     @property
     def tokens(self):
-        refresh_token = RefreshToken.for_user(self)
+        refresh_token = VersionedRefreshToken.for_user(self)
         return {
             "refresh": str(refresh_token),
             "access": str(refresh_token.access_token),
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from . import models
+from .tokens import VersionedRefreshToken
 
 
 class PatientSerializer(serializers.ModelSerializer):
@@ -60,6 +61,7 @@ class UserSerializer(serializers.ModelSerializer):
             "role",
             "profile",
         ]
+        select_related = ["patient_profile", "doctor_profile"]
 
     def get_profile(self, obj):
         """
@@ -78,6 +80,8 @@ class LoginSerializer(TokenObtainPairSerializer):
     Extends the default TokenObtainPairSerializer to include full user
     information in the response.
     """
+
+    token_class = VersionedRefreshToken
     
     def validate(self, data):
         """
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_user
+from .models import DoctorProfile, PatientProfile
+
+
+def _invalidate(user_id):
+    # Drop the entry now for reads later in this transaction, and again on
+    # commit in case another request cached the old row in between.
+    invalidate_user(user_id)
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop the cached authentication user when the user changes.
+    """
+    _invalidate(instance.pk)
+
+
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_delete, sender=PatientProfile)
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+def invalidate_cached_profile_user(sender, instance, **kwargs):
+    """
+    Drop the cached authentication user when their profile changes.
+    """
+    _invalidate(instance.user_id)
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from apps.accounts.authentication import (
+    CACHE_ALIAS,
+    CachedJWTAuthentication,
+    invalidate_user,
+    user_cache_key,
+)
+from apps.accounts.models import PatientProfile
+from apps.accounts.permissions import IsPatient, IsProfileSet
+from apps.accounts.tokens import VersionedRefreshToken
+
+
+def authenticate(user, token=None):
+    token = token or VersionedRefreshToken.for_user(user).access_token
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    return CachedJWTAuthentication().authenticate(request)[0]
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def test_cached_user_costs_no_queries(
+        self, patient_user, patient_profile, django_assert_num_queries
+    ):
+        invalidate_user(patient_user.pk)
+        with django_assert_num_queries(1):
+            authenticate(patient_user)
+
+        with django_assert_num_queries(0):
+            user = authenticate(patient_user)
+            request = SimpleNamespace(user=user)
+            assert IsPatient().has_permission(request, None)
+            assert IsProfileSet().has_permission(request, None)
+        assert user == patient_user
+
+    def test_profile_change_invalidates_cache(self, patient_user):
+        assert authenticate(patient_user).profile is None
+
+        PatientProfile.objects.create(user=patient_user)
+        assert authenticate(patient_user).profile is not None
+
+    def test_deactivated_user_is_rejected(self, patient_user):
+        authenticate(patient_user)
+
+        patient_user.is_active = False
+        patient_user.save()
+        with pytest.raises(AuthenticationFailed):
+            authenticate(patient_user)
+
+    def test_password_hash_is_not_cached(self, patient_user):
+        authenticate(patient_user)
+        entry = caches[CACHE_ALIAS].get(user_cache_key(patient_user.pk))
+        assert "password" not in entry["user"]
+        assert patient_user.password not in str(entry)
+
+        user = authenticate(patient_user)
+        user.first_name = "Renamed"
+        user.save()
+        patient_user.refresh_from_db()
+        assert patient_user.first_name == "Renamed"
+        assert patient_user.check_password("testpass123")
+
+    def test_unsignalled_password_change_revokes_old_tokens(self, patient_user):
+        old_token = VersionedRefreshToken.for_user(patient_user).access_token
+        authenticate(patient_user, old_token)
+
+        # QuerySet.update() sends no signal, so the cached entry stays.
+        get_user_model().objects.filter(pk=patient_user.pk).update(
+            password=make_password("newpass123")
+        )
+        patient_user.refresh_from_db()
+        authenticate(patient_user, old_token)
+
+        # A token issued since sees the new state at once ...
+        authenticate(patient_user)
+        # ... which the old token no longer matches.
+        with pytest.raises(AuthenticationFailed):
+            authenticate(patient_user, old_token)
+
+    def test_expired_entry_rejects_old_tokens(self, patient_user):
+        old_token = VersionedRefreshToken.for_user(patient_user).access_token
+        authenticate(patient_user, old_token)
+
+        get_user_model().objects.filter(pk=patient_user.pk).update(
+            password=make_password("newpass123")
+        )
+        caches[CACHE_ALIAS].delete(user_cache_key(patient_user.pk))
+        with pytest.raises(AuthenticationFailed):
+            authenticate(patient_user, old_token)
+
+
+def test_schema_documents_bearer_auth():
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    assert "jwtAuth" in schema["components"]["securitySchemes"]
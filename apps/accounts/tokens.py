@@ -0,0 +1,27 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_VERSION_CLAIM = "user_version"
+
+
+def user_version(user):
+    """
+    Return a digest of the user state tokens are issued for: the password
+    hash and whether the user is active. Changing either, by any means,
+    changes the version.
+    """
+    return get_md5_hash_password(f"{user.password}:{user.is_active}")
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's version. Access tokens made from it
+    copy the claim, so ``CachedJWTAuthentication`` can tell a cache entry
+    or a token from an older state of the user.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[USER_VERSION_CLAIM] = user_version(user)
+        return token
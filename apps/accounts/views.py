@@ -3,6 +3,8 @@ from drf_spectacular.utils import extend_schema
 from rest_framework import generics, permissions
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from apps.core.mixins import QueryPlanMixin
+
 from . import permissions as account_permissions
 from . import serializers
 
@@ -87,7 +89,7 @@ class ProfileUpdateView(generics.UpdateAPIView):
 
 
 @extend_schema(tags=["Accounts"])
-class DoctorListView(generics.ListAPIView):
+class DoctorListView(QueryPlanMixin, generics.ListAPIView):
     """
     List all doctors with completed profiles.
     
@@ -103,8 +105,6 @@ class DoctorListView(generics.ListAPIView):
         """
         Return all doctors with completed profiles.
         """
-        return (
-            get_user_model()
-            .objects.filter(role="doctor", doctor_profile__isnull=False)
-            .select_related("doctor_profile")
+        return get_user_model().objects.filter(
+            role="doctor", doctor_profile__isnull=False
         )
\ No newline at end of file
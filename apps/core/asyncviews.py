@@ -0,0 +1,118 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+
+def variant(sync_view, async_view):
+    """
+    Return ``async_view`` when ``ASYNC_VIEWS`` is set, else ``sync_view``.
+    """
+    return async_view if settings.ASYNC_VIEWS else sync_view
+
+
+class AsyncAPIViewMixin:
+    """
+    Dispatch a DRF view as a coroutine.
+
+    Handlers written with ``async def`` are awaited on the event loop, so
+    under ASGI a request waiting on the database does not hold a worker
+    thread. The view's other handlers, such as writes and ``OPTIONS``,
+    keep their synchronous code and run in a thread, as Django runs any
+    synchronous view under ASGI. Authentication, permission and throttle
+    checks may read the cache and the database, so they run in a thread
+    too.
+    """
+
+    view_is_async = True
+
+    def dispatch(self, request, *args, **kwargs):
+        return self.adispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        ``APIView.dispatch`` for async handlers.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListModelMixin(AsyncAPIViewMixin):
+    """
+    List a queryset, reading the page through the async ORM.
+
+    Serializers must not query on their own; views pair this with
+    ``QueryPlanMixin`` so every relation is loaded with the page.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(
+            [instance async for instance in queryset], many=True
+        )
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        """
+        Return a page of results, or ``None`` if pagination is disabled.
+
+        Paginators without ``apaginate_queryset`` run in a thread.
+        """
+        if self.paginator is None:
+            return None
+        apaginate = getattr(self.paginator, "apaginate_queryset", None)
+        if apaginate is None:
+            apaginate = sync_to_async(self.paginator.paginate_queryset)
+        return await apaginate(queryset, self.request, view=self)
+
+
+class AsyncRetrieveModelMixin(AsyncAPIViewMixin):
+    """
+    Retrieve an object through the async ORM.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        """
+        ``GenericAPIView.get_object`` through the async ORM.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Warn when the caches holding collection versions and cached users are
+    local to each process. Versions are kept without a timeout, so a worker
+    that missed a write keeps serving the old pages and ETags of it.
+    """
+    return [
+        Warning(
+            f"The {alias!r} cache is local to each process.",
+            hint=(
+                "Point CACHE_URL and AUTH_CACHE_URL at a shared cache such as "
+                "Redis when running more than one worker."
+            ),
+            id="core.W001",
+        )
+        for alias in ("default", "auth")
+        if settings.CACHES.get(alias, {}).get("BACKEND") == LOCMEM_BACKEND
+    ]
@@ -0,0 +1,187 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import db
+
+VERSION_PREFIX = "collection:"
+PAGE_PREFIX = "page:"
+VERSION_AGGREGATE = {"last_modified": Max("updated_at"), "count": Count("pk")}
+
+
+def _version_key(scope, owner_id):
+    return f"{VERSION_PREFIX}{scope}:{owner_id}"
+
+
+def _derive_version(aggregate):
+    last_modified = aggregate["last_modified"] or timezone.now()
+    return f"{last_modified.timestamp()}:{aggregate['count']}", last_modified
+
+
+def collection_version(scope, owner_id, queryset):
+    """
+    Return the ``(token, last_modified)`` version of an owner's collection.
+
+    Writes replace the version through ``bump``. When nothing is cached yet
+    the version is derived from the newest ``updated_at`` and the row count
+    of ``queryset``, so it survives a cache flush without changing.
+    """
+    key = _version_key(scope, owner_id)
+    version = cache.get(key)
+    if version is None:
+        version = _derive_version(queryset.order_by().aggregate(**VERSION_AGGREGATE))
+        cache.set(key, version, timeout=None)
+    return version
+
+
+async def acollection_version(scope, owner_id, queryset):
+    """
+    Async version of ``collection_version``.
+    """
+    key = _version_key(scope, owner_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = _derive_version(
+            await queryset.order_by().aaggregate(**VERSION_AGGREGATE)
+        )
+        await cache.aset(key, version, timeout=None)
+    return version
+
+
+def _set_version(keys):
+    version = (uuid.uuid4().hex, timezone.now())
+    cache.set_many(dict.fromkeys(keys, version), timeout=None)
+
+
+def bump(scope, *owner_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Give the collections of ``owner_ids`` in ``scope`` a new version.
+
+    The version changes immediately and again when the transaction commits,
+    so a page rendered from uncommitted data in between is never served
+    under the final version. Bumps made in the same transaction share one
+    ``on_commit`` callback per savepoint.
+    """
+    keys = {_version_key(scope, owner_id) for owner_id in owner_ids}
+    if not keys:
+        return
+    _set_version(keys)
+
+    if transaction.get_connection(using).in_atomic_block:
+        db.commit_buffer("versions", set, _set_version, using=using).update(keys)
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``GET`` from the owner's collection version.
+
+    Each response carries an ``ETag`` and ``Last-Modified`` derived from the
+    version of ``version_scope`` for the requesting user. Requests whose
+    ``If-None-Match``/``If-Modified-Since`` still match get a 304 without
+    touching the serializer, and other reads are served from a page cache
+    keyed by that version, so a write anywhere in the collection retires
+    every cached page of it at once. ``If-None-Match: *`` only matches once
+    the page has been resolved, so a missing object is still a 404.
+    """
+
+    version_scope = None
+
+    def get_version_owner(self):
+        """
+        Return the id whose collection this view reads.
+        """
+        return self.request.user.pk
+
+    def get(self, request, *args, **kwargs):
+        token, last_modified = collection_version(
+            self.version_scope, self.get_version_owner(), self.get_queryset()
+        )
+        fingerprint = self._fingerprint(request, token)
+        if self._not_modified(request, quote_etag(fingerprint), last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = self._page_key(fingerprint)
+            data = cache.get(key)
+            if data is None:
+                response = super().get(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+            if self._matches_any(request):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return self._validated(response, fingerprint, last_modified)
+
+    def _fingerprint(self, request, token):
+        return hashlib.md5(
+            f"{token}:{request.build_absolute_uri()}".encode(), usedforsecurity=False
+        ).hexdigest()
+
+    def _page_key(self, fingerprint):
+        return f"{PAGE_PREFIX}{self.version_scope}:{self.get_version_owner()}:{fingerprint}"
+
+    def _validated(self, response, fingerprint, last_modified):
+        response["ETag"] = quote_etag(fingerprint)
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def _matches_any(self, request):
+        # ``*`` matches any current representation (RFC 9110, 13.1.2), so
+        # it is only checked once there is one.
+        return "*" in parse_etags(request.headers.get("If-None-Match", ""))
+
+    def _not_modified(self, request, etag, last_modified):
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            candidates = parse_etags(if_none_match)
+            return etag in {candidate.removeprefix("W/") for candidate in candidates}
+        if_modified_since = parse_http_date_safe(
+            request.headers.get("If-Modified-Since", "")
+        )
+        return (
+            if_modified_since is not None
+            and int(last_modified.timestamp()) <= if_modified_since
+        )
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    """
+    ``ConditionalGetMixin`` for views whose ``get`` is a coroutine.
+
+    The version and the page cache are read without blocking the event
+    loop, and ``get`` awaits the next ``get`` in the MRO, which must be
+    async too (see ``apps.core.asyncviews``).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        token, last_modified = await acollection_version(
+            self.version_scope, self.get_version_owner(), self.get_queryset()
+        )
+        fingerprint = self._fingerprint(request, token)
+        if self._not_modified(request, quote_etag(fingerprint), last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = self._page_key(fingerprint)
+            data = await cache.aget(key)
+            if data is None:
+                response = await super().get(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                await cache.aset(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+            if self._matches_any(request):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return self._validated(response, fingerprint, last_modified)
@@ -0,0 +1,41 @@
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models.functions import Greatest
+
+
+def adjust(model, owner_field, deltas, using=DEFAULT_DB_ALIAS):
+    """
+    Add ``deltas`` to the counter rows of ``model``.
+
+    ``deltas`` maps an owner id to ``{field: amount}``. Missing rows are
+    created first, then every change is applied with one ``UPDATE`` that
+    adds to the stored values in the database, so concurrent writers
+    never overwrite each other. Counters do not go below zero.
+    """
+    deltas = {
+        owner_id: {field: amount for field, amount in changes.items() if amount}
+        for owner_id, changes in deltas.items()
+        if owner_id is not None
+    }
+    deltas = {owner_id: changes for owner_id, changes in deltas.items() if changes}
+    if not deltas:
+        return
+
+    attname = model._meta.get_field(owner_field).attname
+    manager = model.objects.using(using)
+    manager.bulk_create(
+        [model(**{attname: owner_id}) for owner_id in deltas], ignore_conflicts=True
+    )
+
+    fields = {field for changes in deltas.values() for field in changes}
+    updates = {}
+    for field in fields:
+        whens = [
+            models.When(**{attname: owner_id}, then=models.Value(changes[field]))
+            for owner_id, changes in deltas.items()
+            if field in changes
+        ]
+        updates[field] = Greatest(
+            models.F(field) + models.Case(*whens, default=models.Value(0)),
+            models.Value(0),
+        )
+    manager.filter(**{f"{attname}__in": list(deltas)}).update(**updates)
@@ -0,0 +1,71 @@
+import os
+import threading
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_buffers = threading.local()
+
+
+def pool_stats(alias="default"):
+    """
+    Report connection pool usage for this worker process.
+
+    ``checkouts`` counts connections handed out, ``waits`` the requests that
+    had to queue for one and ``saturation`` the share of ``max_size``
+    currently checked out. Counters are cumulative since the pool opened.
+    """
+    connection = connections[alias]
+    pool = getattr(connection, "pool", None)
+    if pool is None:
+        return {
+            "pid": os.getpid(),
+            "pooled": False,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+        }
+
+    stats = pool.get_stats()
+    in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    return {
+        "pid": os.getpid(),
+        "pooled": True,
+        "min_size": stats.get("pool_min", pool.min_size),
+        "max_size": stats.get("pool_max", pool.max_size),
+        "size": stats.get("pool_size", 0),
+        "available": stats.get("pool_available", 0),
+        "in_use": in_use,
+        "saturation": round(in_use / pool.max_size, 2),
+        "checkouts": stats.get("requests_num", 0),
+        "waits": stats.get("requests_queued", 0),
+        "waiting": stats.get("requests_waiting", 0),
+        "wait_ms": stats.get("requests_wait_ms", 0),
+        "timeouts": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def commit_buffer(name, factory, flush, using=DEFAULT_DB_ALIAS):
+    """
+    Return the collection gathering ``name`` items to ``flush`` on commit.
+
+    Must be called inside an atomic block. Each savepoint gets its own
+    collection, made by ``factory`` and passed to ``flush`` by a single
+    ``on_commit`` callback, so items added inside a savepoint that is
+    rolled back are dropped with it. Collections belong to the transaction
+    that made them: Django starts a new list of commit hooks at every
+    commit and rollback, and a changed list starts new collections, even
+    when a decorated function reuses the same ``Atomic``.
+    """
+    connection = transaction.get_connection(using)
+    buffers = _buffers.__dict__.setdefault(using, {})
+    pending = buffers.get(name)
+    if pending is None or pending["hooks"] is not connection.run_on_commit:
+        pending = buffers[name] = {"hooks": connection.run_on_commit, "scopes": {}}
+
+    scope = tuple(connection.savepoint_ids)
+    items = pending["scopes"].get(scope)
+    if items is None:
+        items = pending["scopes"][scope] = factory()
+        transaction.on_commit(partial(flush, items), using=using)
+    return items
@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+import uuid
+from datetime import UTC, datetime
+
+_lock = threading.Lock()
+_last_sequence = 0
+
+
+def uuid7():
+    """
+    Return a time-ordered UUID (version 7, RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, followed by a
+    12-bit sequence that keeps ids generated in the same millisecond by this
+    process increasing, and 62 random bits. New rows therefore land at the
+    right-hand edge of the primary key index instead of at random pages.
+    """
+    global _last_sequence
+    with _lock:
+        sequence = max((time.time_ns() // 1_000_000) << 12, _last_sequence + 1)
+        _last_sequence = sequence
+
+    timestamp, counter = sequence >> 12, sequence & 0xFFF
+    random_bits = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(
+        int=(timestamp << 80)
+        | (0x7 << 76)
+        | (counter << 64)
+        | (0b10 << 62)
+        | random_bits
+    )
+
+
+def uuid7_time(value):
+    """
+    Return when the uuid7 ``value`` was generated, to the millisecond.
+    """
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=UTC)
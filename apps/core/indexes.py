@@ -0,0 +1,19 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class PortableGinIndex(GinIndex):
+    """
+    GIN index on PostgreSQL and a plain index on other databases.
+
+    Lets models declare PostgreSQL-specific indexes in ``Meta.indexes``
+    while SQLite test databases, which reject ``USING gin``, can still be
+    created and rebuilt from the same migrations.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return models.Index.create_sql(
+                self, model, schema_editor, using=using, **kwargs
+            )
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
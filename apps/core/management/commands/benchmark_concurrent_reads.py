@@ -0,0 +1,93 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.accounts.tokens import VersionedRefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure throughput and latency of read requests sent concurrently "
+        "to running servers, such as gunicorn (WSGI) and uvicorn (ASGI). "
+        "Requests are authenticated as an existing user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "servers",
+            nargs="+",
+            metavar="NAME=URL",
+            help="Servers to compare, e.g. wsgi=http://web:8000",
+        )
+        parser.add_argument("--email", required=True)
+        parser.add_argument("--path", default="/api/records/doctor/?cursor=")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+        parser.add_argument(
+            "--uncached",
+            action="store_true",
+            help="Vary the query string so pages are never served from cache.",
+        )
+
+    def handle(self, *args, servers, email, path, concurrency, **options):
+        token = VersionedRefreshToken.for_user(
+            User.objects.get(email=email)
+        ).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        self.stdout.write(
+            f"{'server':<10}{'clients':>8}{'req/s':>10}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'errors':>8}"
+        )
+        for server in servers:
+            name, _, base_url = server.partition("=")
+            for clients in concurrency:
+                elapsed, latencies, errors = self.run(
+                    f"{base_url.rstrip('/')}{path}", headers, clients, **options
+                )
+                if len(latencies) < 2:
+                    self.stdout.write(f"{name:<10}{clients:>8}{'failed':>10}")
+                    continue
+                quantiles = statistics.quantiles(latencies, n=20)
+                self.stdout.write(
+                    f"{name:<10}{clients:>8}{len(latencies) / elapsed:>10.0f}"
+                    f"{quantiles[9] * 1000:>10.1f}{quantiles[18] * 1000:>10.1f}"
+                    f"{errors:>8}"
+                )
+
+    def run(self, url, headers, clients, requests, uncached, **options):
+        separator = "&" if "?" in url else "?"
+        numbers = count()
+
+        def fetch(_):
+            target = url
+            if uncached:
+                target = f"{url}{separator}benchmark={next(numbers)}"
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(
+                    urllib.request.Request(target, headers=headers), timeout=60
+                ) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, TimeoutError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        # Warm up connections, caches and the servers' workers.
+        with ThreadPoolExecutor(clients) as pool:
+            list(pool.map(fetch, range(clients)))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            results = list(pool.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - started
+        latencies = [latency for latency, ok in results if ok]
+        return elapsed, latencies, len(results) - len(latencies)
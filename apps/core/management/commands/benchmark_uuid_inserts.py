@@ -0,0 +1,69 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.core.identifiers import uuid7
+
+GENERATORS = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert throughput and primary key index size of random "
+        "(v4) and time-ordered (v7) UUID keys in scratch tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, rows, batch_size, **options):
+        self.stdout.write(
+            f"{'key':<8}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'index':>14}"
+        )
+        for name, generate in GENERATORS.items():
+            table = f"benchmark_{name}_inserts"
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(
+                    f"CREATE TABLE {table} (id {self.uuid_type()} PRIMARY KEY, payload text)"
+                )
+                try:
+                    elapsed = self.insert(cursor, table, generate, rows, batch_size)
+                    index_size = self.index_size(cursor, table)
+                finally:
+                    cursor.execute(f"DROP TABLE {table}")
+            self.stdout.write(
+                f"{name:<8}{rows:>10}{elapsed:>10.2f}{rows / elapsed:>12.0f}{index_size:>14}"
+            )
+
+    def uuid_type(self):
+        return "uuid" if connection.vendor == "postgresql" else "char(32)"
+
+    def insert(self, cursor, table, generate, rows, batch_size):
+        adapt = (
+            (lambda value: value)
+            if connection.vendor == "postgresql"
+            else (lambda value: value.hex)
+        )
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            cursor.executemany(
+                f"INSERT INTO {table} (id, payload) VALUES (%s, %s)",
+                [
+                    (adapt(generate()), "x" * 64)
+                    for _ in range(min(batch_size, rows - offset))
+                ],
+            )
+        return time.perf_counter() - started
+
+    def index_size(self, cursor, table):
+        if connection.vendor != "postgresql":
+            return "n/a"
+        cursor.execute("SELECT pg_size_pretty(pg_relation_size(%s))", [f"{table}_pkey"])
+        return cursor.fetchone()[0]
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.core import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the upcoming monthly partitions of the partitioned tables "
+        "and detach the ones older than the retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+            help="Months ahead of this one to create partitions for.",
+        )
+        parser.add_argument(
+            "--retain",
+            type=int,
+            default=settings.PARTITION_RETAIN_MONTHS,
+            help="Months before this one to keep attached; 0 keeps all.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop detached partitions instead of keeping them to archive.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the partitions that would be created and detached.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, ahead, retain, drop, dry_run, database, **options):
+        tables = [
+            table
+            for table in partitions.registered()
+            if partitions.is_partitioned(table, using=database)
+        ]
+        if not tables:
+            raise CommandError("There are no partitioned tables in this database.")
+
+        for table in tables:
+            if dry_run:
+                for month in partitions.missing(table, ahead, using=database):
+                    name = partitions.partition_name(table, month)
+                    self.stdout.write(f"Would create {name}")
+                if not retain:
+                    continue
+                for month in partitions.expired(table, retain, using=database):
+                    name = partitions.partition_name(table, month)
+                    self.stdout.write(f"Would detach {name}")
+                continue
+
+            for name in partitions.create_partitions(table, ahead, using=database):
+                self.stdout.write(f"Created {name}")
+            if not retain:
+                continue
+            for name in partitions.detach_partitions(
+                table, retain, drop=drop, using=database
+            ):
+                self.stdout.write(f"{'Dropped' if drop else 'Detached'} {name}")
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+CACHE_PREFIX = "metrics:"
+
+_collectors = {}
+
+
+def _key(name):
+    return f"{CACHE_PREFIX}{name}"
+
+
+def record(name, **values):
+    """
+    Store the latest values reported for ``name``.
+
+    Values live in the shared cache so figures recorded by Celery workers
+    can be read back by the web process.
+    """
+    cache.set(
+        _key(name),
+        {**values, "recorded_at": timezone.now().isoformat()},
+        timeout=None,
+    )
+
+
+def register(name, collect=None):
+    """
+    Expose ``name`` in ``snapshot()``.
+
+    ``collect`` is called to produce the values; by default the last values
+    passed to ``record`` are returned.
+    """
+    _collectors[name] = collect or (lambda: cache.get(_key(name)))
+
+
+def snapshot():
+    """
+    Return the current values of every registered metric.
+    """
+    return {name: collect() for name, collect in sorted(_collectors.items())}
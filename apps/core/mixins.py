@@ -0,0 +1,22 @@
+from rest_framework import permissions
+
+from . import prefetch
+
+
+class QueryPlanMixin:
+    """
+    Apply the serializer's query plan to the view's queryset on reads.
+
+    Views only filter their queryset by ownership; the ``select_related``,
+    ``prefetch_related`` and ``only()`` calls are derived from the serializer
+    returned by ``get_serializer_class`` so they never drift apart.
+    """
+
+    def filter_queryset(self, queryset):
+        """
+        Filter the queryset and, for safe methods, apply the query plan.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in permissions.SAFE_METHODS:
+            queryset = prefetch.plan_for(self.get_serializer_class()).apply(queryset)
+        return queryset
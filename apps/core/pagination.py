@@ -0,0 +1,150 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Opaque-cursor pagination over ``(created_at, id)``.
+
+    Unlike ``CursorPagination``, which positions on the first ordering field
+    and falls back to offsets for ties, the cursor carries both columns so
+    every page is a single range scan on a ``(owner, -created_at, -id)``
+    index with no ``COUNT(*)`` and no ``OFFSET``.
+
+    Clients opt in by sending the ``cursor`` query parameter (empty for the
+    first page). Requests without it are handed to the project's
+    ``DEFAULT_PAGINATION_CLASS`` so existing clients keep working.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def __init__(self):
+        self.fallback = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.fallback = self.get_fallback()
+            if self.fallback is None:
+                return None
+            return self.fallback.paginate_queryset(queryset, request, view)
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Like ``paginate_queryset``, reading the page through the async ORM.
+        """
+        if self.cursor_query_param not in request.query_params:
+            self.fallback = self.get_fallback()
+            if self.fallback is None:
+                return None
+            return await sync_to_async(self.fallback.paginate_queryset)(
+                queryset, request, view
+            )
+        queryset = self.page_queryset(queryset, request)
+        return self.set_page([instance async for instance in queryset])
+
+    def get_fallback(self):
+        """
+        Return the paginator for requests without a cursor, if any.
+        """
+        if api_settings.DEFAULT_PAGINATION_CLASS is None:
+            return None
+        return api_settings.DEFAULT_PAGINATION_CLASS()
+
+    def page_queryset(self, queryset, request):
+        """
+        Decode the request's cursor and return the rows to fetch for it.
+
+        One row past the page is included to tell whether another follows.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse, self.position = False, None
+        if self.cursor is not None:
+            self.reverse = self.cursor.reverse
+            self.position = self.decode_position(self.cursor)
+
+        if self.position is None:
+            queryset = queryset.order_by(*self.ordering)
+        elif self.reverse:
+            created_at, pk = self.position
+            queryset = (
+                queryset.filter(created_at__gte=created_at)
+                .filter(Q(created_at__gt=created_at) | Q(id__gt=pk))
+                .order_by("created_at", "id")
+            )
+        else:
+            created_at, pk = self.position
+            queryset = (
+                queryset.filter(created_at__lte=created_at)
+                .filter(Q(created_at__lt=created_at) | Q(id__lt=pk))
+                .order_by(*self.ordering)
+            )
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Keep the page from the rows fetched for ``page_queryset`` and return it.
+        """
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        return self.page
+
+    def decode_position(self, cursor):
+        """
+        Split a cursor position into its ``(created_at, id)`` pair.
+        """
+        if cursor.position is None:
+            return None
+        try:
+            created_at, pk = cursor.position.split("|")
+            created_at = parse_datetime(created_at)
+            pk = uuid.UUID(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def _position(self, instance):
+        return f"{instance.created_at.isoformat()}|{instance.pk}"
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(
+                offset=0, reverse=False, position=self._position(self.page[-1])
+            )
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(
+                offset=0, reverse=True, position=self._position(self.page[0])
+            )
+        )
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super().get_paginated_response(data)
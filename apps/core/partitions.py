@@ -0,0 +1,315 @@
+"""
+Monthly range partitions of tables on ``created_at``, for PostgreSQL.
+
+A partitioned table keeps one partition per calendar month (UTC), named
+``<table>_<YYYY>_<MM>``. Queries bounded on ``created_at`` only scan the
+months they cover, and old months leave the table by detaching their
+partition, a metadata change instead of a mass ``DELETE``.
+
+A default partition, ``<table>_default``, takes rows no monthly partition
+covers, so inserts keep working if partitions are not created in time.
+Creating the missing month later moves its rows out of the default
+partition and logs a warning.
+
+PostgreSQL requires every unique constraint of a partitioned table to
+include the partition key, so the primary key becomes ``(id,
+created_at)``. Django still treats ``id`` alone as the primary key, which
+holds as ids are uuid7, but foreign keys can no longer point at the table.
+Only tables nothing references can be partitioned.
+"""
+
+import logging
+import re
+from datetime import UTC, datetime
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def register(model, on_detach=None):
+    """
+    Have ``manage_partitions`` maintain the partitions of ``model``.
+
+    ``on_detach(partition, using)`` is called with the name of each
+    partition right after it is detached, in the same transaction, so
+    state derived from its rows can be adjusted.
+    """
+    _registry[model._meta.db_table] = on_detach
+
+
+def registered():
+    """
+    Return the registered table names mapped to their ``on_detach`` hook.
+    """
+    return dict(_registry)
+
+
+def month_of(moment):
+    """
+    Return the start of the UTC month ``moment`` falls in.
+    """
+    return moment.astimezone(UTC).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_{month:%Y_%m}"
+
+
+def default_name(table):
+    return f"{table}_default"
+
+
+def partition_month(table, name):
+    """
+    Return the month a partition of ``table`` holds, or ``None`` if
+    ``name`` is not a monthly partition of it.
+    """
+    match = re.fullmatch(rf"{re.escape(table)}_(\d{{4}})_(\d{{2}})", name)
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=UTC)
+
+
+def is_partitioned(table, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(table, using=DEFAULT_DB_ALIAS):
+    """
+    Return the months of the partitions attached to ``table``, oldest first.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [table],
+        )
+        months = (partition_month(table, name) for (name,) in cursor.fetchall())
+        return sorted(month for month in months if month is not None)
+
+
+def _bounds_sql(month):
+    return (
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def _create_sql(connection, parent, name, month):
+    quote_name = connection.ops.quote_name
+    return (
+        f"CREATE TABLE IF NOT EXISTS {quote_name(name)} "
+        f"PARTITION OF {quote_name(parent)} {_bounds_sql(month)}"
+    )
+
+
+def _create_default_sql(connection, parent, table):
+    quote_name = connection.ops.quote_name
+    return (
+        f"CREATE TABLE IF NOT EXISTS {quote_name(default_name(table))} "
+        f"PARTITION OF {quote_name(parent)} DEFAULT"
+    )
+
+
+def _create_partition(cursor, connection, table, month):
+    """
+    Create the partition of ``table`` for ``month``, moving the month's
+    rows out of the default partition first if any landed there. Returns
+    how many rows were moved.
+    """
+    quote_name = connection.ops.quote_name
+    name = quote_name(partition_name(table, month))
+    default = quote_name(default_name(table))
+    bounds = [month, add_months(month, 1)]
+    cursor.execute(
+        f"SELECT 1 FROM {default} WHERE created_at >= %s AND created_at < %s LIMIT 1",
+        bounds,
+    )
+    if cursor.fetchone() is None:
+        cursor.execute(
+            _create_sql(connection, table, partition_name(table, month), month)
+        )
+        return 0
+    cursor.execute(
+        f"CREATE TABLE {name} (LIKE {quote_name(table)} "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {default} "
+        "WHERE created_at >= %s AND created_at < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        bounds,
+    )
+    moved = cursor.rowcount
+    cursor.execute(
+        f"ALTER TABLE {quote_name(table)} ATTACH PARTITION {name} {_bounds_sql(month)}"
+    )
+    logger.warning(
+        "Moved %d rows of %s out of its default partition; partitions were "
+        "not created ahead of time.",
+        moved,
+        table,
+    )
+    return moved
+
+
+def missing(table, ahead, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Return the months from this one to ``ahead`` months on that ``table``
+    has no partition for.
+    """
+    current = month_of(now or timezone.now())
+    existing = set(partitions(table, using=using))
+    months = (add_months(current, offset) for offset in range(ahead + 1))
+    return [month for month in months if month not in existing]
+
+
+def expired(table, retain, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Return the months of the partitions of ``table`` older than the last
+    ``retain`` months before this one.
+    """
+    cutoff = add_months(month_of(now or timezone.now()), -retain)
+    return [month for month in partitions(table, using=using) if month < cutoff]
+
+
+def create_partitions(table, ahead, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Create the partitions ``missing`` from ``table``, and its default
+    partition if it has none. Returns the names of the monthly partitions.
+    """
+    connection = connections[using]
+    created = []
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(_create_default_sql(connection, table, table))
+        for month in missing(table, ahead, now=now, using=using):
+            _create_partition(cursor, connection, table, month)
+            created.append(partition_name(table, month))
+    return created
+
+
+def detach_partitions(table, retain, drop=False, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Detach the ``expired`` partitions of ``table``.
+
+    Each partition is detached in its own transaction together with its
+    ``on_detach`` hook. Detached partitions are kept as standalone tables
+    to archive, without foreign keys so they never hold up deleting the
+    rows they referenced, or dropped with ``drop``. Returns their names.
+    """
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    on_detach = _registry.get(table)
+    detached = []
+    for month in expired(table, retain, now=now, using=using):
+        name = partition_name(table, month)
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"ALTER TABLE {quote_name(table)} "
+                    f"DETACH PARTITION {quote_name(name)}"
+                )
+            if on_detach is not None:
+                on_detach(name, using)
+            with connection.cursor() as cursor:
+                if drop:
+                    cursor.execute(f"DROP TABLE {quote_name(name)}")
+                else:
+                    _drop_foreign_keys(cursor, connection, name)
+        detached.append(name)
+    return detached
+
+
+def _drop_foreign_keys(cursor, connection, table):
+    quote_name = connection.ops.quote_name
+    cursor.execute(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [table],
+    )
+    for (name,) in cursor.fetchall():
+        cursor.execute(
+            f"ALTER TABLE {quote_name(table)} DROP CONSTRAINT {quote_name(name)}"
+        )
+
+
+def partition_table(schema_editor, table, ahead):
+    """
+    Rebuild ``table`` as a table partitioned by month of ``created_at``.
+
+    For use in migrations. Rows are copied into partitions covering every
+    month from the oldest row to ``ahead`` months from now, next to a
+    default partition, and the primary key becomes ``(id, created_at)``.
+    Indexes, foreign keys and check constraints keep their names. The
+    table is locked while its rows are copied.
+    """
+    connection = schema_editor.connection
+    quote_name = connection.ops.quote_name
+    staging = f"{table}_partitioned"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s))",
+            [table, table],
+        )
+        indexes = [indexdef for (indexdef,) in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype IN ('f', 'p')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(f"SELECT MIN(created_at) FROM {quote_name(table)}")
+        oldest = cursor.fetchone()[0]
+
+    schema_editor.execute(
+        f"CREATE TABLE {quote_name(staging)} (LIKE {quote_name(table)} "
+        "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (created_at)"
+    )
+    now = timezone.now()
+    month = month_of(oldest or now)
+    last = add_months(month_of(now), ahead)
+    while month <= last:
+        schema_editor.execute(
+            _create_sql(connection, staging, partition_name(table, month), month)
+        )
+        month = add_months(month, 1)
+    schema_editor.execute(_create_default_sql(connection, staging, table))
+    schema_editor.execute(
+        f"INSERT INTO {quote_name(staging)} SELECT * FROM {quote_name(table)}"
+    )
+    schema_editor.execute(f"DROP TABLE {quote_name(table)}")
+    schema_editor.execute(
+        f"ALTER TABLE {quote_name(staging)} RENAME TO {quote_name(table)}"
+    )
+    for name, kind, definition in constraints:
+        if kind == "p":
+            definition = "PRIMARY KEY (id, created_at)"
+        schema_editor.execute(
+            f"ALTER TABLE {quote_name(table)} "
+            f"ADD CONSTRAINT {quote_name(name)} {definition}"
+        )
+    for indexdef in indexes:
+        schema_editor.execute(indexdef)
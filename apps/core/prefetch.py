@@ -0,0 +1,185 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    The ``select_related``/``prefetch_related``/``only`` calls a serializer
+    needs so that rendering a page costs a constant number of queries.
+    """
+
+    def __init__(self, select_related=None, prefetch_related=None, only=None):
+        self.select_related = set(select_related or ())
+        self.prefetch_related = list(prefetch_related or ())
+        self.only = set(only or ())
+
+    def __repr__(self):
+        return (
+            f"QueryPlan(select_related={sorted(self.select_related)}, "
+            f"prefetch_related={[_lookup(p) for p in self.prefetch_related]}, "
+            f"only={sorted(self.only)})"
+        )
+
+    def apply(self, queryset):
+        """
+        Return ``queryset`` with the plan applied.
+        """
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+    def merge(self, other, prefix):
+        """
+        Fold a nested plan reached through the relation ``prefix`` into this one.
+        """
+        self.select_related |= {f"{prefix}__{path}" for path in other.select_related}
+        self.prefetch_related.extend(
+            _prefix_prefetch(prefetch, prefix) for prefetch in other.prefetch_related
+        )
+        self.only |= {f"{prefix}__{name}" for name in other.only}
+
+
+def _lookup(prefetch):
+    return prefetch.prefetch_through if isinstance(prefetch, Prefetch) else prefetch
+
+
+def _prefix_prefetch(prefetch, prefix):
+    if isinstance(prefetch, Prefetch):
+        return Prefetch(
+            f"{prefix}__{prefetch.prefetch_through}",
+            queryset=prefetch.queryset,
+            to_attr=prefetch.to_attr,
+        )
+    return f"{prefix}__{prefetch}"
+
+
+def _get_model_field(model, name):
+    if name == "pk":
+        return model._meta.pk
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _is_single_relation(model_field):
+    return bool(model_field and (model_field.many_to_one or model_field.one_to_one))
+
+
+def _all_columns(model):
+    return {field.name for field in model._meta.concrete_fields}
+
+
+def build_plan(serializer, model=None):
+    """
+    Walk ``serializer`` and derive the query plan for ``model``.
+
+    Nested serializers over forward foreign keys and reverse one-to-one
+    relations become ``select_related``, nested ``many=True`` serializers
+    become ``Prefetch`` objects with their own plan, and plain model fields
+    are collected for ``only()`` along with the model's default ordering
+    columns, which paginators read back from each row.
+
+    Relations a serializer reaches through ``SerializerMethodField`` or
+    properties cannot be discovered by inspection; declare them on the
+    serializer's ``Meta`` as ``select_related``/``prefetch_related``. A
+    serializer with such fields and no declared hints is loaded with all
+    of its columns.
+    """
+    model = model or serializer.Meta.model
+    meta = getattr(serializer, "Meta", None)
+    select_hints = tuple(getattr(meta, "select_related", ()))
+    prefetch_hints = tuple(getattr(meta, "prefetch_related", ()))
+
+    plan = QueryPlan(select_related=select_hints, prefetch_related=prefetch_hints)
+    plan.only.add(model._meta.pk.name)
+    plan.only |= {
+        name.lstrip("-") for name in model._meta.ordering if isinstance(name, str)
+    }
+    opaque = False
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        if isinstance(field, serializers.ListSerializer) and isinstance(
+            field.child, serializers.ModelSerializer
+        ):
+            model_field = _get_model_field(model, field.source)
+            if model_field is None or not model_field.is_relation:
+                opaque = True
+                continue
+            related_model = model_field.related_model
+            child_plan = build_plan(field.child, related_model)
+            if model_field.one_to_many:
+                child_plan.only.add(model_field.field.name)
+            plan.prefetch_related.append(
+                Prefetch(
+                    field.source,
+                    queryset=child_plan.apply(related_model._default_manager.all()),
+                )
+            )
+            continue
+
+        if isinstance(field, serializers.ModelSerializer):
+            model_field = _get_model_field(model, field.source)
+            if not _is_single_relation(model_field):
+                opaque = True
+                continue
+            plan.select_related.add(field.source)
+            if model_field.concrete:
+                plan.only.add(model_field.name)
+            plan.merge(build_plan(field, model_field.related_model), field.source)
+            continue
+
+        if field.source == "*":
+            opaque = True
+            continue
+
+        *path, attr = field.source_attrs
+        current, prefix = model, []
+        for name in path:
+            model_field = _get_model_field(current, name)
+            if not (_is_single_relation(model_field) and model_field.concrete):
+                current = None
+                break
+            plan.only.add("__".join([*prefix, model_field.name]))
+            prefix.append(name)
+            plan.select_related.add("__".join(prefix))
+            current = model_field.related_model
+
+        model_field = _get_model_field(current, attr) if current else None
+        if model_field is None:
+            opaque = True
+        elif model_field.concrete:
+            plan.only.add("__".join([*prefix, model_field.name]))
+        elif model_field.is_relation:
+            plan.prefetch_related.append("__".join([*prefix, attr]))
+
+    if opaque and not (select_hints or prefetch_hints):
+        plan.only |= _all_columns(model)
+    for path in select_hints:
+        current, prefix = model, []
+        for name in path.split("__"):
+            model_field = current._meta.get_field(name)
+            if model_field.concrete:
+                plan.only.add("__".join([*prefix, name]))
+            prefix.append(name)
+            current = model_field.related_model
+        plan.only |= {f"{path}__{name}" for name in _all_columns(current)}
+    return plan
+
+
+@lru_cache(maxsize=None)
+def plan_for(serializer_class):
+    """
+    Return the cached query plan for ``serializer_class``.
+    """
+    return build_plan(serializer_class())
@@ -0,0 +1,25 @@
+from celery import shared_task
+from django.conf import settings
+
+from . import partitions
+
+
+@shared_task
+def manage_partitions():
+    """
+    Create upcoming partitions and detach expired ones, keeping them.
+
+    Detached partitions are never dropped here; run ``manage_partitions
+    --drop`` for that.
+    """
+    created = []
+    detached = []
+    for table in partitions.registered():
+        if not partitions.is_partitioned(table):
+            continue
+        created += partitions.create_partitions(table, settings.PARTITION_MONTHS_AHEAD)
+        if settings.PARTITION_RETAIN_MONTHS:
+            detached += partitions.detach_partitions(
+                table, settings.PARTITION_RETAIN_MONTHS
+            )
+    return {"created": created, "detached": detached}
@@ -0,0 +1,221 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.core import asyncviews
+from apps.notifications import views as notification_views
+from apps.notifications.models import Notification
+from apps.records import views as record_views
+from apps.records.models import DoctorAnnotation, HealthRecord, HealthRecordFile
+
+LIST_VIEWS = [
+    (
+        record_views.PatientHealthRecordListCreateView,
+        record_views.AsyncPatientHealthRecordListCreateView,
+        "records:patient-record-list",
+        "patient_user",
+    ),
+    (
+        record_views.DoctorHealthRecordListView,
+        record_views.AsyncDoctorHealthRecordListView,
+        "records:doctor-record-list",
+        "doctor_user",
+    ),
+    (
+        notification_views.NotificationListView,
+        notification_views.AsyncNotificationListView,
+        "notifications:notification-list",
+        "doctor_user",
+    ),
+]
+
+DETAIL_VIEWS = [
+    (
+        record_views.PatientHealthRecordRetrieveUpdateView,
+        record_views.AsyncPatientHealthRecordRetrieveUpdateView,
+        "records:patient-record-detail",
+        "patient_user",
+    ),
+    (
+        record_views.DoctorHealthRecordDetailView,
+        record_views.AsyncDoctorHealthRecordDetailView,
+        "records:doctor-record-detail",
+        "doctor_user",
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def uncached_pages(settings, tmp_path):
+    # Render every response instead of serving the previous one's page.
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture
+def records(patient_user, doctor_user, django_capture_on_commit_callbacks):
+    # Notifications of the doctor are written on commit.
+    with django_capture_on_commit_callbacks(execute=True):
+        records = [
+            HealthRecord.objects.create(
+                patient=patient_user, doctor=doctor_user, description=f"Visit {i}"
+            )
+            for i in range(3)
+        ]
+    DoctorAnnotation.objects.create(record=records[0], note="Stable")
+    HealthRecordFile.objects.create(
+        record=records[0],
+        file=SimpleUploadedFile("notes.txt", b"Resting heart rate 62"),
+    )
+    return records
+
+
+def _call(view_class, user, path, method="get", data=None, headers=None, **kwargs):
+    """
+    Call ``view_class`` directly, awaiting it when it is async.
+    """
+    request = getattr(APIRequestFactory(), method)(
+        path, data, format="json" if method != "get" else None, headers=headers
+    )
+    force_authenticate(request, user)
+    view = view_class.as_view()
+    if iscoroutinefunction(view):
+        response = async_to_sync(view)(request, **kwargs)
+    else:
+        response = view(request, **kwargs)
+    return response.render()
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    @pytest.mark.parametrize("sync_view, async_view, url_name, user", LIST_VIEWS)
+    def test_list_matches_sync_view(
+        self, request, records, sync_view, async_view, url_name, user
+    ):
+        user = request.getfixturevalue(user)
+        path = reverse(url_name)
+        assert iscoroutinefunction(async_view.as_view())
+
+        expected = _call(sync_view, user, path)
+        response = _call(async_view, user, path)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == expected.data
+        assert response["ETag"] == expected["ETag"]
+
+    @pytest.mark.parametrize("sync_view, async_view, url_name, user", LIST_VIEWS)
+    def test_keyset_pages_match_sync_view(
+        self, request, records, sync_view, async_view, url_name, user
+    ):
+        user = request.getfixturevalue(user)
+        path = reverse(url_name)
+        query = {"cursor": "", "page_size": 2}
+
+        expected = _call(sync_view, user, path, data=query)
+        response = _call(async_view, user, path, data=query)
+        assert response.data == expected.data
+        assert response.data["next"]
+
+        cursor = response.data["next"].split("cursor=")[1].split("&")[0]
+        query["cursor"] = cursor
+        expected = _call(sync_view, user, path, data=query)
+        response = _call(async_view, user, path, data=query)
+        assert response.data == expected.data
+        assert len(response.data["results"]) == 1
+
+    @pytest.mark.parametrize("sync_view, async_view, url_name, user", DETAIL_VIEWS)
+    def test_detail_matches_sync_view(
+        self, request, records, sync_view, async_view, url_name, user
+    ):
+        user = request.getfixturevalue(user)
+        pk = records[0].pk
+        path = reverse(url_name, kwargs={"pk": pk})
+
+        expected = _call(sync_view, user, path, pk=pk)
+        response = _call(async_view, user, path, pk=pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == expected.data
+        assert response.data["annotations"][0]["note"] == "Stable"
+
+    def test_not_modified(self, records, doctor_user):
+        path = reverse("records:doctor-record-list")
+        view = record_views.AsyncDoctorHealthRecordListView
+        etag = _call(view, doctor_user, path)["ETag"]
+
+        response = _call(view, doctor_user, path, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_other_users_record_is_not_found(self, records):
+        from apps.accounts.models import User
+
+        other = User.objects.create_user(
+            email="other@test.com", password="testpass123", role="doctor"
+        )
+        pk = records[0].pk
+        response = _call(
+            record_views.AsyncDoctorHealthRecordDetailView,
+            other,
+            reverse("records:doctor-record-detail", kwargs={"pk": pk}),
+            pk=pk,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_permissions_are_checked(self, patient_user):
+        response = _call(
+            record_views.AsyncDoctorHealthRecordListView,
+            patient_user,
+            reverse("records:doctor-record-list"),
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_writes_run_synchronously(
+        self, patient_user, doctor_user, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = _call(
+                record_views.AsyncPatientHealthRecordListCreateView,
+                patient_user,
+                reverse("records:patient-record-list"),
+                method="post",
+                data={"doctor": str(doctor_user.pk), "description": "Async"},
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert HealthRecord.objects.get(description="Async").patient == patient_user
+
+    def test_notification_detail_is_a_pure_read(self, records, doctor_user):
+        notification = Notification.objects.filter(recipient=doctor_user).first()
+        path = reverse(
+            "notifications:notification-detail", kwargs={"pk": notification.pk}
+        )
+        expected = _call(
+            notification_views.NotificationDetailView,
+            doctor_user,
+            path,
+            pk=notification.pk,
+        )
+        response = _call(
+            notification_views.AsyncNotificationDetailView,
+            doctor_user,
+            path,
+            pk=notification.pk,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == expected.data
+        notification.refresh_from_db()
+        assert not notification.is_read
+
+
+class TestVariant:
+    def test_follows_setting(self, settings):
+        views = (
+            record_views.DoctorHealthRecordListView,
+            record_views.AsyncDoctorHealthRecordListView,
+        )
+        settings.ASYNC_VIEWS = False
+        assert asyncviews.variant(*views) is views[0]
+        settings.ASYNC_VIEWS = True
+        assert asyncviews.variant(*views) is views[1]
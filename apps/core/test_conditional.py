@@ -0,0 +1,30 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core import conditional
+from apps.core.checks import check_shared_caches
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bump_in_reused_atomic_changes_version_on_commit():
+    key = conditional._version_key("records", "owner")
+    uncommitted = []
+
+    @transaction.atomic
+    def write():
+        conditional.bump("records", "owner")
+        uncommitted.append(cache.get(key))
+
+    write()
+    assert cache.get(key) != uncommitted[-1]
+    write()
+    assert cache.get(key) != uncommitted[-1]
+
+
+def test_locmem_caches_are_flagged(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "auth": {"BACKEND": "django.core.cache.backends.redis.RedisCache"},
+    }
+    assert [warning.id for warning in check_shared_caches(None)] == ["core.W001"]
@@ -0,0 +1,17 @@
+import pytest
+from django.db import connection
+
+from apps.core.indexes import PortableGinIndex
+from apps.records.models import HealthRecord
+
+
+@pytest.mark.django_db
+class TestPortableGinIndex:
+    def test_uses_gin_only_on_postgresql(self):
+        index = PortableGinIndex(fields=["search_vector"], name="record_search_idx")
+        sql = str(index.create_sql(HealthRecord, connection.schema_editor()))
+        if connection.vendor == "postgresql":
+            assert "USING gin" in sql
+        else:
+            assert "USING" not in sql
+            assert "record_search_idx" in sql
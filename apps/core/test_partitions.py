@@ -0,0 +1,100 @@
+from datetime import UTC, datetime
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from apps.core import partitions, tasks
+from apps.notifications.counters import uncount_detached
+from apps.notifications.models import Notification, NotificationType
+
+
+class TestMonths:
+    def test_month_of_is_utc(self):
+        moment = datetime.fromisoformat("2026-11-01T00:30:00+02:00")
+        assert partitions.month_of(moment) == datetime(2026, 10, 1, tzinfo=UTC)
+
+    def test_add_months_crosses_years(self):
+        month = datetime(2026, 11, 1, tzinfo=UTC)
+        assert partitions.add_months(month, 2) == datetime(2027, 1, 1, tzinfo=UTC)
+        assert partitions.add_months(month, -11) == datetime(2025, 12, 1, tzinfo=UTC)
+
+    def test_partition_names(self):
+        month = datetime(2026, 3, 1, tzinfo=UTC)
+        name = partitions.partition_name("notifications_notification", month)
+        assert name == "notifications_notification_2026_03"
+        assert partitions.partition_month("notifications_notification", name) == month
+        assert (
+            partitions.partition_month("notifications_notification", "records_2026_03")
+            is None
+        )
+        default = partitions.default_name("notifications_notification")
+        assert default == "notifications_notification_default"
+        assert partitions.partition_month("notifications_notification", default) is None
+
+    def test_create_sql(self):
+        month = datetime(2026, 12, 1, tzinfo=UTC)
+        sql = partitions._create_sql(
+            connection, "notifications_notification", "part", month
+        )
+        assert "FROM ('2026-12-01T00:00:00+00:00')" in sql
+        assert "TO ('2027-01-01T00:00:00+00:00')" in sql
+
+    def test_create_default_sql(self):
+        sql = partitions._create_default_sql(
+            connection,
+            "notifications_notification_partitioned",
+            "notifications_notification",
+        )
+        assert '"notifications_notification_default"' in sql
+        assert sql.endswith(
+            'PARTITION OF "notifications_notification_partitioned" DEFAULT'
+        )
+
+
+@pytest.mark.django_db
+class TestManagePartitions:
+    def test_notifications_are_partitioned(self):
+        table = Notification._meta.db_table
+        assert partitions.registered()[table] is uncount_detached
+        if connection.vendor != "postgresql":
+            assert not partitions.is_partitioned(table)
+            return
+        assert partitions.is_partitioned(table)
+        now = datetime.now(UTC)
+        assert not partitions.missing(table, 1, now=now)
+        assert partitions.month_of(now) in partitions.partitions(table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s)",
+                [partitions.default_name(table)],
+            )
+            assert cursor.fetchone() is not None
+
+    def test_needs_partitioned_tables(self):
+        if connection.vendor == "postgresql":
+            pytest.skip("The notification table is partitioned on PostgreSQL.")
+        with pytest.raises(CommandError):
+            call_command("manage_partitions")
+        assert tasks.manage_partitions() == {"created": [], "detached": []}
+
+    def test_detached_notifications_leave_the_unread_counter(
+        self, patient_user, health_record
+    ):
+        notifications = [
+            Notification.objects.create(
+                recipient=patient_user,
+                record=health_record,
+                notification_type=NotificationType.RECORD_ANNOTATED,
+                message=f"Notification {i}",
+            )
+            for i in range(3)
+        ]
+        notifications[0].mark_as_read()
+        patient_user.unread_counter.refresh_from_db()
+        assert patient_user.unread_counter.unread == 2
+
+        # The table itself stands in for a detached partition of it.
+        uncount_detached(Notification._meta.db_table)
+        patient_user.unread_counter.refresh_from_db()
+        assert patient_user.unread_counter.unread == 0
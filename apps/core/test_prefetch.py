@@ -0,0 +1,53 @@
+import pytest
+from django.db.models import Prefetch
+
+from apps.accounts.serializers import UserSerializer
+from apps.core.prefetch import plan_for
+from apps.records.models import DoctorAnnotation, HealthRecord, HealthRecordFile
+from apps.records.serializers import AnnotationListSerializer, HealthRecordSerializer
+
+
+class TestQueryPlan:
+    def test_nested_foreign_keys_are_select_related(self):
+        plan = plan_for(HealthRecordSerializer)
+        assert {"patient", "doctor"} <= plan.select_related
+        assert "patient" in plan.only
+        assert "doctor__email" in plan.only
+
+    def test_serializer_hints_are_followed(self):
+        plan = plan_for(UserSerializer)
+        assert plan.select_related == {"patient_profile", "doctor_profile"}
+        assert "patient_profile__date_of_birth" in plan.only
+        assert "password" not in plan.only
+
+    def test_nested_hints_are_prefixed(self):
+        plan = plan_for(HealthRecordSerializer)
+        assert "patient__patient_profile" in plan.select_related
+        assert "doctor__doctor_profile" in plan.select_related
+
+    def test_many_serializers_are_prefetched_with_their_own_plan(self):
+        plan = plan_for(HealthRecordSerializer)
+        prefetches = {p.prefetch_through: p for p in plan.prefetch_related}
+        assert set(prefetches) == {"files", "annotations"}
+        assert isinstance(prefetches["files"], Prefetch)
+        assert prefetches["files"].queryset.model is HealthRecordFile
+        assert prefetches["annotations"].queryset.model is DoctorAnnotation
+
+    def test_primary_key_related_fields_are_not_joined(self):
+        plan = plan_for(AnnotationListSerializer)
+        assert plan.select_related == set()
+        assert "record" in plan.only
+
+
+@pytest.mark.django_db
+class TestQueryPlanApply:
+    def test_page_renders_without_extra_queries(
+        self, health_record, patient_profile, doctor_profile, django_assert_num_queries
+    ):
+        DoctorAnnotation.objects.create(record=health_record, note="Looks good")
+        queryset = plan_for(HealthRecordSerializer).apply(HealthRecord.objects.all())
+        with django_assert_num_queries(3):
+            data = HealthRecordSerializer(queryset, many=True).data
+        assert data[0]["patient"]["profile"]["gender"] == "male"
+        assert data[0]["doctor"]["profile"]["license_number"] == "DOC12345"
+        assert data[0]["annotations"][0]["note"] == "Looks good"
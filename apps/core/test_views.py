@@ -0,0 +1,20 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    def test_staff_can_read_metrics(self, api_client, patient_user):
+        patient_user.is_staff = True
+        patient_user.save()
+        api_client.force_authenticate(patient_user)
+
+        response = api_client.get(reverse("core:metrics"))
+        assert response.status_code == status.HTTP_200_OK
+        assert "notification_emails" in response.data
+        assert response.data["db_pool"]["pooled"] is False
+
+    def test_non_staff_cannot_read_metrics(self, authenticated_patient_client):
+        response = authenticated_patient_client.get(reverse("core:metrics"))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+app_name = "core"
+
+urlpatterns = [
+    path(
+        "metrics/",
+        views.MetricsView.as_view(),
+        name="metrics",
+    ),
+]
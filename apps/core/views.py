@@ -1 +1,24 @@
-# Create your views here.
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, views
+from rest_framework.response import Response
+
+from . import metrics
+
+
+@extend_schema(tags=["Operations"], responses={200: dict})
+class MetricsView(views.APIView):
+    """
+    Report operational metrics for staff.
+
+    Returns the latest values of every registered metric, such as email
+    delivery throughput recorded by the Celery workers and connection pool
+    usage of the worker serving the request.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return a snapshot of all registered metrics.
+        """
+        return Response(metrics.snapshot())
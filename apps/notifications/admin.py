@@ -17,3 +17,19 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ("recipient__email", "message")
     readonly_fields = ("read_at", "created_at", "updated_at")
     ordering = ("-created_at",)
+
+
+@admin.register(models.ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "recipient",
+        "notification_type",
+        "message",
+        "notified_at",
+        "created_at",
+    )
+    list_filter = ("notification_type",)
+    search_fields = ("recipient__email", "message")
+    readonly_fields = ("read_at", "notified_at", "created_at", "updated_at")
+    ordering = ("-notified_at",)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.notifications"
+
+    def ready(self):
+        from apps.core import metrics, partitions
+
+        from . import signals  # noqa: F401
+        from .counters import uncount_detached
+        from .models import Notification
+
+        metrics.register("notification_emails")
+        metrics.register("notification_retention")
+        partitions.register(Notification, on_detach=uncount_detached)
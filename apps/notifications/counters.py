@@ -0,0 +1,54 @@
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.core import conditional, counters
+
+from .models import Notification, UnreadCounter
+
+
+def adjust_unread(deltas, using=DEFAULT_DB_ALIAS):
+    """
+    Add ``deltas``, a mapping of user id to amount, to unread counters.
+    """
+    counters.adjust(
+        UnreadCounter,
+        "user",
+        {user_id: {"unread": amount} for user_id, amount in deltas.items()},
+        using=using,
+    )
+
+
+def count_new(notifications, using=DEFAULT_DB_ALIAS):
+    """
+    Count freshly inserted ``notifications`` as unread for their recipients.
+    """
+    adjust_unread(
+        Counter(
+            notification.recipient_id
+            for notification in notifications
+            if not notification.is_read
+        ),
+        using=using,
+    )
+
+
+def uncount_detached(partition, using=DEFAULT_DB_ALIAS):
+    """
+    Take the unread notifications in ``partition``, a partition just
+    detached from the notification table, off their recipients' counters
+    and give the recipients' notification lists a new version.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT recipient_id, COUNT(*) FILTER (WHERE NOT is_read) "
+            f"FROM {connection.ops.quote_name(partition)} GROUP BY recipient_id"
+        )
+        user_pk = Notification._meta.get_field("recipient").target_field
+        unread = {
+            user_pk.to_python(recipient): count
+            for recipient, count in cursor.fetchall()
+        }
+    adjust_unread({user_id: -count for user_id, count in unread.items()}, using=using)
+    conditional.bump("notifications", *unread, using=using)
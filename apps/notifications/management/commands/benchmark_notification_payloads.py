@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.prefetch import plan_for
+from apps.notifications import models, serializers
+from apps.records.models import DoctorAnnotation, HealthRecord, HealthRecordFile
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare query count and response size of the compact and expanded "
+        "notification list shapes on synthetic data. Nothing is persisted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notifications", type=int, default=500)
+        parser.add_argument("--files", type=int, default=2)
+        parser.add_argument("--annotations", type=int, default=2)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recipient = self.populate(**options)
+            queryset = models.Notification.objects.filter(recipient=recipient)
+            shapes = [
+                (
+                    "expanded, select_related only",
+                    serializers.NotificationExpandedSerializer,
+                    queryset.select_related("record"),
+                ),
+                (
+                    "expanded, planned",
+                    serializers.NotificationExpandedSerializer,
+                    plan_for(serializers.NotificationExpandedSerializer).apply(
+                        queryset
+                    ),
+                ),
+                (
+                    "compact",
+                    serializers.NotificationSerializer,
+                    plan_for(serializers.NotificationSerializer).apply(queryset),
+                ),
+            ]
+            self.stdout.write(f"{'shape':<32}{'queries':>10}{'bytes':>14}")
+            for label, serializer_class, shape_queryset in shapes:
+                with CaptureQueriesContext(connection) as context:
+                    data = serializer_class(shape_queryset, many=True).data
+                size = len(JSONRenderer().render(data))
+                self.stdout.write(
+                    f"{label:<32}{len(context.captured_queries):>10}{size:>14}"
+                )
+            transaction.set_rollback(True)
+
+    def populate(self, notifications, files, annotations, **options):
+        patient = User.objects.create_user(
+            email="benchmark-patient@example.com", password=None, role="patient"
+        )
+        doctor = User.objects.create_user(
+            email="benchmark-doctor@example.com", password=None, role="doctor"
+        )
+        records = HealthRecord.objects.bulk_create(
+            HealthRecord(patient=patient, doctor=doctor, description="Benchmark")
+            for _ in range(notifications)
+        )
+        HealthRecordFile.objects.bulk_create(
+            HealthRecordFile(record=record, file=f"health_records/files/{i}.pdf")
+            for record in records
+            for i in range(files)
+        )
+        DoctorAnnotation.objects.bulk_create(
+            DoctorAnnotation(record=record, note="Benchmark annotation " * 10)
+            for record in records
+            for _ in range(annotations)
+        )
+        models.Notification.objects.bulk_create(
+            models.Notification(
+                recipient=patient,
+                record=record,
+                notification_type=models.NotificationType.RECORD_ANNOTATED,
+                message=f"Dr. {doctor.get_full_name()} has annotated health record",
+            )
+            for record in records
+        )
+        return patient
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_as_emailed(apps, schema_editor):
+    # Notifications created before this migration were emailed by the
+    # per-notification task; keep the drain from sending them again.
+    Notification = apps.get_model("notifications", "Notification")
+    Notification.objects.update(emailed_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0002_notification_notif_recipient_created_idx"),
+        ("records", "0002_healthrecord_record_doctor_created_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="emailed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_as_emailed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("emailed_at__isnull", True)),
+                fields=["created_at"],
+                name="notif_email_pending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:51
+
+import apps.core.identifiers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_notification_emailed_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
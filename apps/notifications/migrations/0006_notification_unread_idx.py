@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_unread_counters"),
+        ("records", "0011_doctor_dashboard"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["recipient", "-created_at", "-id"],
+                name="notif_unread_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:40
+
+import apps.core.identifiers
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0006_notification_unread_idx"),
+        ("records", "0011_doctor_dashboard"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedNotification",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=apps.core.identifiers.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("record_id", models.UUIDField()),
+                (
+                    "notification_type",
+                    models.CharField(
+                        choices=[
+                            ("patient_assigned", "Patient Assigned"),
+                            ("record_annotated", "Record Annotated"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("message", models.TextField()),
+                ("read_at", models.DateTimeField(blank=True, null=True)),
+                ("notified_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", True)),
+                fields=["created_at"],
+                name="notif_read_created_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivednotification",
+            name="recipient",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_notifications",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
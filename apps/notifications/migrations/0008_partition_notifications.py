@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:44
+
+from django.conf import settings
+from django.db import migrations
+
+from apps.core import partitions
+
+
+def partition_notifications(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Notification = apps.get_model("notifications", "Notification")
+    partitions.partition_table(
+        schema_editor, Notification._meta.db_table, settings.PARTITION_MONTHS_AHEAD
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0007_notification_retention"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications, migrations.RunPython.noop),
+    ]
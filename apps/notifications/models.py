@@ -1,6 +1,8 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
+from apps.core import conditional
 from apps.core.models import BaseModel
 
 
@@ -23,12 +25,103 @@ class Notification(BaseModel):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
+    emailed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notif_recipient_created_idx",
+            ),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(emailed_at__isnull=True),
+                name="notif_email_pending_idx",
+            ),
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                condition=models.Q(is_read=False),
+                name="notif_unread_idx",
+            ),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_read=True),
+                name="notif_read_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.message} - {self.recipient.email}"
 
     def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.read_at = self.created_at
-            self.save(update_fields=["is_read", "read_at"])
+        from .counters import adjust_unread
+
+        if self.is_read:
+            return
+        read_at = timezone.now()
+        # Only the call that flips the row takes it off the unread counter.
+        with transaction.atomic():
+            if Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True, read_at=read_at
+            ):
+                adjust_unread({self.recipient_id: -1})
+                conditional.bump("notifications", self.recipient_id)
+        self.is_read = True
+        self.read_at = read_at
+
+
+class ArchivedNotification(BaseModel):
+    """
+    A read notification moved out of ``Notification`` by the retention job.
+
+    It keeps the notification's id, and ``notified_at`` holds when it was
+    sent; ``created_at`` is when it was archived. The record is stored as
+    a plain id so archived rows never hold up deleting a record, and the
+    table carries none of the indexes the notification list needs.
+    """
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+    )
+    record_id = models.UUIDField()
+    notification_type = models.CharField(
+        max_length=30, choices=NotificationType.choices
+    )
+    message = models.TextField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    notified_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.message} - archived"
+
+    @classmethod
+    def from_notification(cls, notification):
+        return cls(
+            id=notification.pk,
+            recipient_id=notification.recipient_id,
+            record_id=notification.record_id,
+            notification_type=notification.notification_type,
+            message=notification.message,
+            read_at=notification.read_at,
+            notified_at=notification.created_at,
+        )
+
+
+class UnreadCounter(BaseModel):
+    """
+    Number of unread notifications of a user, kept up to date as
+    notifications are created, read and deleted so badge counts never
+    count rows.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="unread_counter",
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.unread} unread for {self.user_id}"
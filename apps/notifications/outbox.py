@@ -0,0 +1,57 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from apps.core import conditional, db
+
+from . import counters, push
+from .models import Notification
+from .tasks import send_pending_notification_emails
+
+
+def notify(recipient_id, record_id, notification_type, message, using=DEFAULT_DB_ALIAS):
+    """
+    Queue a notification to be written when the current transaction commits.
+
+    Notifications queued in the same transaction are inserted with a single
+    ``bulk_create`` after commit and handed to Celery in one enqueue, so the
+    request path does no notification writes and workers never see a row
+    that is not committed yet. Each flush wakes the email drain once
+    unless emails are being collected into digests. Notifications queued
+    inside a savepoint that is rolled back are dropped with it.
+    """
+    event = Notification(
+        recipient_id=recipient_id,
+        record_id=record_id,
+        notification_type=notification_type,
+        message=message,
+    )
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        flush([event], using=using)
+        return
+
+    events = db.commit_buffer(
+        "notifications", list, partial(flush, using=using), using=using
+    )
+    events.append(event)
+
+
+def flush(events, using=DEFAULT_DB_ALIAS):
+    """
+    Insert ``events``, count them as unread, push them to connected
+    clients, retire the recipients' cached notification pages and schedule
+    one drain of pending emails.
+    """
+    if not events:
+        return []
+    with transaction.atomic(using=using):
+        notifications = Notification.objects.using(using).bulk_create(events)
+        counters.count_new(notifications, using=using)
+        transaction.on_commit(partial(push.publish, notifications), using=using)
+    conditional.bump("notifications", *(event.recipient_id for event in events))
+    if not settings.NOTIFICATION_EMAIL_DIGEST_WINDOW:
+        send_pending_notification_emails.delay()
+    events.clear()
+    return notifications
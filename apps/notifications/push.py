@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "notifications:user:"
+
+_client = None
+_subscriber = None
+
+
+def channel(user_id):
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def is_enabled():
+    return bool(settings.NOTIFICATION_PUSH_REDIS_URL)
+
+
+def event(notification):
+    """
+    Return the payload pushed for ``notification``.
+
+    It carries the fields of the compact list serializer that need no
+    join, so publishing costs no queries.
+    """
+    return {
+        "id": str(notification.pk),
+        "record": str(notification.record_id),
+        "notification_type": notification.notification_type,
+        "message": notification.message,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at,
+    }
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.NOTIFICATION_PUSH_REDIS_URL)
+    return _client
+
+
+def publish(notifications):
+    """
+    Push committed ``notifications`` to their recipients' channels.
+
+    Delivery is best effort: clients that miss an event, or are not
+    connected, catch up with ``Last-Event-ID`` or the notification list,
+    so a Redis outage is logged rather than raised.
+    """
+    if not notifications or not is_enabled():
+        return
+    try:
+        with _get_client().pipeline(transaction=False) as pipeline:
+            for notification in notifications:
+                pipeline.publish(
+                    channel(notification.recipient_id),
+                    json.dumps(event(notification), cls=DjangoJSONEncoder),
+                )
+            pipeline.execute()
+    except redis.RedisError:
+        logger.warning(
+            "Could not push %d notifications", len(notifications), exc_info=True
+        )
+
+
+class _Subscriber:
+    """
+    One Redis subscription shared by every stream open in this process.
+
+    Channels are subscribed while at least one stream listens on them, on
+    a single connection, and a reader task hands each message to the
+    queues of the streams of its channel.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.client = redis.asyncio.Redis.from_url(settings.NOTIFICATION_PUSH_REDIS_URL)
+        self.pubsub = self.client.pubsub()
+        self.queues = defaultdict(set)
+        self.lock = asyncio.Lock()
+        self.reader = None
+
+    async def add(self, name, queue):
+        async with self.lock:
+            if name not in self.queues:
+                await self.pubsub.subscribe(name)
+            self.queues[name].add(queue)
+            if self.reader is None or self.reader.done():
+                self.reader = asyncio.create_task(self._read())
+
+    async def remove(self, name, queue):
+        async with self.lock:
+            queues = self.queues.get(name, set())
+            queues.discard(queue)
+            if not queues:
+                self.queues.pop(name, None)
+                await self.pubsub.unsubscribe(name)
+
+    async def _read(self):
+        # Returns once every channel is unsubscribed; ``add`` starts a new
+        # reader for the next subscription.
+        while self.queues:
+            try:
+                async for message in self.pubsub.listen():
+                    if message["type"] == "message":
+                        self._route(message)
+                return
+            except redis.RedisError:
+                # The connection resubscribes when it reconnects.
+                logger.warning("Lost the notification subscription", exc_info=True)
+                await asyncio.sleep(1)
+
+    def _route(self, message):
+        name = message["channel"]
+        if isinstance(name, bytes):
+            name = name.decode()
+        queues = self.queues.get(name)
+        if queues:
+            event = json.loads(message["data"])
+            for queue in queues:
+                queue.put_nowait(event)
+
+
+def _get_subscriber():
+    global _subscriber
+    if _subscriber is None or _subscriber.loop is not asyncio.get_running_loop():
+        _subscriber = _Subscriber()
+    return _subscriber
+
+
+async def subscribe(user_id):
+    """
+    Yield the events published for ``user_id``.
+
+    ``None`` is yielded once the subscription is active and then whenever
+    ``NOTIFICATION_STREAM_KEEPALIVE`` seconds pass without an event, so
+    callers can catch up on what they missed and keep idle connections
+    open. All streams of a process share one Redis connection.
+    """
+    subscriber = _get_subscriber()
+    name = channel(user_id)
+    queue = asyncio.Queue()
+    await subscriber.add(name, queue)
+    try:
+        yield None
+        while True:
+            try:
+                yield await asyncio.wait_for(
+                    queue.get(), timeout=settings.NOTIFICATION_STREAM_KEEPALIVE
+                )
+            except TimeoutError:
+                yield None
+    finally:
+        await subscriber.remove(name, queue)
@@ -0,0 +1,108 @@
+import logging
+
+import redis
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from apps.core import conditional
+
+from . import counters
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PREFIX = "notifications:receipts:"
+PENDING_USERS = f"{QUEUE_PREFIX}users"
+
+_client = None
+
+
+def is_coalesced():
+    return bool(settings.NOTIFICATION_READ_RECEIPTS_REDIS_URL)
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.NOTIFICATION_READ_RECEIPTS_REDIS_URL)
+    return _client
+
+
+def _queue_key(user_id):
+    return f"{QUEUE_PREFIX}{user_id}"
+
+
+def mark_read(user_id, ids, using=DEFAULT_DB_ALIAS):
+    """
+    Mark the notifications of ``user_id`` among ``ids`` as read.
+
+    All of them are flipped by one ``UPDATE``. Ids of other users'
+    notifications, of notifications already read and of ones that no
+    longer exist are skipped. Returns how many were marked.
+    """
+    with transaction.atomic(using=using):
+        marked = (
+            Notification.objects.using(using)
+            .filter(recipient_id=user_id, is_read=False, id__in=ids)
+            .update(is_read=True, read_at=timezone.now())
+        )
+        counters.adjust_unread({user_id: -marked}, using=using)
+    if marked:
+        conditional.bump("notifications", user_id, using=using)
+    return marked
+
+
+def _queue(user_id, ids):
+    with _get_client().pipeline() as pipeline:
+        pipeline.sadd(_queue_key(user_id), *(str(pk) for pk in ids))
+        pipeline.sadd(PENDING_USERS, str(user_id))
+        pipeline.execute()
+
+
+def submit(user_id, ids):
+    """
+    Record that ``user_id`` has read the notifications ``ids``.
+
+    With ``NOTIFICATION_READ_RECEIPTS_REDIS_URL`` set the receipts are
+    queued for ``flush`` and ``None`` is returned; if Redis cannot be
+    reached, or coalescing is off, they are applied at once and the number
+    marked is returned.
+    """
+    if is_coalesced():
+        try:
+            _queue(user_id, ids)
+            return None
+        except redis.RedisError:
+            logger.warning("Could not queue read receipts", exc_info=True)
+    return mark_read(user_id, ids)
+
+
+def flush():
+    """
+    Apply the queued receipts, one ``UPDATE`` per user.
+
+    Each user's queue is taken atomically, so receipts arriving meanwhile
+    wait for the next flush. Receipts that fail to apply are queued again.
+    Returns how many notifications were marked.
+    """
+    if not is_coalesced():
+        return 0
+    client = _get_client()
+    marked = 0
+    for user_id in client.smembers(PENDING_USERS):
+        user_id = user_id.decode()
+        with client.pipeline() as pipeline:
+            pipeline.smembers(_queue_key(user_id))
+            pipeline.delete(_queue_key(user_id))
+            pipeline.srem(PENDING_USERS, user_id)
+            ids = pipeline.execute()[0]
+        if not ids:
+            continue
+        ids = [pk.decode() for pk in ids]
+        try:
+            marked += mark_read(user_id, ids)
+        except Exception:
+            _queue(user_id, ids)
+            raise
+    return marked
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from apps.records import serializers as record_serializers
@@ -7,23 +8,57 @@ from . import models
 
 class NotificationSerializer(serializers.ModelSerializer):
     """
-    Serializer for notification data.
-    
-    Read-only serializer that includes the related health record details.
-    All fields are read-only as notifications are created by the system
-    and should not be modified through the API.
+    Compact serializer for notification data.
+
+    References the related health record by id and type only, which keeps
+    list pages to a single query. All fields are read-only as notifications
+    are created by the system and should not be modified through the API.
     """
-    record = record_serializers.HealthRecordSerializer()
+
+    record_type = serializers.CharField(source="record.record_type", read_only=True)
 
     class Meta:
         model = models.Notification
         fields = [
             "id",
             "record",
+            "record_type",
             "notification_type",
             "message",
             "is_read",
             "read_at",
             "created_at",
         ]
-        read_only_fields = fields
\ No newline at end of file
+        read_only_fields = fields
+
+
+class NotificationExpandedSerializer(NotificationSerializer):
+    """
+    Notification serializer that embeds the full health record.
+
+    Used when the client asks for ``expand=record``.
+    """
+
+    record = record_serializers.HealthRecordSerializer()
+
+
+class UnreadCountSerializer(serializers.Serializer):
+    """
+    Number of unread notifications of the authenticated user.
+    """
+
+    unread = serializers.IntegerField(read_only=True)
+
+
+class ReadReceiptSerializer(serializers.Serializer):
+    """
+    Ids of notifications the authenticated user has read.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=settings.NOTIFICATION_READ_RECEIPTS_MAX,
+        write_only=True,
+    )
+    marked = serializers.IntegerField(read_only=True)
@@ -0,0 +1,61 @@
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.core import conditional
+
+from . import counters, push
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def bump_notification_version(sender, instance, **kwargs):
+    """
+    Retire cached notification pages of the recipient.
+    """
+    conditional.bump("notifications", instance.recipient_id)
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created, using, **kwargs):
+    """
+    Count a notification saved on its own as unread.
+
+    The outbox inserts with ``bulk_create`` and counts its batch itself.
+    """
+    if created and not instance.is_read:
+        counters.adjust_unread({instance.recipient_id: 1}, using=using)
+
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, using, **kwargs):
+    """
+    Push a notification saved on its own once it is committed.
+
+    The outbox pushes its batches itself.
+    """
+    if created:
+        transaction.on_commit(partial(push.publish, [instance]), using=using)
+
+
+@receiver(pre_delete, sender="records.HealthRecord")
+def uncount_record_notifications(sender, instance, using, **kwargs):
+    """
+    Take the unread notifications that go with a deleted record off their
+    recipients' counters.
+    """
+    recipients = Notification.objects.using(using).filter(
+        record=instance, is_read=False
+    )
+    counters.adjust_unread(
+        {
+            recipient_id: -count
+            for recipient_id, count in Counter(
+                recipients.values_list("recipient_id", flat=True)
+            ).items()
+        },
+        using=using,
+    )
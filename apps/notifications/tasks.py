@@ -1,8 +1,59 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core import conditional, metrics
+
+from . import receipts
+from .models import ArchivedNotification, Notification
+
+
+def _build_messages(notifications, digest):
+    """
+    Turn a chunk of pending notifications into email messages.
 
-from .models import Notification
+    With ``digest`` each recipient gets a single message listing all of
+    their notifications in the chunk, otherwise one message each. Returns
+    ``(message, notifications)`` pairs.
+    """
+    by_recipient = defaultdict(list)
+    for notification in notifications:
+        by_recipient[notification.recipient.email].append(notification)
+
+    messages = []
+    for email, items in by_recipient.items():
+        if digest and len(items) > 1:
+            message = EmailMessage(
+                f"Health Record Notifications - {len(items)} updates",
+                "\n".join(
+                    f"- {item.get_notification_type_display()}: {item.message}"
+                    for item in items
+                ),
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+            )
+            messages.append((message, items))
+            continue
+        messages.extend(
+            (
+                EmailMessage(
+                    "Health Record Notification - "
+                    f"{item.get_notification_type_display()}",
+                    item.message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [email],
+                ),
+                [item],
+            )
+            for item in items
+        )
+    return messages
 
 
 @shared_task(
@@ -10,11 +61,132 @@ from .models import Notification
     autoretry_for=(Exception,),
     retry_kwargs={"max_retries": 3, "countdown": 10},
 )
-def send_notification_email(self, notification_id):
-    notification = Notification.objects.get(id=notification_id)
-    send_mail(
-        f"Health Record Notification - {notification.get_notification_type_display()}",
-        notification.message,
-        settings.DEFAULT_FROM_EMAIL,
-        [notification.recipient.email],
-    )
+def send_pending_notification_emails(self, batch_size=None):
+    """
+    Drain notifications that have not been emailed yet.
+
+    Pending rows are claimed in chunks with ``SKIP LOCKED`` and marked as
+    emailed in a short transaction, so concurrent runs never send the same
+    notification twice and no lock is held while mail goes out. Each chunk
+    is then grouped per recipient and sent over a single SMTP connection.
+    Notifications whose message fails are marked pending again and the
+    task is retried, so messages already delivered are not sent again. When
+    ``NOTIFICATION_EMAIL_DIGEST_WINDOW`` is set, notifications are held
+    until they are that many seconds old and then sent as one digest per
+    recipient.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_EMAIL_BATCH_SIZE
+    window = settings.NOTIFICATION_EMAIL_DIGEST_WINDOW
+    started = time.monotonic()
+    emails = notifications = 0
+
+    pending = Notification.objects.filter(emailed_at__isnull=True)
+    if window:
+        pending = pending.filter(
+            created_at__lte=timezone.now() - timedelta(seconds=window)
+        )
+
+    with get_connection() as connection:
+        while True:
+            with transaction.atomic():
+                chunk = list(
+                    pending.select_related("recipient")
+                    .only("notification_type", "message", "recipient__email")
+                    .order_by("created_at")
+                    .select_for_update(skip_locked=True, of=("self",))[:batch_size]
+                )
+                if not chunk:
+                    break
+                Notification.objects.filter(
+                    id__in=[notification.id for notification in chunk]
+                ).update(emailed_at=timezone.now())
+
+            failed = []
+            error = None
+            for message, items in _build_messages(chunk, digest=bool(window)):
+                try:
+                    emails += connection.send_messages([message]) or 0
+                except Exception as exc:
+                    error = exc
+                    failed.extend(item.id for item in items)
+            notifications += len(chunk) - len(failed)
+            if error is not None:
+                Notification.objects.filter(id__in=failed).update(emailed_at=None)
+                raise error
+
+    elapsed = time.monotonic() - started
+    stats = {
+        "notifications": notifications,
+        "emails": emails,
+        "seconds": round(elapsed, 3),
+        "emails_per_second": round(emails / elapsed, 1) if elapsed else 0.0,
+    }
+    if notifications:
+        metrics.record("notification_emails", **stats)
+    return stats
+
+
+@shared_task
+def flush_read_receipts():
+    """
+    Apply the read receipts collected in Redis.
+    """
+    return receipts.flush()
+
+
+@shared_task
+def prune_read_notifications(batch_size=None):
+    """
+    Remove read notifications older than ``NOTIFICATION_RETENTION_DAYS``.
+
+    Rows go in batches of ``NOTIFICATION_RETENTION_BATCH_SIZE``, oldest
+    first, each in its own short transaction and claimed with
+    ``SKIP LOCKED`` so pruning never waits on rows a request holds. With
+    ``NOTIFICATION_RETENTION_ARCHIVE`` set they are copied to
+    ``ArchivedNotification`` before being deleted. Unread notifications
+    are kept however old they are.
+    """
+    days = settings.NOTIFICATION_RETENTION_DAYS
+    if not days:
+        return {"pruned": 0}
+    batch_size = batch_size or settings.NOTIFICATION_RETENTION_BATCH_SIZE
+    archive = settings.NOTIFICATION_RETENTION_ARCHIVE
+    started = time.monotonic()
+    pruned = 0
+
+    expired = Notification.objects.filter(
+        is_read=True, created_at__lt=timezone.now() - timedelta(days=days)
+    ).order_by("created_at")
+    if not archive:
+        expired = expired.only("id", "recipient_id")
+
+    while True:
+        with transaction.atomic():
+            batch = list(expired.select_for_update(skip_locked=True)[:batch_size])
+            if not batch:
+                break
+            if archive:
+                ArchivedNotification.objects.bulk_create(
+                    (
+                        ArchivedNotification.from_notification(notification)
+                        for notification in batch
+                    ),
+                    ignore_conflicts=True,
+                )
+            Notification.objects.filter(
+                id__in=[notification.id for notification in batch]
+            ).delete()
+        conditional.bump(
+            "notifications", *{notification.recipient_id for notification in batch}
+        )
+        pruned += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    stats = {
+        "pruned": pruned,
+        "archived": pruned if archive else 0,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    metrics.record("notification_retention", **stats)
+    return stats
@@ -44,7 +44,7 @@ class TestNotification:
         
         assert notification.is_read
         assert notification.read_at is not None
-        assert notification.read_at == notification.created_at
+        assert notification.read_at >= notification.created_at
 
     def test_mark_as_read_idempotent(self, patient_user, health_record):
         notification = Notification.objects.create(
@@ -62,6 +62,20 @@ class TestNotification:
         
         assert notification.read_at == first_read_at
 
+    def test_mark_as_read_keeps_counter_at_zero(self, patient_user, health_record):
+        notification = Notification.objects.create(
+            recipient=patient_user,
+            record=health_record,
+            notification_type=NotificationType.RECORD_ANNOTATED,
+            message="Test notification",
+        )
+        patient_user.unread_counter.delete()
+
+        notification.mark_as_read()
+
+        patient_user.refresh_from_db()
+        assert patient_user.unread_counter.unread == 0
+
     def test_notification_ordering(self, patient_user, doctor_user):
         record1 = HealthRecord.objects.create(
             patient=patient_user,
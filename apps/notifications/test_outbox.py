@@ -0,0 +1,135 @@
+import pytest
+from functools import partial
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from apps.notifications import outbox
+from apps.notifications.models import Notification, NotificationType
+from apps.records.models import DoctorAnnotation, HealthRecord
+
+
+@pytest.mark.django_db
+class TestNotificationOutbox:
+    def test_notification_written_on_commit(
+        self, patient_user, doctor_user, django_capture_on_commit_callbacks, mailoutbox
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            record = HealthRecord.objects.create(
+                patient=patient_user, doctor=doctor_user
+            )
+            assert not Notification.objects.exists()
+
+        for callback in callbacks:
+            callback()
+        notification = Notification.objects.get()
+        assert notification.recipient == doctor_user
+        assert notification.record == record
+        assert notification.notification_type == NotificationType.PATIENT_ASSIGNED
+        assert mailoutbox[0].to == [doctor_user.email]
+
+    def test_transaction_is_flushed_in_one_batch(
+        self, patient_user, doctor_user, django_capture_on_commit_callbacks, mailoutbox
+    ):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                record = HealthRecord.objects.create(
+                    patient=patient_user, doctor=doctor_user
+                )
+                DoctorAnnotation.objects.create(record=record, note="First")
+                DoctorAnnotation.objects.create(record=record, note="Second")
+
+        flushes = [
+            callback
+            for callback in callbacks
+            if isinstance(callback, partial) and callback.func is outbox.flush
+        ]
+        assert len(flushes) == 1
+        assert doctor_user.notifications.count() == 1
+        assert patient_user.notifications.count() == 2
+        assert len(mailoutbox) == 3
+
+    def test_rolled_back_savepoint_is_dropped(
+        self, patient_user, doctor_user, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            record = HealthRecord.objects.create(
+                patient=patient_user, doctor=doctor_user
+            )
+            try:
+                with transaction.atomic():
+                    DoctorAnnotation.objects.create(record=record, note="Discarded")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        assert doctor_user.notifications.count() == 1
+        assert not patient_user.notifications.exists()
+
+    def test_annotation_notification_names_doctor(
+        self,
+        authenticated_doctor_client,
+        patient_user,
+        django_capture_on_commit_callbacks,
+    ):
+        url = reverse("records:doctor-annotation-create")
+        with django_capture_on_commit_callbacks(execute=True):
+            record = HealthRecord.objects.create(
+                patient=patient_user, doctor=authenticated_doctor_client.user
+            )
+            response = authenticated_doctor_client.post(
+                url, {"record": str(record.id), "note": "Stable"}, format="json"
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        notification = patient_user.notifications.get()
+        assert notification.message.startswith("Dr. Jane Smith")
+
+    def test_annotations_by_record_id_load_doctors_on_commit(
+        self, patient_user, doctor_user, django_capture_on_commit_callbacks
+    ):
+        records = HealthRecord.objects.bulk_create(
+            [HealthRecord(patient=patient_user, doctor=doctor_user) for _ in range(2)]
+        )
+        with CaptureQueriesContext(connection) as saving:
+            with django_capture_on_commit_callbacks() as callbacks:
+                with transaction.atomic():
+                    for record in records:
+                        DoctorAnnotation(record_id=record.pk, note="Stable").save()
+        with CaptureQueriesContext(connection) as committing:
+            with django_capture_on_commit_callbacks(execute=True):
+                for callback in callbacks:
+                    callback()
+
+        def doctor_lookups(context):
+            return [
+                query["sql"]
+                for query in context.captured_queries
+                if query["sql"].startswith('SELECT "records_healthrecord"')
+                and "accounts_user" in query["sql"]
+            ]
+
+        assert not doctor_lookups(saving)
+        assert len(doctor_lookups(committing)) == 1
+        messages = set(patient_user.notifications.values_list("message", flat=True))
+        assert messages == {
+            f"Dr. {doctor_user.get_full_name()} has annotated health record: {record.pk}"
+            for record in records
+        }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reused_atomic_flushes_every_transaction(patient_user, doctor_user, mailoutbox):
+    record = HealthRecord.objects.create(patient=patient_user, doctor=doctor_user)
+
+    @transaction.atomic
+    def notify():
+        outbox.notify(
+            patient_user.pk, record.pk, NotificationType.RECORD_ANNOTATED, "Update"
+        )
+
+    notify()
+    notify()
+    assert patient_user.notifications.count() == 2
@@ -0,0 +1,289 @@
+import asyncio
+import json
+
+import pytest
+import redis.asyncio
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.identifiers import uuid7
+from apps.notifications import push
+from apps.notifications.models import Notification, NotificationType
+from apps.records.models import HealthRecord
+
+
+class FakeRedis:
+    """
+    Records what is published instead of talking to Redis.
+    """
+
+    def __init__(self):
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+    def execute(self):
+        pass
+
+
+class FakePubSub:
+    """
+    Delivers messages handed to ``deliver`` to the channels subscribed.
+    """
+
+    def __init__(self):
+        self.channels = set()
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, name):
+        self.channels.add(name)
+
+    async def unsubscribe(self, name):
+        self.channels.discard(name)
+        self.messages.put_nowait(None)
+
+    def deliver(self, name, event):
+        if name in self.channels:
+            self.messages.put_nowait(
+                {"type": "message", "channel": name.encode(), "data": json.dumps(event)}
+            )
+
+    async def listen(self):
+        while self.channels:
+            message = await self.messages.get()
+            if message is not None:
+                yield message
+
+
+@pytest.fixture
+def fake_redis(settings, monkeypatch):
+    settings.NOTIFICATION_PUSH_REDIS_URL = "redis://push.test:6379"
+    client = FakeRedis()
+    monkeypatch.setattr(push, "_client", client)
+    return client
+
+
+def _stream(user, events, last_event_id=None, limit=None):
+    """
+    Open the stream as ``user`` with ``events`` as the live feed and return
+    its first ``limit`` chunks.
+    """
+
+    async def subscribe(user_id):
+        yield None
+        for event in events:
+            yield event
+
+    async def read():
+        headers = {
+            "Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"
+        }
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = str(last_event_id)
+        response = await AsyncClient().get(
+            reverse("notifications:notification-stream"), headers=headers
+        )
+        assert response["Content-Type"] == "text/event-stream"
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if limit is not None and len(chunks) == limit:
+                break
+        return chunks
+
+    push_subscribe = push.subscribe
+    push.subscribe = subscribe
+    try:
+        return async_to_sync(read)()
+    finally:
+        push.subscribe = push_subscribe
+
+
+def _events(chunks):
+    return [
+        json.loads(line.removeprefix("data: "))
+        for chunk in chunks
+        for line in chunk.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.django_db
+class TestNotificationPush:
+    def test_committed_notifications_are_published(
+        self, fake_redis, patient_user, doctor_user, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            record = HealthRecord.objects.create(
+                patient=patient_user, doctor=doctor_user
+            )
+
+        notification = Notification.objects.get()
+        assert fake_redis.published == [
+            (
+                push.channel(doctor_user.pk),
+                {
+                    "id": str(notification.pk),
+                    "record": str(record.pk),
+                    "notification_type": NotificationType.PATIENT_ASSIGNED,
+                    "message": notification.message,
+                    "is_read": False,
+                    "created_at": fake_redis.published[0][1]["created_at"],
+                },
+            )
+        ]
+
+    def test_nothing_is_published_when_rolled_back(
+        self, fake_redis, patient_user, doctor_user, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=False):
+            HealthRecord.objects.create(patient=patient_user, doctor=doctor_user)
+        assert fake_redis.published == []
+
+    def test_push_disabled_publishes_nothing(
+        self, settings, monkeypatch, health_record, django_capture_on_commit_callbacks
+    ):
+        settings.NOTIFICATION_PUSH_REDIS_URL = None
+        monkeypatch.setattr(push, "_client", None)
+        with django_capture_on_commit_callbacks(execute=True):
+            Notification.objects.create(
+                recipient=health_record.patient,
+                record=health_record,
+                notification_type=NotificationType.RECORD_ANNOTATED,
+                message="Annotated",
+            )
+        assert push._client is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNotificationStream:
+    def test_streams_published_events(self, fake_redis, patient_user):
+        event = {"id": "01a14800-0000-7000-8000-000000000001", "message": "Hello"}
+
+        chunks = _stream(patient_user, [None, event], limit=3)
+
+        assert chunks[0].startswith("retry:")
+        assert chunks[1] == ": keepalive\n\n"
+        assert chunks[2].startswith(f"id: {event['id']}\nevent: notification\n")
+        assert _events(chunks) == [event]
+
+    def test_reconnect_replays_missed_notifications(
+        self, fake_redis, patient_user, doctor_user
+    ):
+        record = HealthRecord.objects.create(patient=patient_user, doctor=doctor_user)
+        seen, missed = (
+            Notification.objects.create(
+                recipient=patient_user,
+                record=record,
+                notification_type=NotificationType.RECORD_ANNOTATED,
+                message=message,
+            )
+            for message in ("Seen", "Missed")
+        )
+        # The live feed repeats the missed notification; it is sent once.
+        live = push.event(missed)
+        live["created_at"] = live["created_at"].isoformat()
+
+        chunks = _stream(patient_user, [live], last_event_id=seen.pk)
+
+        assert [event["id"] for event in _events(chunks)] == [str(missed.pk)]
+
+    def test_late_commit_is_delivered(self, fake_redis, patient_user, doctor_user):
+        record = HealthRecord.objects.create(patient=patient_user, doctor=doctor_user)
+        # Its id is generated first, but its transaction commits last.
+        late_id = uuid7()
+        seen = Notification.objects.create(
+            recipient=patient_user,
+            record=record,
+            notification_type=NotificationType.RECORD_ANNOTATED,
+            message="Seen",
+        )
+        live = {"id": str(late_id), "message": "Late"}
+
+        chunks = _stream(patient_user, [live], last_event_id=seen.pk)
+        assert _events(chunks) == [live]
+
+        late = Notification.objects.create(
+            id=late_id,
+            recipient=patient_user,
+            record=record,
+            notification_type=NotificationType.RECORD_ANNOTATED,
+            message="Late",
+        )
+        chunks = _stream(patient_user, [], last_event_id=seen.pk)
+        assert [event["id"] for event in _events(chunks)] == [str(late.pk)]
+
+    def test_requires_authentication(self, fake_redis):
+        async def read():
+            return await AsyncClient().get(reverse("notifications:notification-stream"))
+
+        response = async_to_sync(read)()
+        assert response.status_code == 401
+
+    def test_not_found_when_push_is_disabled(self, settings, patient_user):
+        settings.NOTIFICATION_PUSH_REDIS_URL = None
+
+        async def read():
+            token = RefreshToken.for_user(patient_user).access_token
+            return await AsyncClient().get(
+                reverse("notifications:notification-stream"),
+                headers={"Authorization": f"Bearer {token}"},
+            )
+
+        response = async_to_sync(read)()
+        assert response.status_code == 404
+
+
+def test_streams_share_one_subscription(settings, monkeypatch):
+    settings.NOTIFICATION_PUSH_REDIS_URL = "redis://push.test:6379"
+    settings.NOTIFICATION_STREAM_KEEPALIVE = 5
+    clients = []
+
+    class FakeAsyncRedis:
+        def __init__(self):
+            self.pubsubs = []
+            clients.append(self)
+
+        @classmethod
+        def from_url(cls, url):
+            return cls()
+
+        def pubsub(self):
+            self.pubsubs.append(FakePubSub())
+            return self.pubsubs[-1]
+
+    monkeypatch.setattr(redis.asyncio, "Redis", FakeAsyncRedis)
+    monkeypatch.setattr(push, "_subscriber", None)
+
+    async def run():
+        streams = [push.subscribe(user_id) for user_id in (1, 1, 2)]
+        for stream in streams:
+            assert await stream.__anext__() is None
+        [pubsub] = clients[0].pubsubs
+        assert pubsub.channels == {push.channel(1), push.channel(2)}
+
+        pubsub.deliver(push.channel(1), {"id": "a"})
+        pubsub.deliver(push.channel(2), {"id": "b"})
+        received = [await stream.__anext__() for stream in streams]
+
+        for stream in streams:
+            await stream.aclose()
+        return received, pubsub.channels
+
+    received, channels = async_to_sync(run)()
+
+    assert received == [{"id": "a"}, {"id": "a"}, {"id": "b"}]
+    assert len(clients) == 1
+    assert channels == set()
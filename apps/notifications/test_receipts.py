@@ -0,0 +1,119 @@
+import pytest
+import redis
+from django.urls import reverse
+from rest_framework import status
+
+from apps.notifications import receipts, tasks
+from apps.notifications.models import Notification, NotificationType
+
+
+class FakeRedis:
+    """
+    The set commands receipts use, kept in a dict.
+    """
+
+    def __init__(self):
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(member.encode() for member in members)
+
+    def delete(self, key):
+        self.sets.pop(key, None)
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(member.encode())
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+        return lambda *args: self.commands.append((command, args))
+
+    def execute(self):
+        return [command(*args) for command, args in self.commands]
+
+
+@pytest.fixture
+def fake_redis(settings, monkeypatch):
+    settings.NOTIFICATION_READ_RECEIPTS_REDIS_URL = "redis://receipts.test:6379"
+    client = FakeRedis()
+    monkeypatch.setattr(receipts, "_client", client)
+    return client
+
+
+@pytest.fixture
+def notifications(patient_user, health_record):
+    return [
+        Notification.objects.create(
+            recipient=patient_user,
+            record=health_record,
+            notification_type=NotificationType.RECORD_ANNOTATED,
+            message=f"Notification {i}",
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestCoalescedReadReceipts:
+    def test_receipts_are_queued_then_flushed(
+        self, fake_redis, authenticated_patient_client, notifications
+    ):
+        url = reverse("notifications:notification-read-receipts")
+        for notification in notifications[:2]:
+            response = authenticated_patient_client.post(
+                url, {"ids": [str(notification.id)]}, format="json"
+            )
+            assert response.status_code == status.HTTP_202_ACCEPTED
+        assert not Notification.objects.filter(is_read=True).exists()
+
+        assert tasks.flush_read_receipts() == 2
+        assert set(
+            Notification.objects.filter(is_read=True).values_list("id", flat=True)
+        ) == {notification.id for notification in notifications[:2]}
+        assert authenticated_patient_client.user.unread_counter.unread == 1
+        assert fake_redis.sets == {receipts.PENDING_USERS: set()}
+
+        assert tasks.flush_read_receipts() == 0
+
+    def test_failed_flush_requeues_receipts(
+        self, fake_redis, monkeypatch, patient_user, notifications
+    ):
+        receipts.submit(patient_user.pk, [notifications[0].id])
+        mark_read = receipts.mark_read
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(receipts, "mark_read", fail)
+        with pytest.raises(RuntimeError):
+            receipts.flush()
+
+        monkeypatch.setattr(receipts, "mark_read", mark_read)
+        assert receipts.flush() == 1
+
+    def test_receipts_are_applied_when_redis_is_down(
+        self, fake_redis, monkeypatch, patient_user, notifications
+    ):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError
+
+        monkeypatch.setattr(fake_redis, "sadd", fail)
+        assert receipts.submit(patient_user.pk, [notifications[0].id]) == 1
@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.utils import timezone
+
+from apps.core import metrics
+from apps.notifications.models import (
+    ArchivedNotification,
+    Notification,
+    NotificationType,
+)
+from apps.notifications.tasks import (
+    prune_read_notifications,
+    send_pending_notification_emails,
+)
+
+
+def create_notifications(recipient, record, count, **kwargs):
+    return Notification.objects.bulk_create(
+        Notification(
+            recipient=recipient,
+            record=record,
+            notification_type=NotificationType.RECORD_ANNOTATED,
+            message=f"Update {i}",
+            **kwargs,
+        )
+        for i in range(count)
+    )
+
+
+@pytest.mark.django_db
+class TestSendPendingNotificationEmails:
+    def test_sends_each_pending_notification_once(
+        self, patient_user, doctor_user, health_record, mailoutbox
+    ):
+        create_notifications(patient_user, health_record, 3)
+        create_notifications(doctor_user, health_record, 2)
+        create_notifications(patient_user, health_record, 1, emailed_at=timezone.now())
+
+        stats = send_pending_notification_emails(batch_size=2)
+        assert stats["notifications"] == 5
+        assert stats["emails"] == 5
+        assert len(mailoutbox) == 5
+        assert not Notification.objects.filter(emailed_at__isnull=True).exists()
+
+        assert send_pending_notification_emails()["notifications"] == 0
+        assert len(mailoutbox) == 5
+
+    def test_digest_groups_per_recipient(
+        self, settings, patient_user, doctor_user, health_record, mailoutbox
+    ):
+        settings.NOTIFICATION_EMAIL_DIGEST_WINDOW = 60
+        due = create_notifications(patient_user, health_record, 3)
+        Notification.objects.filter(id__in=[n.id for n in due]).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        create_notifications(doctor_user, health_record, 1)
+
+        stats = send_pending_notification_emails()
+        assert stats["notifications"] == 3
+        assert stats["emails"] == 1
+        assert mailoutbox[0].to == [patient_user.email]
+        assert "3 updates" in mailoutbox[0].subject
+        assert doctor_user.notifications.get().emailed_at is None
+
+    def test_failed_messages_are_retried_alone(
+        self, monkeypatch, patient_user, doctor_user, health_record, mailoutbox
+    ):
+        create_notifications(patient_user, health_record, 2)
+        create_notifications(doctor_user, health_record, 1)
+        send_messages = locmem.EmailBackend.send_messages
+
+        def refuse_doctor(backend, messages):
+            if messages[0].to == [doctor_user.email]:
+                raise RuntimeError("mailbox unavailable")
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(locmem.EmailBackend, "send_messages", refuse_doctor)
+        with pytest.raises(RuntimeError):
+            send_pending_notification_emails()
+        assert len(mailoutbox) == 2
+        assert doctor_user.notifications.get().emailed_at is None
+        assert not patient_user.notifications.filter(emailed_at__isnull=True).exists()
+
+        monkeypatch.setattr(locmem.EmailBackend, "send_messages", send_messages)
+        assert send_pending_notification_emails()["emails"] == 1
+        assert [message.to for message in mailoutbox[2:]] == [[doctor_user.email]]
+
+    def test_records_throughput(self, patient_user, health_record):
+        cache.delete(f"{metrics.CACHE_PREFIX}notification_emails")
+        create_notifications(patient_user, health_record, 2)
+
+        send_pending_notification_emails()
+        recorded = metrics.snapshot()["notification_emails"]
+        assert recorded["emails"] == 2
+        assert "emails_per_second" in recorded
+
+
+def age(notifications, days):
+    Notification.objects.filter(id__in=[n.id for n in notifications]).update(
+        created_at=timezone.now() - timedelta(days=days)
+    )
+
+
+@pytest.mark.django_db
+class TestPruneReadNotifications:
+    def test_prunes_only_old_read_notifications(
+        self, settings, patient_user, health_record
+    ):
+        settings.NOTIFICATION_RETENTION_DAYS = 30
+        expired = create_notifications(
+            patient_user, health_record, 5, is_read=True, read_at=timezone.now()
+        )
+        age(expired, 31)
+        old_unread = create_notifications(patient_user, health_record, 1)
+        age(old_unread, 31)
+        recent_read = create_notifications(patient_user, health_record, 1, is_read=True)
+
+        stats = prune_read_notifications(batch_size=2)
+        assert stats["pruned"] == 5
+        assert stats["archived"] == 0
+        assert set(Notification.objects.values_list("id", flat=True)) == {
+            old_unread[0].id,
+            recent_read[0].id,
+        }
+        assert not ArchivedNotification.objects.exists()
+        assert metrics.snapshot()["notification_retention"]["pruned"] == 5
+
+        assert prune_read_notifications()["pruned"] == 0
+
+    def test_archives_instead_of_deleting(self, settings, patient_user, health_record):
+        settings.NOTIFICATION_RETENTION_DAYS = 30
+        settings.NOTIFICATION_RETENTION_ARCHIVE = True
+        read_at = timezone.now() - timedelta(days=40)
+        (expired,) = create_notifications(
+            patient_user, health_record, 1, is_read=True, read_at=read_at
+        )
+        age([expired], 45)
+        expired.refresh_from_db()
+
+        assert prune_read_notifications()["archived"] == 1
+        assert not Notification.objects.exists()
+        archived = ArchivedNotification.objects.get()
+        assert archived.id == expired.id
+        assert archived.recipient == patient_user
+        assert archived.record_id == health_record.id
+        assert archived.message == expired.message
+        assert archived.read_at == read_at
+        assert archived.notified_at == expired.created_at
+
+    def test_disabled_keeps_everything(self, settings, patient_user, health_record):
+        settings.NOTIFICATION_RETENTION_DAYS = 0
+        expired = create_notifications(patient_user, health_record, 1, is_read=True)
+        age(expired, 365)
+
+        assert prune_read_notifications()["pruned"] == 0
+        assert Notification.objects.count() == 1
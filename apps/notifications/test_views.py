@@ -72,6 +72,54 @@ class TestNotificationListView:
         assert response.data[0]["id"] == str(newer_notification.id)
         assert response.data[1]["id"] == str(older_notification.id)
 
+    def test_list_is_compact_by_default(self, authenticated_patient_client, health_record):
+        Notification.objects.create(
+            recipient=authenticated_patient_client.user,
+            record=health_record,
+            notification_type=NotificationType.PATIENT_ASSIGNED,
+            message="Compact notification",
+        )
+
+        url = reverse("notifications:notification-list")
+        response = authenticated_patient_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["record"] == health_record.id
+        assert response.data[0]["record_type"] == health_record.record_type
+
+    def test_list_expands_record(self, authenticated_patient_client, health_record):
+        Notification.objects.create(
+            recipient=authenticated_patient_client.user,
+            record=health_record,
+            notification_type=NotificationType.PATIENT_ASSIGNED,
+            message="Expanded notification",
+        )
+
+        url = reverse("notifications:notification-list")
+        response = authenticated_patient_client.get(url, {"expand": "record"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["record"]["id"] == str(health_record.id)
+        assert response.data[0]["record"]["description"] == health_record.description
+
+    def test_expanded_list_query_count_is_constant(
+        self, authenticated_patient_client, doctor_user, assert_constant_queries
+    ):
+        def populate(size):
+            for _ in range(size):
+                record = HealthRecord.objects.create(
+                    patient=authenticated_patient_client.user, doctor=doctor_user
+                )
+                Notification.objects.create(
+                    recipient=authenticated_patient_client.user,
+                    record=record,
+                    notification_type=NotificationType.RECORD_ANNOTATED,
+                    message="Record annotated",
+                )
+
+        url = reverse("notifications:notification-list")
+        assert_constant_queries(
+            lambda: authenticated_patient_client.get(url, {"expand": "record"}), populate
+        )
+
     def test_unauthenticated_access(self, api_client):
         url = reverse("notifications:notification-list")
         response = api_client.get(url)
@@ -80,7 +128,7 @@ class TestNotificationListView:
 
 @pytest.mark.django_db
 class TestNotificationDetailView:
-    def test_retrieve_and_mark_as_read(self, authenticated_patient_client, health_record):
+    def test_retrieve_does_not_mark_as_read(self, authenticated_patient_client, health_record):
         notification = Notification.objects.create(
             recipient=authenticated_patient_client.user,
             record=health_record,
@@ -93,10 +141,31 @@ class TestNotificationDetailView:
         response = authenticated_patient_client.get(url)
         assert response.status_code == status.HTTP_200_OK
         assert response.data["id"] == str(notification.id)
+        assert response.data["is_read"] is False
         
         notification.refresh_from_db()
-        assert notification.is_read
-        assert notification.read_at is not None
+        assert not notification.is_read
+        assert notification.read_at is None
+
+    def test_retrieve_is_a_cacheable_read(self, authenticated_patient_client, health_record):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        notification = Notification.objects.create(
+            recipient=authenticated_patient_client.user,
+            record=health_record,
+            notification_type=NotificationType.PATIENT_ASSIGNED,
+            message="Test notification",
+        )
+        url = reverse("notifications:notification-detail", kwargs={"pk": notification.id})
+        with CaptureQueriesContext(connection) as context:
+            etag = authenticated_patient_client.get(url)["ETag"]
+        assert not any(
+            query["sql"].upper().startswith("UPDATE") for query in context.captured_queries
+        )
+
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
 
     def test_retrieve_already_read_notification(self, authenticated_patient_client, health_record):
         notification = Notification.objects.create(
@@ -135,6 +204,80 @@ class TestNotificationDetailView:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestNotificationReadReceiptView:
+    def _notify(self, user, record, count):
+        return [
+            Notification.objects.create(
+                recipient=user,
+                record=record,
+                notification_type=NotificationType.RECORD_ANNOTATED,
+                message=f"Notification {i}",
+            )
+            for i in range(count)
+        ]
+
+    def test_marks_only_own_unread_notifications(
+        self, authenticated_patient_client, doctor_user, health_record
+    ):
+        import uuid
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        user = authenticated_patient_client.user
+        first, second, unsent = self._notify(user, health_record, 3)
+        first.mark_as_read()
+        (other,) = self._notify(doctor_user, health_record, 1)
+
+        url = reverse("notifications:notification-read-receipts")
+        ids = [str(n.id) for n in (first, second, other)] + [str(uuid.uuid4())]
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_patient_client.post(url, {"ids": ids}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"marked": 1}
+        updates = [
+            query for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "notifications_notification"')
+        ]
+        assert len(updates) == 1
+
+        second.refresh_from_db()
+        assert second.is_read
+        assert second.read_at >= second.created_at
+        unsent.refresh_from_db()
+        other.refresh_from_db()
+        assert not unsent.is_read
+        assert not other.is_read
+        assert user.unread_counter.unread == 1
+
+    def test_receipts_retire_cached_pages(self, authenticated_patient_client, health_record):
+        (notification,) = self._notify(authenticated_patient_client.user, health_record, 1)
+        url = reverse("notifications:notification-list")
+        etag = authenticated_patient_client.get(url)["ETag"]
+
+        authenticated_patient_client.post(
+            reverse("notifications:notification-read-receipts"),
+            {"ids": [str(notification.id)]},
+            format="json",
+        )
+
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["is_read"] is True
+
+    def test_validation(self, authenticated_patient_client):
+        url = reverse("notifications:notification-read-receipts")
+        for ids in ([], ["not-a-uuid"]):
+            response = authenticated_patient_client.post(url, {"ids": ids}, format="json")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated_access(self, api_client):
+        response = api_client.post(
+            reverse("notifications:notification-read-receipts"), {"ids": []}, format="json"
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 @pytest.mark.django_db
 class TestMarkAllNotificationsReadView:
     def test_mark_all_notifications_as_read(self, authenticated_patient_client, health_record):
@@ -274,4 +417,94 @@ class TestDeleteAllNotificationsView:
     def test_delete_all_when_no_notifications(self, authenticated_patient_client):
         url = reverse("notifications:delete-all-notifications")
         response = authenticated_patient_client.delete(url)
-        assert response.status_code == status.HTTP_204_NO_CONTENT
\ No newline at end of file
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+@pytest.mark.django_db
+class TestNotificationConditionalGet:
+    def test_mark_all_read_changes_etag(self, authenticated_patient_client, health_record):
+        Notification.objects.create(
+            recipient=authenticated_patient_client.user,
+            record=health_record,
+            notification_type=NotificationType.RECORD_ANNOTATED,
+            message="Unread",
+        )
+        url = reverse("notifications:notification-list")
+        etag = authenticated_patient_client.get(url)["ETag"]
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        authenticated_patient_client.post(reverse("notifications:mark-all-notifications-read"))
+
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["is_read"] is True
+
+
+@pytest.mark.django_db
+class TestUnreadNotificationCountView:
+    def _notify(self, user, record, count=1):
+        for _ in range(count):
+            Notification.objects.create(
+                recipient=user,
+                record=record,
+                notification_type=NotificationType.RECORD_ANNOTATED,
+                message="Unread",
+            )
+
+    def _unread(self, client):
+        response = client.get(reverse("notifications:unread-notification-count"))
+        assert response.status_code == status.HTTP_200_OK
+        return response.data["unread"]
+
+    def test_count_follows_reads_and_deletes(self, authenticated_patient_client, health_record):
+        user = authenticated_patient_client.user
+        assert self._unread(authenticated_patient_client) == 0
+
+        self._notify(user, health_record, 3)
+        assert self._unread(authenticated_patient_client) == 3
+
+        notification = Notification.objects.filter(recipient=user).first()
+        notification.mark_as_read()
+        notification.mark_as_read()
+        assert self._unread(authenticated_patient_client) == 2
+
+        authenticated_patient_client.post(reverse("notifications:mark-all-notifications-read"))
+        assert self._unread(authenticated_patient_client) == 0
+
+        self._notify(user, health_record, 2)
+        assert self._unread(authenticated_patient_client) == 2
+        authenticated_patient_client.delete(reverse("notifications:delete-all-notifications"))
+        assert self._unread(authenticated_patient_client) == 0
+
+    def test_count_does_not_count_rows(self, authenticated_patient_client, health_record):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._notify(authenticated_patient_client.user, health_record, 2)
+        self._unread(authenticated_patient_client)
+        authenticated_patient_client.post(reverse("notifications:mark-all-notifications-read"))
+
+        with CaptureQueriesContext(connection) as context:
+            assert self._unread(authenticated_patient_client) == 0
+        assert not any("COUNT(" in query["sql"].upper() for query in context.captured_queries)
+
+    def test_poll_is_not_modified_until_a_notification_changes(
+        self, authenticated_patient_client, health_record
+    ):
+        url = reverse("notifications:unread-notification-count")
+        etag = authenticated_patient_client.get(url)["ETag"]
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        self._notify(authenticated_patient_client.user, health_record)
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["unread"] == 1
+
+    def test_list_only_unread(self, authenticated_patient_client, health_record):
+        user = authenticated_patient_client.user
+        self._notify(user, health_record, 2)
+        Notification.objects.filter(recipient=user).first().mark_as_read()
+
+        response = authenticated_patient_client.get(reverse("notifications:notification-list"), {"unread": "true"})
+        assert [item["is_read"] for item in response.data] == [False]
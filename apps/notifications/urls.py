@@ -1,5 +1,7 @@
 from django.urls import path
 
+from apps.core.asyncviews import variant
+
 from . import views
 
 app_name = "notifications"
@@ -7,14 +9,31 @@ app_name = "notifications"
 urlpatterns = [
     path(
         "",
-        views.NotificationListView.as_view(),
+        variant(views.NotificationListView, views.AsyncNotificationListView).as_view(),
         name="notification-list",
     ),
+    path(
+        "stream/",
+        views.notification_stream,
+        name="notification-stream",
+    ),
+    path(
+        "unread-count/",
+        views.UnreadNotificationCountView.as_view(),
+        name="unread-notification-count",
+    ),
     path(
         "<uuid:pk>/",
-        views.NotificationDetailView.as_view(),
+        variant(
+            views.NotificationDetailView, views.AsyncNotificationDetailView
+        ).as_view(),
         name="notification-detail",
     ),
+    path(
+        "read-receipts/",
+        views.NotificationReadReceiptView.as_view(),
+        name="notification-read-receipts",
+    ),
     path(
         "mark-all-read/",
         views.MarkAllNotificationsReadView.as_view(),
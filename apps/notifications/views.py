@@ -1,60 +1,206 @@
+import json
+import uuid
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from drf_spectacular.utils import extend_schema
-from rest_framework import generics, permissions, status
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import exceptions, generics, permissions, status
 from rest_framework.response import Response
 
-from . import models, serializers
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.core import asyncviews, conditional
+from apps.core.identifiers import uuid7_time
+from apps.core.mixins import QueryPlanMixin
+from apps.core.pagination import KeysetPagination
 
+from . import counters, models, push, receipts, serializers
 
-@extend_schema(tags=["Notifications"])
-class NotificationListView(generics.ListAPIView):
+# Most missed notifications replayed to a reconnecting stream; older ones
+# are left to the notification list.
+STREAM_CATCH_UP_LIMIT = 100
+# How far before the client's last event the catch-up reaches back, to
+# cover notifications whose transactions committed late.
+STREAM_CATCH_UP_OVERLAP = timedelta(seconds=5)
+
+UNREAD_PARAMETER = OpenApiParameter(
+    "unread",
+    bool,
+    description="Only list unread notifications.",
+)
+
+EXPAND_PARAMETER = OpenApiParameter(
+    "expand",
+    str,
+    enum=["record"],
+    description="Embed the full health record in each notification.",
+)
+
+
+def expands_record(request):
+    """
+    Return whether the client asked for ``expand=record``.
+    """
+    return "record" in request.query_params.get("expand", "").split(",")
+
+
+@extend_schema(tags=["Notifications"], parameters=[EXPAND_PARAMETER, UNREAD_PARAMETER])
+class NotificationListView(
+    conditional.ConditionalGetMixin, QueryPlanMixin, generics.ListAPIView
+):
     """
     List all notifications for the authenticated user.
     
     Returns a paginated list of notifications ordered by creation date.
-    Includes related health record information. Does not automatically
-    mark notifications as read.
+    Each notification references its health record by id and type; pass
+    ``expand=record`` to embed the full record instead. Does not
+    automatically mark notifications as read.
+
+    Send ``cursor`` to page by keyset instead of page number.
     """
 
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated]
-    serializer_class = serializers.NotificationSerializer
+    version_scope = "notifications"
+
+    def get_serializer_class(self):
+        """
+        Embed the full health record only when it is asked for.
+        """
+        if expands_record(self.request):
+            return serializers.NotificationExpandedSerializer
+        return serializers.NotificationSerializer
 
     def get_queryset(self):
         """
         Filter notifications to only show those for the current user.
+
+        ``unread=true`` narrows the list to unread notifications, read from
+        the partial index on unread rows.
         """
-        return models.Notification.objects.filter(
-            recipient=self.request.user
-        ).select_related("record")
+        queryset = models.Notification.objects.filter(recipient=self.request.user)
+        if self.request.query_params.get("unread", "").lower() in ("true", "1"):
+            queryset = queryset.filter(is_read=False)
+        return queryset
 
 
 @extend_schema(tags=["Notifications"])
-class NotificationDetailView(generics.RetrieveAPIView):
+class UnreadNotificationCountView(
+    conditional.ConditionalGetMixin, generics.RetrieveAPIView
+):
+    """
+    Return how many unread notifications the authenticated user has.
+
+    Meant for polling a badge count. The figure comes from the user's
+    ``UnreadCounter`` rather than from counting rows, and repeated polls
+    with ``If-None-Match`` get a 304 until a notification changes.
     """
-    Retrieve a single notification and mark it as read.
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = serializers.UnreadCountSerializer
+    version_scope = "notifications"
+
+    def get_queryset(self):
+        """
+        Return the notifications the count covers.
+        """
+        return models.Notification.objects.filter(recipient=self.request.user)
+
+    def get_object(self):
+        """
+        Read the user's counter.
+        """
+        unread = (
+            models.UnreadCounter.objects.filter(user=self.request.user)
+            .values_list("unread", flat=True)
+            .first()
+        )
+        return {"unread": unread or 0}
+
+
+@extend_schema(tags=["Notifications"], parameters=[EXPAND_PARAMETER])
+class NotificationDetailView(
+    conditional.ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView
+):
+    """
+    Retrieve a single notification.
     
-    When a notification is retrieved through this endpoint, it is
-    automatically marked as read with the current timestamp.
+    Reading a notification does not mark it as read; send its id to the
+    read-receipts endpoint for that. Pass ``expand=record`` to embed the
+    full health record.
     """
     
     permission_classes = [permissions.IsAuthenticated]
-    serializer_class = serializers.NotificationSerializer
+    version_scope = "notifications"
+
+    def get_serializer_class(self):
+        """
+        Embed the full health record only when it is asked for.
+        """
+        if expands_record(self.request):
+            return serializers.NotificationExpandedSerializer
+        return serializers.NotificationSerializer
 
     def get_queryset(self):
         """
         Filter notifications to only show those for the current user.
         """
-        return models.Notification.objects.filter(
-            recipient=self.request.user
-        ).select_related("record")
+        return models.Notification.objects.filter(recipient=self.request.user)
 
-    def get_object(self):
+
+@extend_schema(tags=["Notifications"])
+class NotificationReadReceiptView(generics.GenericAPIView):
+    """
+    Mark many notifications as read at once.
+
+    Clients collect the ids of the notifications the user has seen and
+    send them together; they are applied with a single ``UPDATE``. Ids of
+    notifications that are already read or not the user's are skipped.
+    With ``NOTIFICATION_READ_RECEIPTS_REDIS_URL`` set, receipts are queued
+    and applied shortly after, and the response is ``202 Accepted``.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = serializers.ReadReceiptSerializer
+
+    @extend_schema(responses={200: serializers.ReadReceiptSerializer, 202: None})
+    def post(self, request, *args, **kwargs):
         """
-        Get the notification and mark it as read.
+        Mark the notifications as read, or queue the receipts.
         """
-        notification = super().get_object()
-        notification.mark_as_read()
-        return notification
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marked = receipts.submit(request.user.pk, serializer.validated_data["ids"])
+        if marked is None:
+            return Response(status=status.HTTP_202_ACCEPTED)
+        return Response(self.get_serializer({"marked": marked}).data)
+
+
+class AsyncNotificationListView(
+    conditional.AsyncConditionalGetMixin,
+    asyncviews.AsyncListModelMixin,
+    NotificationListView,
+):
+    """
+    ``NotificationListView`` reading through the async ORM.
+
+    Served instead of it when ``ASYNC_VIEWS`` is set.
+    """
+
+
+class AsyncNotificationDetailView(
+    conditional.AsyncConditionalGetMixin,
+    asyncviews.AsyncRetrieveModelMixin,
+    NotificationDetailView,
+):
+    """
+    ``NotificationDetailView`` reading through the async ORM.
+
+    Served instead of it when ``ASYNC_VIEWS`` is set.
+    """
 
 
 @extend_schema(tags=["Notifications"])
@@ -80,7 +226,10 @@ class MarkAllNotificationsReadView(generics.GenericAPIView):
         """
         Mark all unread notifications as read.
         """
-        self.get_queryset().update(is_read=True, read_at=timezone.now())
+        with transaction.atomic():
+            marked = self.get_queryset().update(is_read=True, read_at=timezone.now())
+            counters.adjust_unread({request.user.pk: -marked})
+        conditional.bump("notifications", request.user.pk)
         return Response(status=status.HTTP_200_OK)
 
 
@@ -105,5 +254,95 @@ class DeleteAllNotificationsView(generics.GenericAPIView):
         """
         Delete all notifications for the user.
         """
-        self.get_queryset().delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        with transaction.atomic():
+            _, deleted = self.get_queryset().filter(is_read=False).delete()
+            self.get_queryset().delete()
+            counters.adjust_unread(
+                {request.user.pk: -deleted.get(models.Notification._meta.label, 0)}
+            )
+        conditional.bump("notifications", request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _server_sent_event(event):
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: notification\ndata: {data}\n\n"
+
+
+async def _notification_events(user, last_event_id):
+    events = push.subscribe(user.pk)
+    try:
+        # Subscribe before catching up so nothing published in between is
+        # lost; live events already sent by the catch-up are skipped.
+        await events.__anext__()
+        yield "retry: 3000\n\n"
+        caught_up = set()
+        if last_event_id is not None:
+            # Ids are generated before commit, so a notification committed
+            # after the last one the client saw may have an older id. The
+            # catch-up starts a little before that id instead of right
+            # after it, and may resend a few notifications.
+            since = uuid7_time(last_event_id) - STREAM_CATCH_UP_OVERLAP
+            missed = (
+                models.Notification.objects.filter(
+                    recipient=user, created_at__gte=since
+                )
+                .exclude(id=last_event_id)
+                .order_by("created_at", "id")[:STREAM_CATCH_UP_LIMIT]
+            )
+            async for notification in missed:
+                yield _server_sent_event(push.event(notification))
+                caught_up.add(str(notification.pk))
+
+        async for event in events:
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event["id"] in caught_up:
+                caught_up.discard(event["id"])
+            else:
+                yield _server_sent_event(event)
+    finally:
+        await events.aclose()
+
+
+async def notification_stream(request):
+    """
+    Stream the authenticated user's new notifications as Server-Sent Events.
+
+    Each ``notification`` event carries the notification as JSON and its id
+    as the event id, so a client reconnecting with ``Last-Event-ID`` first
+    receives what it missed. The catch-up may repeat notifications from
+    the few seconds before that id; clients treat events with an id they
+    already have as duplicates. Comments are sent on idle connections to keep
+    them open. Only served under ASGI, where an open stream does not hold
+    a worker thread.
+    """
+    if not push.is_enabled():
+        return JsonResponse(
+            {"detail": "Notification push is not enabled."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    try:
+        authenticated = await sync_to_async(CachedJWTAuthentication().authenticate)(
+            request
+        )
+    except exceptions.AuthenticationFailed as exc:
+        return JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+    if authenticated is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    try:
+        last_event_id = uuid.UUID(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        _notification_events(authenticated[0], last_event_id),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,6 +1,7 @@
 from django.contrib import admin
+from django.db.models import Q
 
-from . import models
+from . import models, search
 
 
 class HealthRecordFileInline(admin.TabularInline):
@@ -44,6 +45,27 @@ class HealthRecordAdmin(admin.ModelAdmin):
 
     inlines = [HealthRecordFileInline, DoctorAnnotationInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search descriptions and notes through the full-text index.
+
+        A full email address matches the patient's or doctor's records. The
+        ``icontains`` lookups over ``search_fields`` are only used where
+        full-text search is not available.
+        """
+        search_term = search_term.strip()
+        if not search_term or not search.is_supported(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        matches = search.search(queryset, search_term).values("pk")
+        return (
+            queryset.filter(
+                Q(pk__in=matches)
+                | Q(patient__email=search_term)
+                | Q(doctor__email=search_term)
+            ),
+            False,
+        )
+
 
 @admin.register(models.HealthRecordFile)
 class HealthRecordFileAdmin(admin.ModelAdmin):
@@ -62,7 +84,9 @@ class HealthRecordFileAdmin(admin.ModelAdmin):
     )
 
     def file_name(self, obj):
-        return obj.file.name.split("/")[-1] if obj.file else "No file"
+        if not obj.file:
+            return "No file"
+        return obj.filename or obj.file.name.split("/")[-1]
 
     file_name.short_description = "File Name"
 
@@ -0,0 +1,29 @@
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.core import counters
+
+from .models import DoctorDashboard
+
+
+def adjust(deltas, using=DEFAULT_DB_ALIAS):
+    """
+    Add ``deltas``, a mapping of doctor id to ``{column: amount}``, to the
+    doctors' dashboards.
+    """
+    counters.adjust(DoctorDashboard, "doctor", deltas, using=using)
+
+
+def count_records(rows, sign=1, using=DEFAULT_DB_ALIAS):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) records from the dashboards.
+
+    ``rows`` are ``(doctor_id, record_type, has_annotations)`` tuples.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for doctor_id, record_type, has_annotations in rows:
+        deltas[doctor_id][DoctorDashboard.type_field(record_type)] += sign
+        if not has_annotations:
+            deltas[doctor_id]["unannotated_records"] += sign
+    adjust(deltas, using=using)
@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import os
+import shutil
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from .models import DoctorAnnotation, HealthRecord, HealthRecordFile
+
+# Records fetched per round trip. With prefetching, each chunk also costs
+# one query for its files and one for its annotations.
+CHUNK_SIZE = 500
+
+CSV_COLUMNS = [
+    "kind",
+    "record_id",
+    "id",
+    "created_at",
+    "record_type",
+    "doctor_email",
+    "text",
+    "filename",
+]
+
+
+def records(patient):
+    """
+    Iterate over every health record of ``patient``, oldest first.
+
+    Rows are read in ``CHUNK_SIZE`` batches through a server-side cursor
+    where the database supports one, so memory use does not grow with the
+    history.
+    """
+    return (
+        HealthRecord.objects.filter(patient=patient)
+        .select_related("doctor")
+        .prefetch_related(
+            Prefetch(
+                "files",
+                queryset=HealthRecordFile.objects.order_by("created_at").only(
+                    "id", "record_id", "filename", "file", "created_at"
+                ),
+            ),
+            Prefetch(
+                "annotations",
+                queryset=DoctorAnnotation.objects.order_by("created_at").only(
+                    "id", "record_id", "note", "created_at", "updated_at"
+                ),
+            ),
+        )
+        .order_by("created_at", "id")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _filename(record_file):
+    return record_file.filename or os.path.basename(record_file.file.name)
+
+
+def as_dict(record):
+    """
+    Return ``record`` with its doctor, file metadata and annotations.
+    """
+    return {
+        "id": record.pk,
+        "created_at": record.created_at,
+        "updated_at": record.updated_at,
+        "record_type": record.record_type,
+        "description": record.description,
+        "doctor": {
+            "id": record.doctor.pk,
+            "name": record.doctor.get_full_name(),
+            "email": record.doctor.email,
+        },
+        "files": [
+            {
+                "id": record_file.pk,
+                "filename": _filename(record_file),
+                "created_at": record_file.created_at,
+            }
+            for record_file in record.files.all()
+        ],
+        "annotations": [
+            {
+                "id": annotation.pk,
+                "note": annotation.note,
+                "created_at": annotation.created_at,
+                "updated_at": annotation.updated_at,
+            }
+            for annotation in record.annotations.all()
+        ],
+    }
+
+
+def ndjson(rows):
+    """
+    Yield each record as one line of JSON.
+    """
+    for record in rows:
+        yield json.dumps(as_dict(record), cls=DjangoJSONEncoder) + "\n"
+
+
+def csv_lines(rows):
+    """
+    Yield the records as CSV, one line per record, file and annotation.
+
+    Files and annotations follow the record they belong to and carry its
+    id in ``record_id``.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values):
+        writer.writerow(values)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    yield line(CSV_COLUMNS)
+    for record in rows:
+        yield line(
+            [
+                "record",
+                record.pk,
+                record.pk,
+                record.created_at.isoformat(),
+                record.record_type,
+                record.doctor.email,
+                record.description,
+                "",
+            ]
+        )
+        for record_file in record.files.all():
+            yield line(
+                [
+                    "file",
+                    record.pk,
+                    record_file.pk,
+                    record_file.created_at.isoformat(),
+                    "",
+                    "",
+                    "",
+                    _filename(record_file),
+                ]
+            )
+        for annotation in record.annotations.all():
+            yield line(
+                [
+                    "annotation",
+                    record.pk,
+                    annotation.pk,
+                    annotation.created_at.isoformat(),
+                    "",
+                    record.doctor.email,
+                    annotation.note,
+                    "",
+                ]
+            )
+
+
+def write_archive(patient, destination):
+    """
+    Write a zip of ``patient``'s history to the open binary ``destination``.
+
+    The archive holds ``records.ndjson`` and every file under
+    ``files/<record id>/<file id>-<name>``. Entries are streamed, so
+    neither the history nor any file is held in memory.
+    """
+    with zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("records.ndjson", "w", force_zip64=True) as entry:
+            for line in ndjson(records(patient)):
+                entry.write(line.encode())
+
+        files = (
+            HealthRecordFile.objects.filter(record__patient=patient)
+            .only("id", "record_id", "filename", "file")
+            .order_by("created_at", "id")
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        for record_file in files:
+            # Uploaded names are client-supplied; keep them inside the folder.
+            filename = os.path.basename(_filename(record_file))
+            name = f"files/{record_file.record_id}/{record_file.pk}-{filename}"
+            with (
+                record_file.file.open("rb") as source,
+                archive.open(name, "w", force_zip64=True) as entry,
+            ):
+                shutil.copyfileobj(source, entry, 1024 * 1024)
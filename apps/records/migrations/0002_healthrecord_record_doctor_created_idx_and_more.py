@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["doctor", "-created_at", "-id"],
+                name="record_doctor_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["patient", "-created_at", "-id"],
+                name="record_patient_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:51
+
+import apps.core.identifiers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0002_healthrecord_record_doctor_created_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="doctorannotation",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="healthrecord",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="healthrecordfile",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.identifiers.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
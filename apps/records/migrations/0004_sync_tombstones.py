@@ -0,0 +1,77 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:56
+
+import apps.core.identifiers
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0003_uuid7_primary_keys"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=apps.core.identifiers.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("record", "Health Record"),
+                            ("file", "File"),
+                            ("annotation", "Annotation"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("record_id", models.UUIDField()),
+                ("patient_id", models.UUIDField()),
+                ("doctor_id", models.UUIDField()),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["doctor", "updated_at", "id"], name="record_doctor_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["patient", "updated_at", "id"],
+                name="record_patient_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["patient_id", "created_at"],
+                name="tombstone_patient_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["doctor_id", "created_at"], name="tombstone_doctor_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:01
+
+import os
+
+import apps.core.identifiers
+import apps.records.storage
+from django.db import migrations, models
+from apps.records.storage import get_blob_storage
+
+
+def register_existing_files(apps, schema_editor):
+    # Files uploaded before this migration keep their names; give each one
+    # a blob with the number of rows sharing it so deleting the last row
+    # reclaims it, and remember the name it was uploaded under.
+    HealthRecordFile = apps.get_model("records", "HealthRecordFile")
+    FileBlob = apps.get_model("records", "FileBlob")
+    storage = get_blob_storage()
+
+    counts = (
+        HealthRecordFile.objects.values("file")
+        .annotate(references=models.Count("pk"))
+        .order_by()
+    )
+    for row in counts.iterator():
+        try:
+            size = storage.size(row["file"])
+        except OSError:
+            size = 0
+        FileBlob.objects.create(
+            name=row["file"], size=size, references=row["references"]
+        )
+    for record_file in HealthRecordFile.objects.only("pk", "file").iterator():
+        HealthRecordFile.objects.filter(pk=record_file.pk).update(
+            filename=os.path.basename(record_file.file.name)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0005_chunked_uploads"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileBlob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=apps.core.identifiers.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("size", models.PositiveBigIntegerField()),
+                ("references", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="healthrecordfile",
+            name="filename",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="healthrecordfile",
+            name="file",
+            field=models.FileField(
+                db_index=True,
+                storage=apps.records.storage.get_blob_storage,
+                upload_to="health_records/files/",
+            ),
+        ),
+        migrations.RunPython(register_existing_files, migrations.RunPython.noop),
+    ]
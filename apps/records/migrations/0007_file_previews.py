@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:03
+
+import apps.records.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0006_content_addressed_files"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="healthrecordfile",
+            name="preview",
+            field=models.FileField(
+                blank=True,
+                storage=apps.records.storage.get_blob_storage,
+                upload_to="health_records/previews/",
+            ),
+        ),
+        migrations.AddField(
+            model_name="healthrecordfile",
+            name="thumbnail",
+            field=models.FileField(
+                blank=True,
+                storage=apps.records.storage.get_blob_storage,
+                upload_to="health_records/previews/",
+            ),
+        ),
+    ]
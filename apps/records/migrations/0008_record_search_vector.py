@@ -0,0 +1,57 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:04
+
+import apps.core.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    HealthRecord = apps.get_model("records", "HealthRecord")
+    DoctorAnnotation = apps.get_model("records", "DoctorAnnotation")
+    SearchVector = django.contrib.postgres.search.SearchVector
+
+    notes = (
+        DoctorAnnotation.objects.filter(record=models.OuterRef("pk"))
+        .order_by()
+        .values("record")
+        .annotate(notes=StringAgg("note", " "))
+        .values("notes")
+    )
+    HealthRecord.objects.update(
+        search_vector=SearchVector("description", weight="A", config="english")
+        + SearchVector(
+            Coalesce(models.Subquery(notes), models.Value("")),
+            weight="B",
+            config="english",
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0007_file_previews"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="healthrecord",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=apps.core.indexes.PortableGinIndex(
+                fields=["search_vector"], name="record_search_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_has_annotations(apps, schema_editor):
+    HealthRecord = apps.get_model("records", "HealthRecord")
+    DoctorAnnotation = apps.get_model("records", "DoctorAnnotation")
+    HealthRecord.objects.update(
+        has_annotations=models.Exists(
+            DoctorAnnotation.objects.filter(record=models.OuterRef("pk"))
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0008_record_search_vector"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="healthrecord",
+            name="has_annotations",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(populate_has_annotations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["doctor", "record_type", "-created_at", "-id"],
+                name="record_doctor_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["patient", "record_type", "-created_at", "-id"],
+                name="record_patient_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["doctor", "patient", "-created_at", "-id"],
+                name="record_doctor_patient_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                fields=["patient", "doctor", "-created_at", "-id"],
+                name="record_patient_doctor_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="healthrecord",
+            index=models.Index(
+                condition=models.Q(("has_annotations", False)),
+                fields=["doctor", "-created_at", "-id"],
+                name="record_doctor_unannotated_idx",
+            ),
+        ),
+    ]
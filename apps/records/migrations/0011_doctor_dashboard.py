@@ -0,0 +1,74 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:14
+
+import apps.core.identifiers
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def count_records(apps, schema_editor):
+    HealthRecord = apps.get_model("records", "HealthRecord")
+    DoctorDashboard = apps.get_model("records", "DoctorDashboard")
+    dashboards = {}
+    rows = (
+        HealthRecord.objects.order_by()
+        .values("doctor", "record_type", "has_annotations")
+        .annotate(records=models.Count("id"))
+    )
+    for row in rows:
+        dashboard = dashboards.setdefault(
+            row["doctor"], DoctorDashboard(doctor_id=row["doctor"])
+        )
+        field = f"{row['record_type']}_records"
+        setattr(dashboard, field, getattr(dashboard, field) + row["records"])
+        if not row["has_annotations"]:
+            dashboard.unannotated_records += row["records"]
+    DoctorDashboard.objects.bulk_create(dashboards.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0010_record_exports"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DoctorDashboard",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=apps.core.identifiers.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("consultation_records", models.PositiveIntegerField(default=0)),
+                ("lab_result_records", models.PositiveIntegerField(default=0)),
+                ("prescription_records", models.PositiveIntegerField(default=0)),
+                ("imaging_records", models.PositiveIntegerField(default=0)),
+                ("procedure_records", models.PositiveIntegerField(default=0)),
+                ("general_records", models.PositiveIntegerField(default=0)),
+                ("unannotated_records", models.PositiveIntegerField(default=0)),
+                (
+                    "doctor",
+                    models.OneToOneField(
+                        limit_choices_to={"role": "doctor"},
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dashboard",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(count_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0011_doctor_dashboard"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tombstone",
+            name="patient_id",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["created_at"], name="tombstone_created_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0012_tombstone_retention"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fileupload",
+            name="completing_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
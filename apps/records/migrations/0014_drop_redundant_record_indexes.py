@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-17 04:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0013_upload_completing"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="healthrecord",
+            name="record_doctor_type_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="healthrecord",
+            name="record_patient_type_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="healthrecord",
+            name="record_doctor_patient_idx",
+        ),
+        migrations.AlterField(
+            model_name="healthrecord",
+            name="doctor",
+            field=models.ForeignKey(
+                db_index=False,
+                limit_choices_to={"role": "doctor"},
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="health_records_as_doctor",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="healthrecord",
+            name="patient",
+            field=models.ForeignKey(
+                db_index=False,
+                limit_choices_to={"role": "patient"},
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="health_records",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -1,8 +1,14 @@
+import os
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 
+from apps.core.indexes import PortableGinIndex
 from apps.core.models import BaseModel
 
+from .storage import get_blob_storage
+
 
 class RecordType(models.TextChoices):
     CONSULTATION = "consultation", "Consultation"
@@ -19,12 +25,16 @@ class HealthRecord(BaseModel):
         on_delete=models.CASCADE,
         related_name="health_records",
         limit_choices_to={"role": "patient"},
+        # Led by the (patient, ...) indexes below.
+        db_index=False,
     )
     doctor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="health_records_as_doctor",
         limit_choices_to={"role": "doctor"},
+        # Led by the (doctor, ...) indexes below.
+        db_index=False,
     )
     record_type = models.CharField(
         max_length=20,
@@ -33,6 +43,38 @@ class HealthRecord(BaseModel):
         db_index=True,
     )
     description = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    has_annotations = models.BooleanField(default=False, editable=False)
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            PortableGinIndex(fields=["search_vector"], name="record_search_idx"),
+            models.Index(
+                fields=["doctor", "-created_at", "-id"],
+                name="record_doctor_created_idx",
+            ),
+            models.Index(
+                fields=["patient", "-created_at", "-id"],
+                name="record_patient_created_idx",
+            ),
+            models.Index(
+                fields=["doctor", "updated_at", "id"],
+                name="record_doctor_updated_idx",
+            ),
+            models.Index(
+                fields=["patient", "updated_at", "id"],
+                name="record_patient_updated_idx",
+            ),
+            models.Index(
+                fields=["patient", "doctor", "-created_at", "-id"],
+                name="record_patient_doctor_idx",
+            ),
+            models.Index(
+                fields=["doctor", "-created_at", "-id"],
+                condition=models.Q(has_annotations=False),
+                name="record_doctor_unannotated_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Health Record of {self.patient.email} ({self.record_type})"
@@ -42,10 +84,108 @@ class HealthRecordFile(BaseModel):
     record = models.ForeignKey(
         HealthRecord, on_delete=models.CASCADE, related_name="files"
     )
-    file = models.FileField(upload_to="health_records/files/")
+    file = models.FileField(
+        upload_to="health_records/files/", storage=get_blob_storage, db_index=True
+    )
+    filename = models.CharField(max_length=255, blank=True)
+    thumbnail = models.FileField(
+        upload_to="health_records/previews/", storage=get_blob_storage, blank=True
+    )
+    preview = models.FileField(
+        upload_to="health_records/previews/", storage=get_blob_storage, blank=True
+    )
+
+    def __str__(self):
+        return f"File for {self.record} ({self.filename or self.file.name})"
+
+    def save(self, *args, **kwargs):
+        # The stored name is the content digest; keep the uploaded one.
+        if not self.filename and self.file and not self.file._committed:
+            self.filename = os.path.basename(self.file.name)
+        # Saving the file fields takes blob references; commit them only
+        # together with the row holding them.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class FileBlob(BaseModel):
+    """
+    A stored file content shared by every ``HealthRecordFile`` with the
+    same bytes, and how many of them refer to it.
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} ({self.references} references)"
+
+
+class FileUpload(BaseModel):
+    """
+    A file being uploaded to a health record in parts.
+
+    Parts are written to ``FILE_UPLOAD_PARTS_DIR`` as they arrive, in any
+    order and in parallel, and joined into a ``HealthRecordFile`` once all
+    of them are in.
+    """
+
+    record = models.ForeignKey(
+        HealthRecord, on_delete=models.CASCADE, related_name="uploads"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    part_size = models.PositiveIntegerField()
+    file = models.OneToOneField(
+        HealthRecordFile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload",
+    )
+    completing_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} to {self.record_id}"
+
+    @property
+    def part_count(self):
+        return max(1, -(-self.size // self.part_size))
+
+    @property
+    def parts_dir(self):
+        return os.path.join(settings.FILE_UPLOAD_PARTS_DIR, str(self.pk))
+
+    def part_path(self, number):
+        return os.path.join(self.parts_dir, str(number))
+
+    def expected_part_size(self, number):
+        """
+        Return the size part ``number`` must have; only the last may be short.
+        """
+        if number < self.part_count:
+            return self.part_size
+        return self.size - self.part_size * (self.part_count - 1)
+
+
+class FileUploadPart(BaseModel):
+    upload = models.ForeignKey(
+        FileUpload, on_delete=models.CASCADE, related_name="parts"
+    )
+    number = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+
+    class Meta(BaseModel.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["upload", "number"], name="upload_part_number_unique"
+            ),
+        ]
 
     def __str__(self):
-        return f"File for {self.record} ({self.file.name})"
+        return f"Part {self.number} of {self.upload}"
 
 
 class DoctorAnnotation(BaseModel):
@@ -56,3 +196,106 @@ class DoctorAnnotation(BaseModel):
 
     def __str__(self):
         return f"Annotated by {self.record.doctor.get_full_name()} on {self.record_id} at ({self.created_at})"
+
+
+class TombstoneKind(models.TextChoices):
+    RECORD = "record", "Health Record"
+    FILE = "file", "File"
+    ANNOTATION = "annotation", "Annotation"
+
+
+class Tombstone(BaseModel):
+    """
+    Marker left behind when a record, file or annotation is deleted, so sync
+    clients can drop their copy.
+
+    The owners are stored as plain ids rather than foreign keys so the
+    marker outlives a deleted account and the other party still learns
+    about the records that went with it. A record moved to another doctor
+    leaves a marker for the previous doctor only, without a patient.
+    Markers are pruned after ``SYNC_TOMBSTONE_RETENTION_DAYS``.
+    """
+
+    kind = models.CharField(max_length=20, choices=TombstoneKind.choices)
+    object_id = models.UUIDField()
+    record_id = models.UUIDField()
+    patient_id = models.UUIDField(null=True, blank=True)
+    doctor_id = models.UUIDField()
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["patient_id", "created_at"],
+                name="tombstone_patient_created_idx",
+            ),
+            models.Index(
+                fields=["doctor_id", "created_at"],
+                name="tombstone_doctor_created_idx",
+            ),
+            models.Index(fields=["created_at"], name="tombstone_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id}"
+
+
+class ExportStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    READY = "ready", "Ready"
+    FAILED = "failed", "Failed"
+
+
+class RecordExport(BaseModel):
+    """
+    A zipped archive of a patient's whole health history, files included,
+    built in the background.
+    """
+
+    patient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="record_exports",
+        limit_choices_to={"role": "patient"},
+    )
+    status = models.CharField(
+        max_length=20, choices=ExportStatus.choices, default=ExportStatus.PENDING
+    )
+    archive = models.FileField(upload_to="health_records/exports/", blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Export of {self.patient_id} ({self.status})"
+
+
+class DoctorDashboard(BaseModel):
+    """
+    Counts shown on a doctor's home screen, kept up to date in the same
+    transaction as the record and annotation writes they summarize.
+
+    There is one ``<record type>_records`` column per ``RecordType``.
+    Unread notifications are counted by ``notifications.UnreadCounter``.
+    """
+
+    doctor = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="dashboard",
+        limit_choices_to={"role": "doctor"},
+    )
+    consultation_records = models.PositiveIntegerField(default=0)
+    lab_result_records = models.PositiveIntegerField(default=0)
+    prescription_records = models.PositiveIntegerField(default=0)
+    imaging_records = models.PositiveIntegerField(default=0)
+    procedure_records = models.PositiveIntegerField(default=0)
+    general_records = models.PositiveIntegerField(default=0)
+    unannotated_records = models.PositiveIntegerField(default=0)
+
+    @staticmethod
+    def type_field(record_type):
+        """
+        Return the column counting records of ``record_type``.
+        """
+        return f"{record_type}_records"
+
+    def __str__(self):
+        return f"Dashboard of {self.doctor_id}"
@@ -0,0 +1,64 @@
+import io
+
+import pypdfium2
+from PIL import Image, UnidentifiedImageError
+
+PDF_SIGNATURE = b"%PDF-"
+
+# Render the first PDF page at this scale (72 dpi * scale) before
+# downscaling; enough detail for the largest preview.
+PDF_RENDER_SCALE = 2
+
+
+def _open_image(file):
+    """
+    Return the file as a PIL image, or ``None`` if it is neither an image
+    nor a PDF that can be read.
+    """
+    file.seek(0)
+    if file.read(len(PDF_SIGNATURE)) == PDF_SIGNATURE:
+        file.seek(0)
+        try:
+            document = pypdfium2.PdfDocument(file)
+        except pypdfium2.PdfiumError:
+            return None
+        try:
+            if not len(document):
+                return None
+            return document[0].render(scale=PDF_RENDER_SCALE).to_pil()
+        except pypdfium2.PdfiumError:
+            return None
+        finally:
+            document.close()
+
+    file.seek(0)
+    try:
+        image = Image.open(file)
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+    return image
+
+
+def _encode(image, size):
+    image = image.copy()
+    image.thumbnail((size, size))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=80, optimize=True)
+    return buffer.getvalue()
+
+
+def render(file, sizes):
+    """
+    Render downscaled JPEGs of ``file``.
+
+    ``sizes`` maps a name to the longest side of the image to produce.
+    Images are scaled directly; PDFs by their first page. Returns ``None``
+    for anything else.
+    """
+    image = _open_image(file)
+    if image is None:
+        return None
+    return {name: _encode(image, size) for name, size in sizes.items()}
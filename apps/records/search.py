@@ -0,0 +1,96 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_CONFIG = "english"
+
+
+def is_supported(using):
+    """
+    Return whether the ``using`` database has full-text search.
+    """
+    return connections[using].vendor == "postgresql"
+
+
+def search_vector():
+    """
+    Return the expression computing a record's ``search_vector``.
+
+    The description is weighted above the notes of the record's
+    annotations, so records described by the terms rank first.
+    """
+    from .models import DoctorAnnotation
+
+    notes = (
+        DoctorAnnotation.objects.filter(record=OuterRef("pk"))
+        .order_by()
+        .values("record")
+        .annotate(notes=StringAgg("note", " "))
+        .values("notes")
+    )
+    return SearchVector("description", weight="A", config=SEARCH_CONFIG) + SearchVector(
+        Coalesce(Subquery(notes), Value("")), weight="B", config=SEARCH_CONFIG
+    )
+
+
+def vector_update(using):
+    """
+    Return the ``update()`` keyword arguments refreshing ``search_vector``.
+
+    Empty where full-text search is not supported, so callers can fold the
+    refresh into an update they make anyway.
+    """
+    if not is_supported(using):
+        return {}
+    return {"search_vector": search_vector()}
+
+
+def search(queryset, text):
+    """
+    Filter ``queryset`` to records matching ``text``, best matches first.
+
+    On PostgreSQL ``text`` is parsed like a web search query and matched
+    against the GIN-indexed ``search_vector``; elsewhere the description
+    and annotation notes are scanned for it.
+    """
+    if not is_supported(queryset.db):
+        return queryset.filter(
+            Q(description__icontains=text) | Q(annotations__note__icontains=text)
+        ).distinct()
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-created_at")
+    )
+
+
+class RecordSearchFilter(BaseFilterBackend):
+    """
+    Filter health records by the ``q`` query parameter.
+
+    Results are ordered by relevance, unless they are paged with ``cursor``,
+    which keeps its newest-first order.
+    """
+
+    search_param = "q"
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "").strip()
+        if not text:
+            return queryset
+        return search(queryset, text)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Search descriptions and annotation notes.",
+                "schema": {"type": "string"},
+            }
+        ]
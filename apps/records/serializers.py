@@ -1,28 +1,61 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.urls import reverse
 from rest_framework import serializers
 from rest_framework.serializers import CurrentUserDefault
 
 from apps.accounts import serializers as account_serializers
 
-from . import models
+from . import models, signals, tasks
 
 User = get_user_model()
 
 
+class DownloadURLField(serializers.FileField):
+    """
+    File field rendered as the authorization-checked download URL.
+
+    Media files are not served publicly, so the storage URL would not
+    work for clients.
+    """
+
+    def __init__(self, view_name="records:health-record-file-download", **kwargs):
+        self.view_name = view_name
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = reverse(self.view_name, kwargs={"pk": value.instance.pk})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+
 class HealthRecordFileSerializer(serializers.ModelSerializer):
     """
     Serializer for health record file uploads.
 
     Handles file information for health records. Used for both
-    displaying existing files and handling new uploads.
+    displaying existing files and handling new uploads. ``thumbnail`` and
+    ``preview`` stay null until they have been generated.
     """
 
+    file = DownloadURLField()
+    thumbnail = DownloadURLField(
+        view_name="records:health-record-file-thumbnail", read_only=True
+    )
+    preview = DownloadURLField(
+        view_name="records:health-record-file-preview", read_only=True
+    )
+
     class Meta:
         model = models.HealthRecordFile
         fields = [
             "id",
             "file",
+            "thumbnail",
+            "preview",
         ]
 
 
@@ -105,12 +138,197 @@ class HealthRecordWriteSerializer(serializers.ModelSerializer):
         files = validated_data.pop("files", [])
         with transaction.atomic():
             record = super().create(validated_data)
-            models.HealthRecordFile.objects.bulk_create(
-                models.HealthRecordFile(record=record, file=file) for file in files
+            record_files = models.HealthRecordFile.objects.bulk_create(
+                models.HealthRecordFile(record=record, file=file, filename=file.name)
+                for file in files
             )
+            tasks.schedule_previews(record_file.pk for record_file in record_files)
             return record
 
 
+class HealthRecordImportSerializer(serializers.ModelSerializer):
+    """
+    One record in a bulk import.
+
+    The doctor is taken as a plain id here and resolved for the whole
+    batch by ``HealthRecordBulkCreateSerializer``.
+    """
+
+    doctor = serializers.UUIDField()
+
+    class Meta:
+        model = models.HealthRecord
+        fields = [
+            "doctor",
+            "record_type",
+            "description",
+        ]
+
+
+class HealthRecordBulkCreateSerializer(serializers.Serializer):
+    """
+    Write serializer for importing many health records at once.
+
+    Doctors are looked up with one query for the whole batch and the
+    records are inserted with a single ``bulk_create``.
+    """
+
+    records = HealthRecordImportSerializer(
+        many=True, allow_empty=False, max_length=settings.RECORD_BULK_CREATE_MAX
+    )
+    patient = serializers.HiddenField(default=CurrentUserDefault())
+
+    def validate_records(self, records):
+        """
+        Resolve every doctor id in one query.
+        """
+        doctor_ids = {record["doctor"] for record in records}
+        doctors = User.objects.filter(pk__in=doctor_ids, role="doctor").in_bulk()
+        errors = [
+            {}
+            if record["doctor"] in doctors
+            else {
+                "doctor": [f'Invalid pk "{record["doctor"]}" - object does not exist.']
+            }
+            for record in records
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        for record in records:
+            record["doctor"] = doctors[record["doctor"]]
+        return records
+
+    def create(self, validated_data):
+        """
+        Insert the records and notify each doctor once.
+        """
+        patient = validated_data["patient"]
+        with transaction.atomic():
+            records = models.HealthRecord.objects.bulk_create(
+                models.HealthRecord(patient=patient, **record)
+                for record in validated_data["records"]
+            )
+            signals.records_created(records, models.HealthRecord.objects.db)
+        return records
+
+
+class RecordExportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for background exports of a patient's health history.
+
+    ``archive`` links to the zip once ``status`` is ``ready``.
+    """
+
+    archive = DownloadURLField(
+        view_name="records:record-export-download", read_only=True
+    )
+
+    class Meta:
+        model = models.RecordExport
+        fields = [
+            "id",
+            "status",
+            "archive",
+            "created_at",
+            "completed_at",
+        ]
+        read_only_fields = fields
+
+
+class DoctorDashboardSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for a doctor's dashboard counts.
+
+    ``records_by_type`` has an entry for every record type, including those
+    with no records.
+    """
+
+    total_records = serializers.SerializerMethodField()
+    records_by_type = serializers.SerializerMethodField()
+    unread_notifications = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = models.DoctorDashboard
+        fields = [
+            "total_records",
+            "records_by_type",
+            "unannotated_records",
+            "unread_notifications",
+        ]
+        read_only_fields = fields
+
+    def get_records_by_type(self, dashboard) -> dict[str, int]:
+        return {
+            record_type: getattr(dashboard, dashboard.type_field(record_type))
+            for record_type in models.RecordType.values
+        }
+
+    def get_total_records(self, dashboard) -> int:
+        return sum(self.get_records_by_type(dashboard).values())
+
+
+class FileUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for starting and inspecting chunked file uploads.
+
+    The client declares the file name and total size; the server answers
+    with the part size to use and, while the upload is open, the numbers
+    of the parts it has received.
+    """
+
+    class RecordPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+        """
+        Custom field that limits record choices to the patient's own.
+        """
+
+        def get_queryset(self):
+            """
+            Filter health records to those of the requesting patient.
+            """
+            return super().get_queryset().filter(patient=self.context["request"].user)
+
+    record = RecordPrimaryKeyRelatedField(queryset=models.HealthRecord.objects)
+    size = serializers.IntegerField(
+        min_value=1, max_value=settings.FILE_UPLOAD_MAX_SIZE
+    )
+    part_count = serializers.IntegerField(read_only=True)
+    parts = serializers.SlugRelatedField(slug_field="number", many=True, read_only=True)
+    file = HealthRecordFileSerializer(read_only=True)
+
+    class Meta:
+        model = models.FileUpload
+        fields = [
+            "id",
+            "record",
+            "filename",
+            "size",
+            "part_size",
+            "part_count",
+            "parts",
+            "completed_at",
+            "file",
+        ]
+        read_only_fields = ["part_size", "completed_at"]
+
+    def create(self, validated_data):
+        """
+        Open the upload with the configured part size.
+        """
+        validated_data["part_size"] = settings.FILE_UPLOAD_PART_SIZE
+        return super().create(validated_data)
+
+
+class FileUploadPartSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for a received upload part.
+    """
+
+    class Meta:
+        model = models.FileUploadPart
+        fields = ["number", "size"]
+        read_only_fields = fields
+
+
 class AnnotationWriteSerializer(serializers.ModelSerializer):
     """
     Serializer for doctors to create annotations.
@@ -127,8 +345,16 @@ class AnnotationWriteSerializer(serializers.ModelSerializer):
         def get_queryset(self):
             """
             Filter health records to only those assigned to the requesting doctor.
+
+            The doctor is joined in so the annotation notification can name
+            them without another query.
             """
-            return super().get_queryset().filter(doctor=self.context["request"].user)
+            return (
+                super()
+                .get_queryset()
+                .filter(doctor=self.context["request"].user)
+                .select_related("doctor")
+            )
 
     record = RecordPrimaryKeyRelatedField(queryset=models.HealthRecord.objects)
 
@@ -159,3 +385,28 @@ class AnnotationListSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = fields
+
+
+class DeletedObjectsSerializer(serializers.Serializer):
+    """
+    Ids of records, files and annotations deleted since a sync token.
+    """
+
+    records = serializers.ListField(child=serializers.UUIDField())
+    files = serializers.ListField(child=serializers.UUIDField())
+    annotations = serializers.ListField(child=serializers.UUIDField())
+
+
+class HealthRecordSyncSerializer(serializers.Serializer):
+    """
+    Read-only serializer for a page of sync changes.
+
+    Changed records are sent whole, deletions as ids, and ``token`` is
+    passed back to fetch the next changes. ``has_more`` is set while
+    changes remain to be fetched with that token.
+    """
+
+    records = HealthRecordSerializer(many=True)
+    deleted = DeletedObjectsSerializer()
+    token = serializers.CharField()
+    has_more = serializers.BooleanField()
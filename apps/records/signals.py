@@ -1,10 +1,25 @@
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from apps.notifications import models as notification_models
-from apps.notifications.tasks import send_notification_email
+from apps.core import conditional, db
+from apps.notifications import outbox
+from apps.notifications.models import NotificationType
 
-from .models import DoctorAnnotation, HealthRecord
+from . import dashboard, search, tasks, uploads
+from .models import (
+    DoctorAnnotation,
+    FileUpload,
+    HealthRecord,
+    HealthRecordFile,
+    RecordExport,
+    Tombstone,
+    TombstoneKind,
+)
 
 
 @receiver(post_save, sender=HealthRecord)
@@ -13,26 +28,340 @@ def notify_doctor_on_health_record_creation(sender, instance, created, **kwargs)
     Send notification to doctor when a new health record is created
     """
     if created:
-        notification = notification_models.Notification.objects.create(
-            recipient=instance.doctor,
-            record=instance,
-            notification_type=notification_models.NotificationType.PATIENT_ASSIGNED,
+        outbox.notify(
+            recipient_id=instance.doctor_id,
+            record_id=instance.pk,
+            notification_type=NotificationType.PATIENT_ASSIGNED,
             message=f"New health record created by patient {instance.patient.get_full_name()}",
         )
-        send_notification_email.delay(notification.id)
 
 
 @receiver(post_save, sender=DoctorAnnotation)
-def notify_patient_on_annotation(sender, instance, created, **kwargs):
+def notify_patient_on_annotation(sender, instance, created, using, **kwargs):
     """
     Send notification to patient when doctor adds an annotation
-    Only notify if the annotation is not internal
+
+    Saving the annotation never loads its record or doctor. Unless the
+    caller has loaded both, as the annotation API does, the records
+    annotated in a transaction are looked up together on commit.
+    """
+    if not created:
+        return
+    record = instance.record if DoctorAnnotation.record.is_cached(instance) else None
+    if record is not None and HealthRecord.doctor.is_cached(record):
+        _notify_annotated(record, using)
+    elif transaction.get_connection(using).in_atomic_block:
+        db.commit_buffer(
+            "annotated_records",
+            list,
+            partial(notify_annotated, using=using),
+            using=using,
+        ).append(instance.record_id)
+    else:
+        notify_annotated([instance.record_id], using=using)
+
+
+def notify_annotated(record_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Notify patients of one annotation per entry of ``record_ids``, loading
+    the records and their doctors in one query.
+    """
+    if not record_ids:
+        return
+    records = (
+        HealthRecord.objects.using(using)
+        .filter(pk__in=record_ids)
+        .select_related("doctor")
+        .in_bulk()
+    )
+    with transaction.atomic(using=using):
+        for record_id in record_ids:
+            if record_id in records:
+                _notify_annotated(records[record_id], using)
+    record_ids.clear()
+
+
+def _notify_annotated(record, using):
+    outbox.notify(
+        recipient_id=record.patient_id,
+        record_id=record.pk,
+        notification_type=NotificationType.RECORD_ANNOTATED,
+        message=f"Dr. {record.doctor.get_full_name()} has annotated health record: {record.pk}",
+        using=using,
+    )
+
+
+def records_created(records, using):
+    """
+    Do for records inserted with ``bulk_create`` what the ``post_save``
+    receivers do for one record.
+
+    Search vectors and dashboards are updated with one ``UPDATE`` each and
+    each doctor gets a single notification covering all of their new
+    records rather than one per record.
+    """
+    refresh = search.vector_update(using)
+    if refresh:
+        HealthRecord.objects.using(using).filter(
+            pk__in=[record.pk for record in records]
+        ).update(**refresh)
+
+    by_doctor = {}
+    for record in records:
+        by_doctor.setdefault(record.doctor_id, []).append(record)
+    for doctor_id, doctor_records in by_doctor.items():
+        patient = doctor_records[0].patient
+        if len(doctor_records) == 1:
+            message = f"New health record created by patient {patient.get_full_name()}"
+        else:
+            message = (
+                f"{len(doctor_records)} new health records imported by patient "
+                f"{patient.get_full_name()}"
+            )
+        outbox.notify(
+            recipient_id=doctor_id,
+            record_id=doctor_records[-1].pk,
+            notification_type=NotificationType.PATIENT_ASSIGNED,
+            message=message,
+            using=using,
+        )
+
+    dashboard.count_records(
+        (
+            (record.doctor_id, record.record_type, record.has_annotations)
+            for record in records
+        ),
+        using=using,
+    )
+    patient_ids = {record.patient_id for record in records}
+    conditional.bump("records", *patient_ids, *by_doctor, using=using)
+    conditional.bump("notifications", *patient_ids, *by_doctor, using=using)
+
+
+def _bump_record_versions(*owner_ids):
+    # Notifications embed the record when expanded and cascade with it, so
+    # both collections of every party go stale together.
+    conditional.bump("records", *owner_ids)
+    conditional.bump("notifications", *owner_ids)
+
+
+@receiver(post_save, sender=HealthRecord)
+def bump_record_version(sender, instance, using, **kwargs):
+    """
+    Refresh the record's search vector and retire cached pages showing it,
+    including those of the doctor it was reassigned from.
+    """
+    refresh = search.vector_update(using)
+    if refresh:
+        HealthRecord.objects.using(using).filter(pk=instance.pk).update(**refresh)
+    owner_ids = {instance.patient_id, instance.doctor_id}
+    previous = None if kwargs.get("created") else getattr(instance, "_previous", None)
+    if previous is not None:
+        owner_ids.add(previous[0])
+    _bump_record_versions(*owner_ids)
+
+
+DASHBOARD_FIELDS = ("doctor_id", "record_type", "has_annotations")
+
+
+@receiver(pre_save, sender=HealthRecord)
+def load_previous_record(sender, instance, raw, using, **kwargs):
+    """
+    Remember what an existing record counted towards on the dashboard.
+
+    ``has_annotations`` is maintained with ``UPDATE``s, so the stored
+    value also replaces a possibly stale one on the instance.
+    """
+    if raw or instance._state.adding:
+        return
+    instance._previous = (
+        HealthRecord.objects.using(using)
+        .filter(pk=instance.pk)
+        .values_list(*DASHBOARD_FIELDS)
+        .first()
+    )
+    if instance._previous is not None:
+        instance.has_annotations = instance._previous[2]
+
+
+@receiver(post_save, sender=HealthRecord)
+def count_record_on_dashboard(sender, instance, created, raw, using, **kwargs):
+    """
+    Count a new record, or move a reassigned or retyped one, on the
+    doctors' dashboards.
+    """
+    if raw:
+        return
+    current = (instance.doctor_id, instance.record_type, instance.has_annotations)
+    previous = None if created else getattr(instance, "_previous", None)
+    if previous == current:
+        return
+    if previous is not None:
+        dashboard.count_records([previous], sign=-1, using=using)
+    dashboard.count_records([current], using=using)
+
+
+@receiver(pre_delete, sender=HealthRecord)
+def uncount_record_on_dashboard(sender, instance, using, **kwargs):
+    """
+    Take a deleted record off its doctor's dashboard.
+    """
+    row = (
+        HealthRecord.objects.using(using)
+        .filter(pk=instance.pk)
+        .values_list(*DASHBOARD_FIELDS)
+        .first()
+    )
+    if row is not None:
+        dashboard.count_records([row], sign=-1, using=using)
+
+
+@receiver(post_delete, sender=HealthRecord)
+def leave_record_tombstone(sender, instance, **kwargs):
+    """
+    Record the deletion for sync clients and retire cached pages.
+    """
+    Tombstone.objects.create(
+        kind=TombstoneKind.RECORD,
+        object_id=instance.pk,
+        record_id=instance.pk,
+        patient_id=instance.patient_id,
+        doctor_id=instance.doctor_id,
+    )
+    _bump_record_versions(instance.patient_id, instance.doctor_id)
+
+
+@receiver(post_save, sender=HealthRecord)
+def leave_reassigned_record_tombstone(sender, instance, created, raw, **kwargs):
+    """
+    Tell the doctor a record was moved away from to drop their copy.
+    """
+    previous = None if created or raw else getattr(instance, "_previous", None)
+    if previous is None or previous[0] == instance.doctor_id:
+        return
+    Tombstone.objects.create(
+        kind=TombstoneKind.RECORD,
+        object_id=instance.pk,
+        record_id=instance.pk,
+        doctor_id=previous[0],
+    )
+
+
+def _touch_record(instance):
+    """
+    Mark the record a file or annotation belongs to as changed.
+
+    Bumping ``updated_at`` puts the record in the next sync and retires
+    its cached pages; annotation changes also refresh its search vector,
+    ``has_annotations`` and the doctor's unannotated count. Returns the
+    record's ``(patient_id, doctor_id)``, or ``None`` if the record is gone.
+    """
+    changes = {"updated_at": timezone.now()}
+    with transaction.atomic():
+        if isinstance(instance, DoctorAnnotation):
+            # The row lock makes concurrent annotation changes on the record
+            # see each other, so the flag flips, and is counted, once.
+            row = (
+                HealthRecord.objects.select_for_update()
+                .filter(pk=instance.record_id)
+                .values_list("patient_id", "doctor_id", "has_annotations")
+                .first()
+            )
+            if row is None:
+                return None
+            owners, had_annotations = row[:2], row[2]
+            has_annotations = DoctorAnnotation.objects.filter(
+                record_id=instance.record_id
+            ).exists()
+            if has_annotations != had_annotations:
+                dashboard.adjust(
+                    {owners[1]: {"unannotated_records": -1 if has_annotations else 1}}
+                )
+            changes["has_annotations"] = has_annotations
+            changes.update(search.vector_update(HealthRecord.objects.db))
+        elif type(instance).record.is_cached(instance):
+            owners = (instance.record.patient_id, instance.record.doctor_id)
+        else:
+            owners = (
+                HealthRecord.objects.filter(pk=instance.record_id)
+                .values_list("patient_id", "doctor_id")
+                .first()
+            )
+            if owners is None:
+                return None
+        HealthRecord.objects.filter(pk=instance.record_id).update(**changes)
+    _bump_record_versions(*owners)
+    return owners
+
+
+@receiver(post_save, sender=HealthRecordFile)
+@receiver(post_save, sender=DoctorAnnotation)
+def touch_record_on_child_save(sender, instance, **kwargs):
+    """
+    Mark the record as changed when a file or annotation is saved.
+    """
+    _touch_record(instance)
+
+
+@receiver(post_delete, sender=HealthRecordFile)
+@receiver(post_delete, sender=DoctorAnnotation)
+def leave_child_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Record the deletion of a file or annotation for sync clients.
+
+    Children deleted along with their record are covered by the record's
+    own tombstone.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin is not None and origin_model is not sender:
+        return
+    owners = _touch_record(instance)
+    if owners is None:
+        return
+    Tombstone.objects.create(
+        kind=TombstoneKind.FILE
+        if sender is HealthRecordFile
+        else TombstoneKind.ANNOTATION,
+        object_id=instance.pk,
+        record_id=instance.record_id,
+        patient_id=owners[0],
+        doctor_id=owners[1],
+    )
+
+
+@receiver(post_save, sender=HealthRecordFile)
+def schedule_file_previews(sender, instance, created, **kwargs):
+    """
+    Generate previews of a new file once it is committed.
     """
     if created:
-        notification = notification_models.Notification.objects.create(
-            recipient=instance.record.patient,
-            record=instance.record,
-            notification_type=notification_models.NotificationType.RECORD_ANNOTATED,
-            message=f"Dr. {instance.record.doctor.get_full_name()} has annotated health record: {instance.record_id}",
+        tasks.schedule_previews([instance.pk])
+
+
+@receiver(post_delete, sender=HealthRecordFile)
+def release_file_blob(sender, instance, **kwargs):
+    """
+    Drop the references of the file and its previews to their content.
+    """
+    for field_file in (instance.file, instance.thumbnail, instance.preview):
+        if field_file:
+            field_file.storage.release(field_file.name)
+
+
+@receiver(post_delete, sender=FileUpload)
+def discard_upload_parts(sender, instance, **kwargs):
+    """
+    Remove the parts of an abandoned upload from disk.
+    """
+    transaction.on_commit(partial(uploads.discard_parts, instance.parts_dir))
+
+
+@receiver(post_delete, sender=RecordExport)
+def delete_export_archive(sender, instance, **kwargs):
+    """
+    Remove the archive of a deleted export once the deletion commits.
+    """
+    if instance.archive:
+        transaction.on_commit(
+            partial(instance.archive.storage.delete, instance.archive.name)
         )
-        send_notification_email.delay(notification.id)
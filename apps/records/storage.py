@@ -0,0 +1,136 @@
+import hashlib
+import os
+import uuid
+from functools import partial
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+BLOB_PREFIX = "health_records/blobs"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that keeps one copy of each distinct content.
+
+    Files are named after the SHA-256 of their bytes. Saving content that is
+    already stored writes nothing and adds a reference to the existing
+    blob in ``FileBlob``; ``release`` drops a reference and the blob is
+    deleted once none are left. The name a file was uploaded under is not
+    kept here, so models store it alongside.
+
+    References are taken in the caller's transaction, so they are rolled
+    back with the row that would have held them. Contents written by a
+    transaction that rolled back stay on disk until ``delete_orphans``.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Equal names mean equal content, so an existing file is reused
+        # rather than renamed.
+        return name
+
+    def _save(self, name, content):
+        from .models import FileBlob
+
+        digest = getattr(content, "sha256", None)
+        if digest is None:
+            digest = hashlib.sha256()
+            for chunk in content.chunks():
+                digest.update(chunk)
+            digest = digest.hexdigest()
+        size = content.size
+        name = f"{BLOB_PREFIX}/{digest[:2]}/{digest}"
+
+        # The row lock orders this against ``reclaim`` of the same blob, so
+        # a reference is never added to a blob that is being deleted.
+        with transaction.atomic(savepoint=False):
+            blob, created = FileBlob.objects.select_for_update().get_or_create(
+                name=name, defaults={"size": size}
+            )
+            FileBlob.objects.filter(pk=blob.pk).update(references=F("references") + 1)
+            if created or not self.exists(name):
+                self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if hasattr(content, "temporary_file_path"):
+            file_move_safe(
+                content.temporary_file_path(), full_path, allow_overwrite=True
+            )
+        else:
+            temporary_path = f"{full_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(temporary_path, "wb") as destination:
+                    for chunk in content.chunks():
+                        destination.write(chunk)
+                os.replace(temporary_path, full_path)
+            finally:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def release(self, name):
+        """
+        Drop one reference to the blob ``name``.
+
+        The blob is reclaimed after the transaction commits if this was
+        its last reference.
+        """
+        from .models import FileBlob
+
+        FileBlob.objects.filter(name=name, references__gt=0).update(
+            references=F("references") - 1
+        )
+        transaction.on_commit(partial(self.reclaim, name))
+
+    def reclaim(self, name):
+        """
+        Delete the blob ``name`` if nothing references it any more.
+        """
+        from .models import FileBlob
+
+        with transaction.atomic():
+            blob = (
+                FileBlob.objects.select_for_update()
+                .filter(name=name, references=0)
+                .first()
+            )
+            if blob is not None:
+                self.delete(name)
+                blob.delete()
+
+    def delete_orphans(self, before):
+        """
+        Delete stored contents without a ``FileBlob`` row that were last
+        written before ``before``. Returns their names.
+        """
+        from .models import FileBlob
+
+        deleted = []
+        # Blobs are spread over directories by digest prefix; check one
+        # directory at a time.
+        for directory, _, filenames in os.walk(self.path(BLOB_PREFIX)):
+            prefix = os.path.relpath(directory, self.location).replace(os.sep, "/")
+            names = [f"{prefix}/{filename}" for filename in filenames]
+            known = set(
+                FileBlob.objects.filter(name__in=names).values_list("name", flat=True)
+            )
+            for name in names:
+                # A save may have written the content again since the
+                # rows were read.
+                if name not in known and self.get_modified_time(name) < before:
+                    self.delete(name)
+                    deleted.append(name)
+        return deleted
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def get_blob_storage():
+    return blob_storage
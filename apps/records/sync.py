@@ -0,0 +1,148 @@
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from apps.core.prefetch import QueryPlan, plan_for
+
+from .models import TombstoneKind
+
+SIGNING_SALT = "records.sync"
+
+# How far each sync reaches back before the previous one started. Rows are
+# stamped with ``updated_at`` when they are saved, not when their
+# transaction commits, so a slow transaction can commit a change stamped
+# before a sync that could not see it yet. Re-sending the last few seconds
+# of changes catches it; clients apply changes as idempotent upserts.
+OVERLAP = timedelta(seconds=5)
+
+MAX_CHANGES = 200
+
+
+def _dump_time(value):
+    return value.isoformat() if value is not None else None
+
+
+def _load_time(value):
+    if value is None:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def encode_token(since, deleted_since, after=None):
+    """
+    Return an opaque token resuming a sync.
+
+    ``since`` bounds the records to send (``None`` for a first sync),
+    ``deleted_since`` the tombstones, and ``after`` is the
+    ``(updated_at, id)`` of the last record sent when the changes did not
+    fit in one response.
+    """
+    payload = {"since": _dump_time(since), "deleted_since": _dump_time(deleted_since)}
+    if after is not None:
+        payload["after"] = [_dump_time(after[0]), str(after[1])]
+    return signing.dumps(payload, salt=SIGNING_SALT, compress=True)
+
+
+def decode_token(token):
+    """
+    Return the ``(since, deleted_since, after)`` encoded in ``token``.
+    """
+    try:
+        payload = signing.loads(token, salt=SIGNING_SALT)
+        since = _load_time(payload["since"])
+        deleted_since = _load_time(payload["deleted_since"])
+        after = payload.get("after")
+        if after is not None:
+            after = (_load_time(after[0]), after[1])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValidationError({"token": "Invalid sync token."})
+    if deleted_since is None:
+        raise ValidationError({"token": "Invalid sync token."})
+    if deleted_since < tombstone_cutoff():
+        # Tombstones it needs may be pruned already; only a full sync,
+        # without a token, is sure to drop everything that was deleted.
+        raise ValidationError(
+            {"token": "Sync token expired, sync again without a token."},
+            code="expired",
+        )
+    return since, deleted_since, after
+
+
+def tombstone_cutoff():
+    """
+    Return when the oldest tombstone still kept was written, or the epoch
+    start if tombstones are kept forever.
+    """
+    days = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    if not days:
+        return datetime.min.replace(tzinfo=UTC)
+    return timezone.now() - timedelta(days=days)
+
+
+def changes(records, tombstones, serializer_class, token=None, limit=None):
+    """
+    Collect what changed in ``records`` since ``token``.
+
+    Changed records are read in ``(updated_at, id)`` order with one range
+    scan and returned whole, with their files and annotations. Deletions
+    come from ``tombstones`` once every changed record has been sent.
+    Without a token every record is returned, and deletions are tracked
+    from then on. Records the user still has are never reported deleted,
+    such as one moved away from a doctor and back again.
+    """
+    started_at = timezone.now()
+    limit = limit or MAX_CHANGES
+    tombstones = tombstones.exclude(
+        kind=TombstoneKind.RECORD, record_id__in=records.values("pk")
+    )
+    if token:
+        since, deleted_since, after = decode_token(token)
+    else:
+        since, deleted_since, after = None, started_at, None
+
+    if since is not None:
+        records = records.filter(updated_at__gte=since)
+    if after is not None:
+        records = records.filter(updated_at__gte=after[0]).filter(
+            Q(updated_at__gt=after[0]) | Q(id__gt=after[1])
+        )
+    plan = plan_for(serializer_class)
+    plan = QueryPlan(
+        plan.select_related, plan.prefetch_related, plan.only | {"updated_at"}
+    )
+    records = plan.apply(records.order_by("updated_at", "id"))
+    page = list(records[: limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    deleted = {"records": [], "files": [], "annotations": []}
+    if has_more:
+        last = page[-1]
+        next_token = encode_token(since, deleted_since, (last.updated_at, last.pk))
+    else:
+        keys = {
+            TombstoneKind.RECORD: "records",
+            TombstoneKind.FILE: "files",
+            TombstoneKind.ANNOTATION: "annotations",
+        }
+        for kind, object_id in tombstones.filter(
+            created_at__gte=deleted_since
+        ).values_list("kind", "object_id"):
+            deleted[keys[kind]].append(object_id)
+        resume_at = started_at - OVERLAP
+        next_token = encode_token(resume_at, resume_at)
+
+    return {
+        "records": page,
+        "deleted": deleted,
+        "token": next_token,
+        "has_more": has_more,
+    }
@@ -0,0 +1,184 @@
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from . import export, previews, sync
+from .models import ExportStatus, FileBlob, HealthRecordFile, RecordExport, Tombstone
+from .storage import get_blob_storage
+from .uploads import AssembledFile
+
+
+def schedule_previews(file_ids):
+    """
+    Queue preview generation for ``file_ids`` once the transaction commits.
+    """
+    file_ids = list(file_ids)
+    if file_ids:
+        transaction.on_commit(
+            lambda: [generate_file_previews.delay(str(pk)) for pk in file_ids]
+        )
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(OSError,),
+    retry_kwargs={"max_retries": 3, "countdown": 10},
+)
+def generate_file_previews(self, file_id):
+    """
+    Store a thumbnail and a preview of a health record file.
+
+    Images are downscaled and PDFs rendered from their first page; other
+    files are left without previews. Rendering happens outside any
+    transaction, and the results are attached only if the file still
+    exists.
+    """
+    record_file = HealthRecordFile.objects.filter(pk=file_id).only("file").first()
+    if record_file is None or not record_file.file:
+        return None
+    with record_file.file.open("rb") as file:
+        images = previews.render(
+            file,
+            {
+                "thumbnail": settings.FILE_THUMBNAIL_SIZE,
+                "preview": settings.FILE_PREVIEW_SIZE,
+            },
+        )
+    if images is None:
+        return None
+
+    with transaction.atomic():
+        record_file = (
+            HealthRecordFile.objects.select_for_update(of=("self",))
+            .filter(pk=file_id)
+            .select_related("record")
+            .first()
+        )
+        if record_file is None:
+            return None
+        for field, content in images.items():
+            stale = getattr(record_file, field)
+            if stale:
+                stale.storage.release(stale.name)
+            getattr(record_file, field).save(
+                f"{field}.jpg", ContentFile(content), save=False
+            )
+        record_file.save(update_fields=[*images, "updated_at"])
+    return {field: len(content) for field, content in images.items()}
+
+
+@shared_task(bind=True)
+def build_record_export(self, export_id):
+    """
+    Zip a patient's health history, files included, and attach it to
+    the export.
+
+    The archive is written to a temporary file and moved into storage, so
+    it is never held in memory. Failures mark the export as failed.
+    """
+    record_export = (
+        RecordExport.objects.filter(pk=export_id, status=ExportStatus.PENDING)
+        .select_related("patient")
+        .first()
+    )
+    if record_export is None:
+        return None
+
+    # Next to the upload parts, so the archive is moved into storage
+    # rather than copied.
+    os.makedirs(settings.FILE_UPLOAD_PARTS_DIR, exist_ok=True)
+    descriptor, path = tempfile.mkstemp(
+        suffix=".zip", dir=settings.FILE_UPLOAD_PARTS_DIR
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as destination:
+            export.write_archive(record_export.patient, destination)
+        size = os.path.getsize(path)
+        with open(path, "rb") as archive:
+            record_export.archive.save(
+                f"{record_export.pk}.zip", AssembledFile(archive), save=False
+            )
+    except Exception:
+        RecordExport.objects.filter(pk=export_id).update(
+            status=ExportStatus.FAILED, updated_at=timezone.now()
+        )
+        raise
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    record_export.status = ExportStatus.READY
+    record_export.completed_at = timezone.now()
+    record_export.save(
+        update_fields=["archive", "status", "completed_at", "updated_at"]
+    )
+    return size
+
+
+@shared_task
+def prune_tombstones(batch_size=1000):
+    """
+    Delete tombstones older than ``SYNC_TOMBSTONE_RETENTION_DAYS``.
+
+    Sync tokens from before then are refused, so clients holding one sync
+    from scratch instead of missing the pruned deletions.
+    """
+    if not settings.SYNC_TOMBSTONE_RETENTION_DAYS:
+        return 0
+    expired = Tombstone.objects.filter(created_at__lt=sync.tombstone_cutoff())
+    pruned = 0
+    while True:
+        ids = list(expired.order_by().values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return pruned
+        pruned += Tombstone.objects.filter(pk__in=ids).delete()[0]
+
+
+@shared_task
+def reconcile_file_blobs(batch_size=1000, grace_hours=24):
+    """
+    Repair blob reference counts and delete contents nothing refers to.
+
+    Each count is recomputed from the files and previews naming the blob,
+    under the blob's row lock so saves in flight are waited for, and
+    blobs left without references are reclaimed. Contents without a
+    ``FileBlob`` row, written by transactions that rolled back, are
+    deleted once older than ``grace_hours``.
+    """
+    storage = get_blob_storage()
+    repaired = 0
+    last_pk = None
+    while True:
+        blobs = FileBlob.objects.order_by("pk")
+        if last_pk is not None:
+            blobs = blobs.filter(pk__gt=last_pk)
+        pks = list(blobs.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        last_pk = pks[-1]
+        with transaction.atomic():
+            locked = FileBlob.objects.select_for_update().filter(pk__in=pks)
+            references = {blob.name: blob.references for blob in locked}
+            counts = Counter()
+            for field in ("file", "thumbnail", "preview"):
+                counts.update(
+                    HealthRecordFile.objects.filter(
+                        **{f"{field}__in": list(references)}
+                    ).values_list(field, flat=True)
+                )
+            for name, stored in references.items():
+                if stored != counts[name]:
+                    FileBlob.objects.filter(name=name).update(references=counts[name])
+                    repaired += 1
+                if not counts[name]:
+                    transaction.on_commit(partial(storage.reclaim, name))
+    orphans = storage.delete_orphans(timezone.now() - timedelta(hours=grace_hours))
+    return {"repaired": repaired, "orphans": len(orphans)}
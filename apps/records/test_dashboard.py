@@ -0,0 +1,150 @@
+import pytest
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework import status
+
+from apps.notifications.models import Notification, NotificationType
+from apps.records.models import DoctorAnnotation, HealthRecord, RecordType
+
+
+def _expected(doctor):
+    """
+    The dashboard figures computed the slow way, from the tables.
+    """
+    records = HealthRecord.objects.filter(doctor=doctor)
+    by_type = dict.fromkeys(RecordType.values, 0)
+    by_type.update(
+        records.order_by()
+        .values_list("record_type")
+        .annotate(count=Count("id"))
+        .values_list("record_type", "count")
+    )
+    return {
+        "total_records": records.count(),
+        "records_by_type": by_type,
+        "unannotated_records": records.filter(annotations__isnull=True).count(),
+        "unread_notifications": Notification.objects.filter(
+            recipient=doctor, is_read=False
+        ).count(),
+    }
+
+
+@pytest.mark.django_db
+class TestDoctorDashboardView:
+    def _dashboard(self, client):
+        response = client.get(reverse("records:doctor-dashboard"))
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_empty_dashboard(self, authenticated_doctor_client):
+        assert self._dashboard(authenticated_doctor_client) == _expected(
+            authenticated_doctor_client.user
+        )
+
+    def test_counts_follow_record_and_annotation_writes(
+        self,
+        authenticated_doctor_client,
+        patient_user,
+        django_capture_on_commit_callbacks,
+    ):
+        from apps.accounts.models import User
+
+        doctor = authenticated_doctor_client.user
+        other_doctor = User.objects.create_user(
+            email="other@test.com", password="testpass123", role="doctor"
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            lab = HealthRecord.objects.create(
+                patient=patient_user, doctor=doctor, record_type=RecordType.LAB_RESULT
+            )
+            imaging = HealthRecord.objects.create(
+                patient=patient_user, doctor=doctor, record_type=RecordType.IMAGING
+            )
+            HealthRecord.objects.create(patient=patient_user, doctor=doctor)
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+        assert self._dashboard(authenticated_doctor_client)["unannotated_records"] == 3
+
+        first = DoctorAnnotation.objects.create(record=lab, note="Normal")
+        DoctorAnnotation.objects.create(record=lab, note="Confirmed")
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+        first.delete()
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+
+        imaging.record_type = RecordType.PROCEDURE
+        imaging.save()
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+
+        lab.doctor = other_doctor
+        lab.save()
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+        assert other_doctor.dashboard.lab_result_records == 1
+        assert other_doctor.dashboard.unannotated_records == 0
+
+        HealthRecord.objects.filter(doctor=doctor).delete()
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+
+    def test_unread_notifications(
+        self,
+        authenticated_doctor_client,
+        patient_user,
+        django_capture_on_commit_callbacks,
+    ):
+        doctor = authenticated_doctor_client.user
+        with django_capture_on_commit_callbacks(execute=True):
+            records = [
+                HealthRecord.objects.create(patient=patient_user, doctor=doctor)
+                for _ in range(3)
+            ]
+        assert self._dashboard(authenticated_doctor_client)["unread_notifications"] == 3
+
+        Notification.objects.filter(record=records[0]).get().mark_as_read()
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+
+        records[1].delete()
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+        assert self._dashboard(authenticated_doctor_client)["unread_notifications"] == 1
+
+        Notification.objects.create(
+            recipient=doctor,
+            record=records[2],
+            notification_type=NotificationType.PATIENT_ASSIGNED,
+            message="Reminder",
+        )
+        assert self._dashboard(authenticated_doctor_client) == _expected(doctor)
+
+    def test_bulk_import_is_counted(
+        self,
+        authenticated_patient_client,
+        doctor_user,
+        django_capture_on_commit_callbacks,
+    ):
+        payload = {
+            "records": [
+                {"doctor": str(doctor_user.id), "record_type": record_type}
+                for record_type in (RecordType.LAB_RESULT, RecordType.LAB_RESULT)
+            ]
+        }
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_patient_client.post(
+                reverse("records:patient-record-bulk-create"), payload, format="json"
+            )
+
+        dashboard = doctor_user.dashboard
+        assert dashboard.lab_result_records == 2
+        assert dashboard.unannotated_records == 2
+        assert doctor_user.unread_counter.unread == 1
+
+    def test_dashboard_is_one_query(
+        self, authenticated_doctor_client, patient_user, django_assert_num_queries
+    ):
+        HealthRecord.objects.create(
+            patient=patient_user, doctor=authenticated_doctor_client.user
+        )
+        self._dashboard(authenticated_doctor_client)
+
+        with django_assert_num_queries(1):
+            self._dashboard(authenticated_doctor_client)
+
+    def test_patient_cannot_access(self, authenticated_patient_client):
+        response = authenticated_patient_client.get(reverse("records:doctor-dashboard"))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
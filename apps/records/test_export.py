@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+
+from apps.records.models import (
+    DoctorAnnotation,
+    ExportStatus,
+    HealthRecord,
+    HealthRecordFile,
+    RecordExport,
+)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    settings.FILE_UPLOAD_PARTS_DIR = str(tmp_path / "uploads")
+    return tmp_path
+
+
+@pytest.fixture
+def history(patient_user, doctor_user):
+    first = HealthRecord.objects.create(
+        patient=patient_user, doctor=doctor_user, description="Annual check-up"
+    )
+    DoctorAnnotation.objects.create(record=first, note="All clear")
+    # Client-supplied names must not escape the archive's folders.
+    HealthRecordFile.objects.create(
+        record=first,
+        file=SimpleUploadedFile("results.pdf", b"%PDF-1.4 results"),
+        filename="../results.pdf",
+    )
+    second = HealthRecord.objects.create(
+        patient=patient_user, doctor=doctor_user, description="Follow-up"
+    )
+    return [first, second]
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestPatientHealthRecordExportView:
+    def test_ndjson_export(self, authenticated_patient_client, history):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-export")
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert "attachment" in response["Content-Disposition"]
+
+        lines = [json.loads(line) for line in _content(response).splitlines()]
+        assert [line["id"] for line in lines] == [str(record.id) for record in history]
+        assert lines[0]["annotations"][0]["note"] == "All clear"
+        assert lines[0]["files"][0]["filename"] == "../results.pdf"
+        assert lines[1]["files"] == []
+
+    def test_csv_export(self, authenticated_patient_client, history):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-export"), {"export_format": "csv"}
+        )
+        assert response["Content-Type"] == "text/csv"
+
+        rows = list(csv.DictReader(io.StringIO(_content(response))))
+        assert [row["kind"] for row in rows] == [
+            "record",
+            "file",
+            "annotation",
+            "record",
+        ]
+        assert {row["record_id"] for row in rows[:3]} == {str(history[0].id)}
+
+    def test_query_count_does_not_grow_with_history(
+        self, authenticated_patient_client, doctor_user, django_assert_max_num_queries
+    ):
+        patient = authenticated_patient_client.user
+        for _ in range(30):
+            record = HealthRecord.objects.create(patient=patient, doctor=doctor_user)
+            DoctorAnnotation.objects.create(record=record, note="Reviewed")
+
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-export")
+        )
+        with django_assert_max_num_queries(3):
+            assert len(_content(response).splitlines()) == 30
+
+    def test_unknown_format(self, authenticated_patient_client):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-export"), {"export_format": "xml"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_only_own_records(self, authenticated_patient_client, doctor_user):
+        from apps.accounts.models import User
+
+        other = User.objects.create_user(
+            email="other@test.com", password="testpass123", role="patient"
+        )
+        HealthRecord.objects.create(patient=other, doctor=doctor_user)
+
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-export")
+        )
+        assert _content(response) == ""
+
+
+@pytest.mark.django_db
+class TestRecordExport:
+    def test_archive_is_built_and_downloadable(
+        self, authenticated_patient_client, history, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.post(
+                reverse("records:record-export-list")
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        detail = authenticated_patient_client.get(
+            reverse("records:record-export-detail", kwargs={"pk": response.data["id"]})
+        )
+        assert detail.data["status"] == ExportStatus.READY
+        assert detail.data["archive"].endswith(
+            reverse(
+                "records:record-export-download", kwargs={"pk": response.data["id"]}
+            )
+        )
+
+        download = authenticated_patient_client.get(detail.data["archive"])
+        assert download.status_code == status.HTTP_200_OK
+        with zipfile.ZipFile(io.BytesIO(b"".join(download.streaming_content))) as zf:
+            record_file = history[0].files.get()
+            assert sorted(zf.namelist()) == [
+                f"files/{history[0].id}/{record_file.id}-results.pdf",
+                "records.ndjson",
+            ]
+            assert len(zf.read("records.ndjson").splitlines()) == 2
+            assert zf.read(f"files/{history[0].id}/{record_file.id}-results.pdf") == (
+                b"%PDF-1.4 results"
+            )
+
+    def test_pending_export_cannot_be_downloaded(
+        self, authenticated_patient_client, patient_user
+    ):
+        record_export = RecordExport.objects.create(patient=patient_user)
+
+        response = authenticated_patient_client.get(
+            reverse("records:record-export-download", kwargs={"pk": record_export.id})
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_deleting_export_removes_archive(
+        self, authenticated_patient_client, history, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.post(
+                reverse("records:record-export-list")
+            )
+        record_export = RecordExport.objects.get(pk=response.data["id"])
+        archive_path = record_export.archive.path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.delete(
+                reverse("records:record-export-detail", kwargs={"pk": record_export.id})
+            )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not os.path.exists(archive_path)
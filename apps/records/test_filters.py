@@ -0,0 +1,196 @@
+import itertools
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.records.filters import RecordFilter
+from apps.records.models import DoctorAnnotation, HealthRecord, RecordType
+
+FILTER_PARAMS = {
+    "record_type": "lab_result,imaging",
+    "created_after": "2024-01-01",
+    "created_before": "2024-12-31T23:59:59Z",
+    "counterpart": None,
+    "annotated": "false",
+}
+
+
+def _filtered(owner_field, owner, params):
+    counterpart_field = "doctor" if owner_field == "patient" else "patient"
+    request = Request(APIRequestFactory().get("/", params))
+    view = SimpleNamespace(counterpart_field=counterpart_field)
+    queryset = HealthRecord.objects.filter(**{owner_field: owner})
+    return RecordFilter().filter_queryset(request, queryset, view)
+
+
+@pytest.mark.django_db
+class TestRecordFilter:
+    def test_filter_by_record_type(self, authenticated_patient_client, doctor_user):
+        patient = authenticated_patient_client.user
+        lab = HealthRecord.objects.create(
+            patient=patient, doctor=doctor_user, record_type=RecordType.LAB_RESULT
+        )
+        imaging = HealthRecord.objects.create(
+            patient=patient, doctor=doctor_user, record_type=RecordType.IMAGING
+        )
+        HealthRecord.objects.create(patient=patient, doctor=doctor_user)
+
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-list"),
+            {"record_type": "lab_result,imaging"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert {item["id"] for item in response.data} == {str(lab.id), str(imaging.id)}
+
+    def test_unknown_record_type(self, authenticated_patient_client):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-list"), {"record_type": "x-ray"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "record_type" in response.data
+
+    def test_filter_by_created_range(self, authenticated_patient_client, doctor_user):
+        patient = authenticated_patient_client.user
+        now = timezone.now()
+        old, recent, today = (
+            HealthRecord.objects.create(patient=patient, doctor=doctor_user)
+            for _ in range(3)
+        )
+        HealthRecord.objects.filter(pk=old.pk).update(
+            created_at=now - timedelta(days=30)
+        )
+        HealthRecord.objects.filter(pk=recent.pk).update(
+            created_at=now - timedelta(days=2)
+        )
+        url = reverse("records:patient-record-list")
+
+        response = authenticated_patient_client.get(
+            url,
+            {"created_after": timezone.localdate(now - timedelta(days=7)).isoformat()},
+        )
+        assert {item["id"] for item in response.data} == {
+            str(recent.id),
+            str(today.id),
+        }
+
+        # A plain date includes the whole day.
+        response = authenticated_patient_client.get(
+            url,
+            {"created_before": timezone.localdate(now - timedelta(days=2)).isoformat()},
+        )
+        assert {item["id"] for item in response.data} == {
+            str(old.id),
+            str(recent.id),
+        }
+
+    def test_invalid_date(self, authenticated_patient_client):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-list"), {"created_after": "yesterday"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_doctor_filters_by_patient(self, authenticated_doctor_client, patient_user):
+        from apps.accounts.models import User
+
+        doctor = authenticated_doctor_client.user
+        other = User.objects.create_user(
+            email="other@test.com", password="testpass123", role="patient"
+        )
+        record = HealthRecord.objects.create(patient=patient_user, doctor=doctor)
+        HealthRecord.objects.create(patient=other, doctor=doctor)
+
+        response = authenticated_doctor_client.get(
+            reverse("records:doctor-record-list"), {"patient": str(patient_user.id)}
+        )
+        assert [item["id"] for item in response.data] == [str(record.id)]
+
+        response = authenticated_doctor_client.get(
+            reverse("records:doctor-record-list"), {"patient": "nobody"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_patient_filters_by_doctor(self, authenticated_patient_client, doctor_user):
+        from apps.accounts.models import User
+
+        patient = authenticated_patient_client.user
+        other = User.objects.create_user(
+            email="other@test.com", password="testpass123", role="doctor"
+        )
+        record = HealthRecord.objects.create(patient=patient, doctor=doctor_user)
+        HealthRecord.objects.create(patient=patient, doctor=other)
+
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-list"), {"doctor": str(doctor_user.id)}
+        )
+        assert [item["id"] for item in response.data] == [str(record.id)]
+
+    def test_filter_by_annotated(self, authenticated_doctor_client, patient_user):
+        doctor = authenticated_doctor_client.user
+        annotated = HealthRecord.objects.create(patient=patient_user, doctor=doctor)
+        plain = HealthRecord.objects.create(patient=patient_user, doctor=doctor)
+        annotation = DoctorAnnotation.objects.create(record=annotated, note="Stable")
+        url = reverse("records:doctor-record-list")
+
+        response = authenticated_doctor_client.get(url, {"annotated": "true"})
+        assert [item["id"] for item in response.data] == [str(annotated.id)]
+        response = authenticated_doctor_client.get(url, {"annotated": "false"})
+        assert [item["id"] for item in response.data] == [str(plain.id)]
+
+        annotation.delete()
+        response = authenticated_doctor_client.get(url, {"annotated": "false"})
+        assert {item["id"] for item in response.data} == {
+            str(annotated.id),
+            str(plain.id),
+        }
+
+
+def _expected_index(owner_field, names):
+    # Both owners are pinned by equality when filtering on the counterpart,
+    # so the one pair index serves either of them.
+    if "counterpart" in names:
+        return "record_patient_doctor_idx"
+    if owner_field == "doctor" and "annotated" in names:
+        return "record_doctor_unannotated_idx"
+    return f"record_{owner_field}_created_idx"
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "sqlite",
+    reason="Other planners pick indexes from table statistics.",
+)
+class TestRecordFilterIndexes:
+    @pytest.mark.parametrize("owner_field", ["patient", "doctor"])
+    def test_every_filter_combination_uses_its_index(
+        self, owner_field, patient_user, doctor_user
+    ):
+        owner, counterpart = (
+            (patient_user, doctor_user)
+            if owner_field == "patient"
+            else (doctor_user, patient_user)
+        )
+        counterpart_field = "doctor" if owner_field == "patient" else "patient"
+
+        for size in range(len(FILTER_PARAMS) + 1):
+            for names in itertools.combinations(FILTER_PARAMS, size):
+                params = {
+                    (counterpart_field if name == "counterpart" else name): (
+                        str(counterpart.id) if name == "counterpart" else value
+                    )
+                    for name, value in ((name, FILTER_PARAMS[name]) for name in names)
+                }
+                plan = (
+                    _filtered(owner_field, owner, params)
+                    .order_by("-created_at", "-id")
+                    .explain()
+                )
+                expected = f"USING INDEX {_expected_index(owner_field, names)} "
+                assert expected in plan, (params, plan)
+                assert "TEMP B-TREE" not in plan, (params, plan)
@@ -87,7 +87,7 @@ class TestHealthRecordFile:
             file=test_file,
         )
         assert file_record.record == health_record
-        assert "test_report" in file_record.file.name
+        assert file_record.filename == "test_report.pdf"
 
     def test_health_record_file_str(self, health_record):
         test_file = SimpleUploadedFile(
@@ -0,0 +1,102 @@
+import io
+
+import pypdfium2
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+
+from apps.records.models import HealthRecordFile
+from apps.records.tasks import generate_file_previews
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "navy").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _pdf():
+    document = pypdfium2.PdfDocument.new()
+    document.new_page(612, 792)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+class TestFilePreviews:
+    def test_image_previews_are_generated_on_commit(
+        self, health_record, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            record_file = HealthRecordFile.objects.create(
+                record=health_record, file=SimpleUploadedFile("xray.png", _png(3000, 2000))
+            )
+
+        record_file.refresh_from_db()
+        with record_file.thumbnail.open("rb") as thumbnail:
+            assert Image.open(thumbnail).size == (256, 171)
+        with record_file.preview.open("rb") as preview:
+            assert Image.open(preview).size == (1024, 683)
+
+    def test_pdf_first_page_is_rendered(self, health_record):
+        record_file = HealthRecordFile.objects.create(
+            record=health_record, file=SimpleUploadedFile("report.pdf", _pdf())
+        )
+
+        assert generate_file_previews(str(record_file.pk)) is not None
+        record_file.refresh_from_db()
+        with record_file.thumbnail.open("rb") as thumbnail:
+            assert Image.open(thumbnail).format == "JPEG"
+
+    def test_other_files_get_no_previews(self, health_record):
+        record_file = HealthRecordFile.objects.create(
+            record=health_record, file=SimpleUploadedFile("notes.txt", b"plain text")
+        )
+
+        assert generate_file_previews(str(record_file.pk)) is None
+        record_file.refresh_from_db()
+        assert not record_file.thumbnail
+
+    def test_broken_pdf_gets_no_previews(self, health_record):
+        record_file = HealthRecordFile.objects.create(
+            record=health_record, file=SimpleUploadedFile("report.pdf", _pdf()[:40])
+        )
+
+        assert generate_file_previews(str(record_file.pk)) is None
+        record_file.refresh_from_db()
+        assert not record_file.thumbnail
+
+    def test_previews_are_linked_and_served(self, authenticated_patient_client, health_record):
+        record_file = HealthRecordFile.objects.create(
+            record=health_record, file=SimpleUploadedFile("xray.png", _png(400, 400))
+        )
+        url = reverse("records:patient-record-detail", kwargs={"pk": health_record.id})
+        assert authenticated_patient_client.get(url).data["files"][0]["thumbnail"] is None
+
+        generate_file_previews(str(record_file.pk))
+
+        files = authenticated_patient_client.get(url).data["files"]
+        thumbnail_url = reverse("records:health-record-file-thumbnail", kwargs={"pk": record_file.id})
+        assert files[0]["thumbnail"].endswith(thumbnail_url)
+        response = authenticated_patient_client.get(thumbnail_url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "image/jpeg"
+        assert "inline" in response["Content-Disposition"]
+
+    def test_missing_preview_is_not_found(self, authenticated_patient_client, health_record):
+        record_file = HealthRecordFile.objects.create(
+            record=health_record, file=SimpleUploadedFile("notes.txt", b"plain text")
+        )
+        response = authenticated_patient_client.get(
+            reverse("records:health-record-file-preview", kwargs={"pk": record_file.id})
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
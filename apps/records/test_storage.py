@@ -0,0 +1,125 @@
+import os
+import time
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework import status
+
+from apps.records.models import FileBlob, HealthRecord, HealthRecordFile
+from apps.records.storage import blob_storage
+from apps.records.tasks import reconcile_file_blobs
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _upload(record, content, name="lab.pdf"):
+    return HealthRecordFile.objects.create(
+        record=record, file=SimpleUploadedFile(name, content)
+    )
+
+
+@pytest.mark.django_db
+class TestContentAddressedStorage:
+    def test_same_content_is_stored_once(
+        self, health_record, patient_user, doctor_user
+    ):
+        other_record = HealthRecord.objects.create(
+            patient=patient_user, doctor=doctor_user
+        )
+        first = _upload(health_record, b"same bytes", "lab.pdf")
+        second = _upload(other_record, b"same bytes", "lab-copy.pdf")
+
+        assert first.file.name == second.file.name
+        assert second.filename == "lab-copy.pdf"
+        blob = FileBlob.objects.get()
+        assert blob.references == 2
+        assert blob.size == len(b"same bytes")
+
+    def test_different_content_is_stored_apart(self, health_record):
+        first = _upload(health_record, b"first")
+        second = _upload(health_record, b"second")
+        assert first.file.name != second.file.name
+        assert FileBlob.objects.count() == 2
+
+    def test_last_reference_reclaims_blob(
+        self,
+        authenticated_patient_client,
+        health_record,
+        django_capture_on_commit_callbacks,
+    ):
+        first = _upload(health_record, b"shared")
+        second = _upload(health_record, b"shared")
+        path = first.file.path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_patient_client.delete(
+                reverse("records:health-record-file-delete", kwargs={"pk": first.id})
+            )
+        assert os.path.exists(path)
+        assert FileBlob.objects.get().references == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.delete(
+                reverse("records:health-record-file-delete", kwargs={"pk": second.id})
+            )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not os.path.exists(path)
+        assert not FileBlob.objects.exists()
+
+    def test_deleting_record_releases_its_files(
+        self, health_record, django_capture_on_commit_callbacks
+    ):
+        path = _upload(health_record, b"scan").file.path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            health_record.delete()
+        assert not os.path.exists(path)
+
+    def test_reconcile_repairs_counts_and_reclaims(
+        self, health_record, django_capture_on_commit_callbacks
+    ):
+        kept = _upload(health_record, b"kept")
+        dropped = _upload(health_record, b"dropped")
+        dropped_path = dropped.file.path
+        FileBlob.objects.filter(name=kept.file.name).update(references=5)
+        # Clearing the field with update() skips the signal releasing it.
+        HealthRecordFile.objects.filter(pk=dropped.pk).update(file="")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            result = reconcile_file_blobs()
+
+        assert result == {"repaired": 2, "orphans": 0}
+        assert FileBlob.objects.get().references == 1
+        assert not os.path.exists(dropped_path)
+
+    def test_reconcile_deletes_old_orphans(self, health_record):
+        orphan = blob_storage.path("health_records/blobs/ab/abc")
+        recent = blob_storage.path("health_records/blobs/ab/abd")
+        os.makedirs(os.path.dirname(orphan))
+        for path in (orphan, recent):
+            with open(path, "wb") as file:
+                file.write(b"rolled back")
+        day_ago = time.time() - 25 * 60 * 60
+        os.utime(orphan, (day_ago, day_ago))
+        kept = _upload(health_record, b"kept")
+        os.utime(kept.file.path, (day_ago, day_ago))
+
+        assert reconcile_file_blobs()["orphans"] == 1
+        assert not os.path.exists(orphan)
+        assert os.path.exists(recent)
+        assert os.path.exists(kept.file.path)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_insert_takes_no_reference(health_record):
+    with pytest.raises(IntegrityError):
+        HealthRecordFile.objects.create(
+            record_id=None, file=SimpleUploadedFile("lab.pdf", b"orphan")
+        )
+    assert not FileBlob.objects.exists()
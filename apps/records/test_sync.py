@@ -0,0 +1,226 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.records import sync, tasks
+from apps.records.models import (
+    DoctorAnnotation,
+    HealthRecord,
+    HealthRecordFile,
+    Tombstone,
+    TombstoneKind,
+)
+
+User = get_user_model()
+
+
+def _sync_past(client, url, token):
+    """
+    Sync with ``token`` moved back past the overlap window, as if the
+    previous sync had happened a while ago.
+    """
+    since, deleted_since, _ = sync.decode_token(token)
+    later = sync.OVERLAP + timedelta(seconds=1)
+    return client.get(
+        url, {"token": sync.encode_token(since + later, deleted_since + later)}
+    )
+
+
+@pytest.mark.django_db
+class TestHealthRecordSync:
+    def test_first_sync_returns_every_record(
+        self, authenticated_patient_client, health_record
+    ):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-sync")
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [record["id"] for record in response.data["records"]] == [
+            str(health_record.id)
+        ]
+        assert response.data["deleted"] == {
+            "records": [],
+            "files": [],
+            "annotations": [],
+        }
+        assert response.data["has_more"] is False
+        assert response.data["token"]
+
+    def test_unchanged_collection_returns_nothing(
+        self, authenticated_patient_client, health_record
+    ):
+        url = reverse("records:patient-record-sync")
+        token = authenticated_patient_client.get(url).data["token"]
+
+        response = _sync_past(authenticated_patient_client, url, token)
+        assert response.data["records"] == []
+
+    def test_annotation_returns_its_record(
+        self, authenticated_doctor_client, health_record
+    ):
+        url = reverse("records:doctor-record-sync")
+        token = authenticated_doctor_client.get(url).data["token"]
+        HealthRecord.objects.filter(pk=health_record.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        DoctorAnnotation.objects.create(record=health_record, note="Follow up")
+
+        response = authenticated_doctor_client.get(url, {"token": token})
+        assert len(response.data["records"]) == 1
+        assert response.data["records"][0]["annotations"][0]["note"] == "Follow up"
+
+    def test_deleted_file_is_reported(
+        self, authenticated_patient_client, health_record
+    ):
+        file = HealthRecordFile.objects.create(
+            record=health_record, file="health_records/files/a.pdf"
+        )
+        url = reverse("records:patient-record-sync")
+        token = authenticated_patient_client.get(url).data["token"]
+
+        response = authenticated_patient_client.delete(
+            reverse("records:health-record-file-delete", kwargs={"pk": file.id})
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = authenticated_patient_client.get(url, {"token": token})
+        assert response.data["deleted"]["files"] == [str(file.id)]
+        assert response.data["records"][0]["files"] == []
+
+    def test_deleted_record_is_reported_without_its_children(
+        self, authenticated_doctor_client, health_record
+    ):
+        annotation = DoctorAnnotation.objects.create(record=health_record, note="Note")
+        record_id = health_record.id
+        url = reverse("records:doctor-record-sync")
+        token = authenticated_doctor_client.get(url).data["token"]
+
+        health_record.delete()
+
+        response = authenticated_doctor_client.get(url, {"token": token})
+        assert response.data["deleted"]["records"] == [str(record_id)]
+        assert str(annotation.id) not in response.data["deleted"]["annotations"]
+
+    def test_changes_are_paged(
+        self, authenticated_patient_client, doctor_user, monkeypatch
+    ):
+        monkeypatch.setattr(sync, "MAX_CHANGES", 2)
+        records = [
+            HealthRecord.objects.create(
+                patient=authenticated_patient_client.user, doctor=doctor_user
+            )
+            for _ in range(3)
+        ]
+        url = reverse("records:patient-record-sync")
+
+        first = authenticated_patient_client.get(url)
+        assert first.data["has_more"] is True
+        second = authenticated_patient_client.get(url, {"token": first.data["token"]})
+        assert second.data["has_more"] is False
+
+        synced = [
+            record["id"] for record in first.data["records"] + second.data["records"]
+        ]
+        assert sorted(synced) == sorted(str(record.id) for record in records)
+
+    def test_sync_query_count_is_constant(
+        self, authenticated_doctor_client, patient_user, assert_constant_queries
+    ):
+        def populate(count):
+            for _ in range(count):
+                record = HealthRecord.objects.create(
+                    patient=patient_user, doctor=authenticated_doctor_client.user
+                )
+                DoctorAnnotation.objects.create(record=record, note="Note")
+
+        assert_constant_queries(
+            lambda: authenticated_doctor_client.get(
+                reverse("records:doctor-record-sync")
+            ),
+            populate,
+        )
+
+    def test_invalid_token(self, authenticated_patient_client):
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-sync"), {"token": "garbage"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_reassigned_record_is_deleted_for_the_old_doctor_only(
+        self, patient_user, doctor_user, health_record
+    ):
+        other_doctor = User.objects.create_user(
+            email="other@doctor.com", password="pass123", role="doctor"
+        )
+        clients = {}
+        for user in (patient_user, doctor_user, other_doctor):
+            clients[user] = APIClient()
+            clients[user].force_authenticate(user)
+        urls = {
+            patient_user: reverse("records:patient-record-sync"),
+            doctor_user: reverse("records:doctor-record-sync"),
+            other_doctor: reverse("records:doctor-record-sync"),
+        }
+        tokens = {
+            user: client.get(urls[user]).data["token"]
+            for user, client in clients.items()
+        }
+
+        health_record.doctor = other_doctor
+        health_record.save()
+
+        deleted = {
+            user: client.get(urls[user], {"token": tokens[user]}).data["deleted"]
+            for user, client in clients.items()
+        }
+        assert deleted[doctor_user]["records"] == [str(health_record.id)]
+        assert deleted[patient_user]["records"] == []
+        assert deleted[other_doctor]["records"] == []
+
+        health_record.doctor = doctor_user
+        health_record.save()
+        response = clients[doctor_user].get(
+            urls[doctor_user], {"token": tokens[doctor_user]}
+        )
+        assert response.data["deleted"]["records"] == []
+        assert [record["id"] for record in response.data["records"]] == [
+            str(health_record.id)
+        ]
+
+    def test_token_older_than_tombstones_is_refused(
+        self, settings, authenticated_patient_client
+    ):
+        settings.SYNC_TOMBSTONE_RETENTION_DAYS = 30
+        stale = timezone.now() - timedelta(days=31)
+        response = authenticated_patient_client.get(
+            reverse("records:patient-record-sync"),
+            {"token": sync.encode_token(stale, stale)},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "expired" in response.data["token"]
+
+
+@pytest.mark.django_db
+def test_prune_tombstones(settings, health_record):
+    settings.SYNC_TOMBSTONE_RETENTION_DAYS = 30
+    record_id = health_record.id
+    health_record.delete()
+    kept = Tombstone.objects.get()
+    old = Tombstone.objects.create(
+        kind=TombstoneKind.RECORD,
+        object_id=record_id,
+        record_id=record_id,
+        doctor_id=kept.doctor_id,
+    )
+    Tombstone.objects.filter(pk=old.pk).update(
+        created_at=timezone.now() - timedelta(days=31)
+    )
+
+    assert tasks.prune_tombstones(batch_size=1) == 1
+    assert list(Tombstone.objects.all()) == [kept]
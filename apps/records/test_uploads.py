@@ -0,0 +1,197 @@
+import os
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.records import uploads
+from apps.records.models import FileUpload, HealthRecord, HealthRecordFile
+
+
+@pytest.fixture
+def upload_settings(settings, tmp_path):
+    settings.FILE_UPLOAD_PARTS_DIR = str(tmp_path / "uploads")
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    settings.FILE_UPLOAD_PART_SIZE = 4
+    return settings
+
+
+def _start(client, record, content):
+    response = client.post(
+        reverse("records:file-upload-create"),
+        {"record": str(record.id), "filename": "scan.dcm", "size": len(content)},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.data
+
+
+def _put_part(client, upload_id, number, body):
+    return client.put(
+        reverse("records:file-upload-part", kwargs={"pk": upload_id, "number": number}),
+        body,
+        content_type="application/octet-stream",
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("upload_settings")
+class TestChunkedUpload:
+    def test_parts_in_any_order_are_assembled(
+        self,
+        authenticated_patient_client,
+        health_record,
+        django_capture_on_commit_callbacks,
+    ):
+        content = b"0123456789"
+        upload = _start(authenticated_patient_client, health_record, content)
+        assert upload["part_size"] == 4
+        assert upload["part_count"] == 3
+
+        for number in (3, 1, 2):
+            start = (number - 1) * 4
+            response = _put_part(
+                authenticated_patient_client,
+                upload["id"],
+                number,
+                content[start : start + 4],
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.post(
+                reverse("records:file-upload-complete", kwargs={"pk": upload["id"]})
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        record_file = HealthRecordFile.objects.get(record=health_record)
+        assert str(record_file.id) == response.data["id"]
+        with record_file.file.open("rb") as stored:
+            assert stored.read() == content
+        assert not os.path.exists(FileUpload.objects.get().parts_dir)
+
+    def test_status_lists_received_parts(
+        self, authenticated_patient_client, health_record
+    ):
+        upload = _start(authenticated_patient_client, health_record, b"0123456789")
+        _put_part(authenticated_patient_client, upload["id"], 2, b"4567")
+
+        response = authenticated_patient_client.get(
+            reverse("records:file-upload-detail", kwargs={"pk": upload["id"]})
+        )
+        assert response.data["parts"] == [2]
+
+    def test_complete_with_missing_parts(
+        self, authenticated_patient_client, health_record
+    ):
+        upload = _start(authenticated_patient_client, health_record, b"0123456789")
+        _put_part(authenticated_patient_client, upload["id"], 1, b"0123")
+
+        response = authenticated_patient_client.post(
+            reverse("records:file-upload-complete", kwargs={"pk": upload["id"]})
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not HealthRecordFile.objects.exists()
+
+    def test_part_with_wrong_size_is_rejected(
+        self, authenticated_patient_client, health_record
+    ):
+        upload = _start(authenticated_patient_client, health_record, b"0123456789")
+
+        response = _put_part(authenticated_patient_client, upload["id"], 1, b"012")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not FileUpload.objects.get().parts.exists()
+        response = _put_part(authenticated_patient_client, upload["id"], 4, b"0123")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cannot_upload_to_other_patient_record(
+        self, authenticated_patient_client, patient_user, doctor_user
+    ):
+        other_patient = patient_user.__class__.objects.create_user(
+            email="other@patient.com",
+            password="pass123",
+            role="patient",
+        )
+        record = HealthRecord.objects.create(patient=other_patient, doctor=doctor_user)
+
+        response = authenticated_patient_client.post(
+            reverse("records:file-upload-create"),
+            {"record": str(record.id), "filename": "scan.dcm", "size": 10},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_abandoned_upload_discards_parts(
+        self,
+        authenticated_patient_client,
+        health_record,
+        django_capture_on_commit_callbacks,
+    ):
+        upload = _start(authenticated_patient_client, health_record, b"0123456789")
+        _put_part(authenticated_patient_client, upload["id"], 1, b"0123")
+        parts_dir = FileUpload.objects.get().parts_dir
+        assert os.path.exists(parts_dir)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.delete(
+                reverse("records:file-upload-detail", kwargs={"pk": upload["id"]})
+            )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not os.path.exists(parts_dir)
+
+    def _upload_all(self, client, record, content=b"0123456789"):
+        upload = _start(client, record, content)
+        for number in range(1, upload["part_count"] + 1):
+            start = (number - 1) * 4
+            _put_part(client, upload["id"], number, content[start : start + 4])
+        return upload
+
+    def test_resent_part_replaces_the_first(
+        self, authenticated_patient_client, health_record
+    ):
+        upload = _start(authenticated_patient_client, health_record, b"0123456789")
+        for body in (b"0123", b"abcd"):
+            response = _put_part(authenticated_patient_client, upload["id"], 1, body)
+            assert response.status_code == status.HTTP_200_OK
+
+        [part] = FileUpload.objects.get().parts.all()
+        assert part.number == 1
+        with open(FileUpload.objects.get().part_path(1), "rb") as stored:
+            assert stored.read() == b"abcd"
+
+    def test_complete_under_way_is_a_conflict(
+        self, authenticated_patient_client, health_record
+    ):
+        upload = self._upload_all(authenticated_patient_client, health_record)
+        url = reverse("records:file-upload-complete", kwargs={"pk": upload["id"]})
+
+        FileUpload.objects.update(completing_at=timezone.now())
+        response = authenticated_patient_client.post(url)
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        # A completion that has been under way for too long was abandoned.
+        FileUpload.objects.update(
+            completing_at=timezone.now() - uploads.COMPLETING_TIMEOUT
+        )
+        response = authenticated_patient_client.post(url)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert FileUpload.objects.get().completing_at is None
+
+    def test_failed_assembly_can_be_retried(
+        self, authenticated_patient_client, health_record
+    ):
+        self._upload_all(authenticated_patient_client, health_record)
+        upload = FileUpload.objects.get()
+        os.rename(upload.part_path(2), f"{upload.part_path(2)}.moved")
+
+        with pytest.raises(FileNotFoundError):
+            uploads.complete(upload)
+        upload.refresh_from_db()
+        assert upload.completing_at is None
+        assert upload.completed_at is None
+
+        os.rename(f"{upload.part_path(2)}.moved", upload.part_path(2))
+        record_file = uploads.complete(upload)
+        with record_file.file.open("rb") as stored:
+            assert stored.read() == b"0123456789"
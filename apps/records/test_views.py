@@ -2,6 +2,7 @@ import pytest
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
+from rest_framework.test import APIClient
 
 from apps.records.models import HealthRecord, HealthRecordFile, DoctorAnnotation, RecordType
 
@@ -83,12 +84,146 @@ class TestPatientHealthRecordListCreateView:
         response = authenticated_patient_client.post(url, data, format="json")
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+    def test_list_query_count_is_constant(
+        self, authenticated_patient_client, doctor_user, patient_profile, assert_constant_queries
+    ):
+        def populate(size):
+            for _ in range(size):
+                record = HealthRecord.objects.create(
+                    patient=authenticated_patient_client.user, doctor=doctor_user
+                )
+                DoctorAnnotation.objects.create(record=record, note="Reviewed")
+                HealthRecordFile.objects.create(
+                    record=record, file=SimpleUploadedFile("scan.pdf", b"content")
+                )
+
+        url = reverse("records:patient-record-list")
+        assert_constant_queries(lambda: authenticated_patient_client.get(url), populate)
+
+    def test_cursor_pagination(self, authenticated_patient_client, doctor_user):
+        records = [
+            HealthRecord.objects.create(
+                patient=authenticated_patient_client.user, doctor=doctor_user
+            )
+            for _ in range(5)
+        ]
+        expected = [str(record.id) for record in reversed(records)]
+
+        url = reverse("records:patient-record-list")
+        response = authenticated_patient_client.get(url, {"cursor": "", "page_size": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert response.data["previous"] is None
+        seen = [r["id"] for r in response.data["results"]]
+
+        while response.data["next"]:
+            response = authenticated_patient_client.get(response.data["next"])
+            seen += [r["id"] for r in response.data["results"]]
+        assert seen == expected
+
+        response = authenticated_patient_client.get(response.data["previous"])
+        assert [r["id"] for r in response.data["results"]] == expected[2:4]
+
+    def test_invalid_cursor(self, authenticated_patient_client):
+        url = reverse("records:patient-record-list")
+        response = authenticated_patient_client.get(url, {"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     def test_unauthenticated_access(self, api_client):
         url = reverse("records:patient-record-list")
         response = api_client.get(url)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+@pytest.mark.django_db
+class TestPatientHealthRecordBulkCreateView:
+    def _payload(self, doctors, count):
+        return {
+            "records": [
+                {"doctor": str(doctors[i % len(doctors)].id), "record_type": RecordType.LAB_RESULT, "description": f"Result {i}"}
+                for i in range(count)
+            ]
+        }
+
+    def test_bulk_create_notifies_each_doctor_once(
+        self, authenticated_patient_client, doctor_user, django_capture_on_commit_callbacks
+    ):
+        from apps.accounts.models import User
+        from apps.notifications.models import Notification
+
+        other_doctor = User.objects.create_user(email="other@test.com", password="testpass123", role="doctor")
+        url = reverse("records:patient-record-bulk-create")
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_patient_client.post(
+                url, self._payload([doctor_user, other_doctor], 6), format="json"
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 6
+        assert HealthRecord.objects.filter(patient=authenticated_patient_client.user).count() == 6
+        assert sorted(Notification.objects.values_list("recipient_id", flat=True)) == sorted(
+            [doctor_user.id, other_doctor.id]
+        )
+        assert Notification.objects.get(recipient=doctor_user).message.startswith("3 new health records")
+
+    def test_query_count_does_not_grow_with_batch(self, authenticated_patient_client, doctor_user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = reverse("records:patient-record-bulk-create")
+        authenticated_patient_client.post(url, self._payload([doctor_user], 1), format="json")
+        counts = []
+        for size in (1, 50):
+            with CaptureQueriesContext(connection) as context:
+                response = authenticated_patient_client.post(url, self._payload([doctor_user], size), format="json")
+            assert response.status_code == status.HTTP_201_CREATED
+            counts.append(len(context.captured_queries))
+        assert counts[0] == counts[1]
+
+    def test_invalid_doctor_rejects_whole_batch(self, authenticated_patient_client, doctor_user, patient_user):
+        payload = self._payload([doctor_user], 2)
+        payload["records"][1]["doctor"] = str(patient_user.id)
+
+        response = authenticated_patient_client.post(
+            reverse("records:patient-record-bulk-create"), payload, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["records"][0] == {}
+        assert "doctor" in response.data["records"][1]
+        assert not HealthRecord.objects.exists()
+
+    def test_empty_batch(self, authenticated_patient_client):
+        response = authenticated_patient_client.post(
+            reverse("records:patient-record-bulk-create"), {"records": []}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestHealthRecordSearch:
+    def test_patient_searches_descriptions_and_notes(self, authenticated_patient_client, doctor_user):
+        patient = authenticated_patient_client.user
+        described = HealthRecord.objects.create(
+            patient=patient, doctor=doctor_user, description="Chest x-ray for persistent cough"
+        )
+        annotated = HealthRecord.objects.create(patient=patient, doctor=doctor_user)
+        DoctorAnnotation.objects.create(record=annotated, note="Cough improving")
+        HealthRecord.objects.create(patient=patient, doctor=doctor_user, description="Blood test")
+
+        response = authenticated_patient_client.get(reverse("records:patient-record-list"), {"q": "cough"})
+        assert response.status_code == status.HTTP_200_OK
+        assert {record["id"] for record in response.data} == {str(described.id), str(annotated.id)}
+
+    def test_doctor_search(self, authenticated_doctor_client, patient_user):
+        record = HealthRecord.objects.create(
+            patient=patient_user, doctor=authenticated_doctor_client.user, description="Migraine follow-up"
+        )
+        HealthRecord.objects.create(patient=patient_user, doctor=authenticated_doctor_client.user)
+
+        response = authenticated_doctor_client.get(reverse("records:doctor-record-list"), {"q": "migraine"})
+        assert [item["id"] for item in response.data] == [str(record.id)]
+
+
 @pytest.mark.django_db
 class TestPatientHealthRecordRetrieveUpdateView:
     def test_retrieve_health_record(self, authenticated_patient_client, health_record):
@@ -168,6 +303,58 @@ class TestHealthRecordFileDeleteView:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestHealthRecordFileDownloadView:
+    def _file(self, record):
+        return HealthRecordFile.objects.create(
+            record=record,
+            file=SimpleUploadedFile("report.pdf", b"%PDF report", content_type="application/pdf"),
+        )
+
+    def test_patient_downloads_file(self, authenticated_patient_client, health_record):
+        file = self._file(health_record)
+        url = reverse("records:health-record-file-download", kwargs={"pk": file.id})
+        response = authenticated_patient_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert b"".join(response.streaming_content) == b"%PDF report"
+        assert "attachment" in response["Content-Disposition"]
+
+    def test_assigned_doctor_gets_accel_redirect(
+        self, authenticated_doctor_client, health_record, settings, django_assert_num_queries
+    ):
+        settings.FILE_DOWNLOAD_ACCEL_REDIRECT = True
+        file = self._file(health_record)
+        url = reverse("records:health-record-file-download", kwargs={"pk": file.id})
+        authenticated_doctor_client.get(url)
+
+        with django_assert_num_queries(1):
+            response = authenticated_doctor_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["X-Accel-Redirect"] == f"/media/{file.file.name}"
+        assert response["Content-Type"] == "application/pdf"
+        assert not response.content
+
+    def test_other_user_cannot_download(self, authenticated_patient_client, patient_user, doctor_user):
+        other_patient = patient_user.__class__.objects.create_user(
+            email="other5@patient.com",
+            password="pass123",
+            role="patient",
+        )
+        record = HealthRecord.objects.create(patient=other_patient, doctor=doctor_user)
+        file = self._file(record)
+        url = reverse("records:health-record-file-download", kwargs={"pk": file.id})
+        response = authenticated_patient_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_record_links_to_download(self, authenticated_patient_client, health_record):
+        file = self._file(health_record)
+        url = reverse("records:patient-record-detail", kwargs={"pk": health_record.id})
+        response = authenticated_patient_client.get(url)
+        assert response.data["files"][0]["file"].endswith(
+            reverse("records:health-record-file-download", kwargs={"pk": file.id})
+        )
+
+
 @pytest.mark.django_db
 class TestDoctorHealthRecordListView:
     def test_list_assigned_records(self, authenticated_doctor_client, patient_user):
@@ -208,6 +395,19 @@ class TestDoctorHealthRecordListView:
         assert len(response.data) == 1
         assert response.data[0]["id"] == str(own_record.id)
 
+    def test_list_query_count_is_constant(
+        self, authenticated_doctor_client, patient_user, doctor_profile, assert_constant_queries
+    ):
+        def populate(size):
+            for _ in range(size):
+                record = HealthRecord.objects.create(
+                    patient=patient_user, doctor=authenticated_doctor_client.user
+                )
+                DoctorAnnotation.objects.create(record=record, note="Reviewed")
+
+        url = reverse("records:doctor-record-list")
+        assert_constant_queries(lambda: authenticated_doctor_client.get(url), populate)
+
     def test_patient_cannot_access(self, authenticated_patient_client):
         url = reverse("records:doctor-record-list")
         response = authenticated_patient_client.get(url)
@@ -331,4 +531,77 @@ class TestDoctorAnnotationUpdateView:
         url = reverse("records:doctor-annotation-update", kwargs={"pk": annotation.id})
         data = {"note": "Should not work"}
         response = authenticated_doctor_client.patch(url, data, format="json")
-        assert response.status_code == status.HTTP_404_NOT_FOUND
\ No newline at end of file
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_matching_etag_returns_not_modified(self, authenticated_patient_client, health_record):
+        url = reverse("records:patient-record-list")
+        response = authenticated_patient_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Last-Modified"]
+
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not response.content
+
+    def test_wildcard_matches_only_existing_records(
+        self, authenticated_patient_client, health_record
+    ):
+        url = reverse("records:patient-record-detail", kwargs={"pk": health_record.id})
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH="*")
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        health_record.delete()
+        response = authenticated_patient_client.get(url, HTTP_IF_NONE_MATCH="*")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cached_page_is_served_without_queries(
+        self, authenticated_patient_client, health_record, django_assert_num_queries
+    ):
+        url = reverse("records:patient-record-list")
+        first = authenticated_patient_client.get(url)
+
+        with django_assert_num_queries(0):
+            second = authenticated_patient_client.get(url)
+        assert second.data == first.data
+        assert second["ETag"] == first["ETag"]
+
+    def test_annotation_changes_etag(self, authenticated_doctor_client, health_record):
+        url = reverse("records:doctor-record-detail", kwargs={"pk": health_record.id})
+        etag = authenticated_doctor_client.get(url)["ETag"]
+
+        DoctorAnnotation.objects.create(record=health_record, note="Follow up")
+
+        response = authenticated_doctor_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["annotations"][0]["note"] == "Follow up"
+
+    def test_etag_differs_per_page(self, authenticated_patient_client, health_record):
+        url = reverse("records:patient-record-list")
+        full = authenticated_patient_client.get(url)
+        paged = authenticated_patient_client.get(url, {"cursor": ""})
+        assert full["ETag"] != paged["ETag"]
+
+    def test_reassignment_retires_old_doctors_pages(self, patient_user, doctor_user, health_record):
+        other_doctor = patient_user.__class__.objects.create_user(
+            email="other@doctor.com", password="pass123", role="doctor"
+        )
+        patient = APIClient()
+        patient.force_authenticate(patient_user)
+        doctor = APIClient()
+        doctor.force_authenticate(doctor_user)
+        url = reverse("records:doctor-record-list")
+        etag = doctor.get(url)["ETag"]
+
+        response = patient.patch(
+            reverse("records:patient-record-detail", kwargs={"pk": health_record.id}),
+            {"doctor": str(other_doctor.id)},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = doctor.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.data
+        assert not doctor.get(url).data
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from functools import partial
+
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from .models import FileUpload, FileUploadPart, HealthRecordFile
+
+CHUNK_SIZE = 64 * 1024
+
+# An upload still marked completing after this long is taken to have been
+# abandoned by a crashed worker, and can be completed again.
+COMPLETING_TIMEOUT = timedelta(hours=1)
+
+
+class UploadInProgress(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The upload is already being completed."
+    default_code = "upload_in_progress"
+
+
+class AssembledFile(File):
+    """
+    A finished upload on local disk.
+
+    ``FileSystemStorage`` moves files that expose ``temporary_file_path``
+    into place instead of copying them. ``sha256``, when known, spares the
+    blob storage reading the file again to name it.
+    """
+
+    def __init__(self, file, sha256=None):
+        super().__init__(file)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def write_part(upload, number, stream):
+    """
+    Stream part ``number`` of ``upload`` from ``stream`` to disk.
+
+    The body is copied in ``CHUNK_SIZE`` pieces, so memory use does not
+    depend on the part size, and moved into place only once it has the
+    expected length. Sending a part again, even in parallel, replaces it.
+    """
+    if not 1 <= number <= upload.part_count:
+        raise ValidationError({"number": f"Expected 1 to {upload.part_count}."})
+    expected = upload.expected_part_size(number)
+
+    os.makedirs(upload.parts_dir, exist_ok=True)
+    temporary_path = f"{upload.part_path(number)}.{uuid.uuid4().hex}.tmp"
+    written = 0
+    try:
+        with open(temporary_path, "wb") as destination:
+            while stream is not None and written <= expected:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                destination.write(chunk)
+                written += len(chunk)
+        if written != expected:
+            raise ValidationError(
+                {"size": f"Part {number} must be {expected} bytes, got {written}."}
+            )
+        os.replace(temporary_path, upload.part_path(number))
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    [part] = FileUploadPart.objects.bulk_create(
+        [FileUploadPart(upload=upload, number=number, size=written)],
+        update_conflicts=True,
+        unique_fields=["upload", "number"],
+        update_fields=["size", "updated_at"],
+    )
+    return part
+
+
+def complete(upload):
+    """
+    Join the parts of ``upload`` into a ``HealthRecordFile``.
+
+    The upload is only locked to mark it completing. The parts are joined
+    and hashed outside any transaction, and the file is stored in a short
+    one at the end. Completing an upload again returns the file it
+    produced; completing it while that is under way is a conflict.
+    """
+    with transaction.atomic():
+        upload = FileUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.completed_at is not None:
+            return upload.file
+        if (
+            upload.completing_at is not None
+            and upload.completing_at > timezone.now() - COMPLETING_TIMEOUT
+        ):
+            raise UploadInProgress()
+
+        received = set(upload.parts.values_list("number", flat=True))
+        missing = sorted(set(range(1, upload.part_count + 1)) - received)
+        if missing:
+            raise ValidationError({"parts": f"Missing parts: {missing}."})
+
+        upload.completing_at = marked = timezone.now()
+        upload.save(update_fields=["completing_at", "updated_at"])
+
+    try:
+        assembled_path, digest = assemble(upload)
+        with transaction.atomic():
+            # The upload may have been deleted, or taken over after
+            # ``COMPLETING_TIMEOUT``, in the meantime.
+            if not FileUpload.objects.select_for_update().filter(
+                pk=upload.pk, completing_at=marked
+            ):
+                raise NotFound()
+            record_file = HealthRecordFile(
+                record=upload.record, filename=upload.filename
+            )
+            with open(assembled_path, "rb") as assembled:
+                record_file.file.save(
+                    upload.filename, AssembledFile(assembled, digest), save=False
+                )
+            record_file.save()
+
+            upload.file = record_file
+            upload.completed_at = timezone.now()
+            upload.completing_at = None
+            upload.save(
+                update_fields=["file", "completed_at", "completing_at", "updated_at"]
+            )
+            transaction.on_commit(partial(discard_parts, upload.parts_dir))
+    except BaseException:
+        FileUpload.objects.filter(pk=upload.pk, completing_at=marked).update(
+            completing_at=None
+        )
+        raise
+    return record_file
+
+
+def assemble(upload):
+    """
+    Join the parts of ``upload`` into one file next to them. Returns its
+    path and the SHA-256 of its content.
+    """
+    assembled_path = os.path.join(upload.parts_dir, "assembled")
+    digest = hashlib.sha256()
+    with open(assembled_path, "wb") as destination:
+        for number in range(1, upload.part_count + 1):
+            with open(upload.part_path(number), "rb") as part:
+                while chunk := part.read(CHUNK_SIZE * 16):
+                    digest.update(chunk)
+                    destination.write(chunk)
+    return assembled_path, digest.hexdigest()
+
+
+def discard_parts(parts_dir):
+    """
+    Remove the parts of an upload from disk.
+    """
+    shutil.rmtree(parts_dir, ignore_errors=True)
@@ -1,5 +1,7 @@
 from django.urls import path
 
+from apps.core.asyncviews import variant
+
 from . import views
 
 app_name = "records"
@@ -7,12 +9,48 @@ app_name = "records"
 urlpatterns = [
     path(
         "patient/",
-        views.PatientHealthRecordListCreateView.as_view(),
+        variant(
+            views.PatientHealthRecordListCreateView,
+            views.AsyncPatientHealthRecordListCreateView,
+        ).as_view(),
         name="patient-record-list",
     ),
+    path(
+        "patient/bulk/",
+        views.PatientHealthRecordBulkCreateView.as_view(),
+        name="patient-record-bulk-create",
+    ),
+    path(
+        "patient/export/",
+        views.PatientHealthRecordExportView.as_view(),
+        name="patient-record-export",
+    ),
+    path(
+        "patient/exports/",
+        views.RecordExportListCreateView.as_view(),
+        name="record-export-list",
+    ),
+    path(
+        "patient/exports/<uuid:pk>/",
+        views.RecordExportDetailView.as_view(),
+        name="record-export-detail",
+    ),
+    path(
+        "patient/exports/<uuid:pk>/download/",
+        views.RecordExportDownloadView.as_view(),
+        name="record-export-download",
+    ),
+    path(
+        "patient/sync/",
+        views.PatientHealthRecordSyncView.as_view(),
+        name="patient-record-sync",
+    ),
     path(
         "patient/<uuid:pk>/",
-        views.PatientHealthRecordRetrieveUpdateView.as_view(),
+        variant(
+            views.PatientHealthRecordRetrieveUpdateView,
+            views.AsyncPatientHealthRecordRetrieveUpdateView,
+        ).as_view(),
         name="patient-record-detail",
     ),
     path(
@@ -20,14 +58,65 @@ urlpatterns = [
         views.HealthRecordFileDeleteView.as_view(),
         name="health-record-file-delete",
     ),
+    path(
+        "files/<uuid:pk>/download/",
+        views.HealthRecordFileDownloadView.as_view(),
+        name="health-record-file-download",
+    ),
+    path(
+        "files/<uuid:pk>/thumbnail/",
+        views.HealthRecordFilePreviewView.as_view(file_field="thumbnail"),
+        name="health-record-file-thumbnail",
+    ),
+    path(
+        "files/<uuid:pk>/preview/",
+        views.HealthRecordFilePreviewView.as_view(file_field="preview"),
+        name="health-record-file-preview",
+    ),
+    path(
+        "uploads/",
+        views.FileUploadCreateView.as_view(),
+        name="file-upload-create",
+    ),
+    path(
+        "uploads/<uuid:pk>/",
+        views.FileUploadDetailView.as_view(),
+        name="file-upload-detail",
+    ),
+    path(
+        "uploads/<uuid:pk>/parts/<int:number>/",
+        views.FileUploadPartView.as_view(),
+        name="file-upload-part",
+    ),
+    path(
+        "uploads/<uuid:pk>/complete/",
+        views.FileUploadCompleteView.as_view(),
+        name="file-upload-complete",
+    ),
+    path(
+        "doctor/dashboard/",
+        views.DoctorDashboardView.as_view(),
+        name="doctor-dashboard",
+    ),
     path(
         "doctor/",
-        views.DoctorHealthRecordListView.as_view(),
+        variant(
+            views.DoctorHealthRecordListView,
+            views.AsyncDoctorHealthRecordListView,
+        ).as_view(),
         name="doctor-record-list",
     ),
+    path(
+        "doctor/sync/",
+        views.DoctorHealthRecordSyncView.as_view(),
+        name="doctor-record-sync",
+    ),
     path(
         "doctor/<uuid:pk>/",
-        views.DoctorHealthRecordDetailView.as_view(),
+        variant(
+            views.DoctorHealthRecordDetailView,
+            views.AsyncDoctorHealthRecordDetailView,
+        ).as_view(),
         name="doctor-record-detail",
     ),
     path(
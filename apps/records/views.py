@@ -1,13 +1,40 @@
-from drf_spectacular.utils import extend_schema
-from rest_framework import generics, permissions
+import mimetypes
+import os
+from functools import partial
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
 from apps.accounts import permissions as account_permissions
+from apps.core import asyncviews, prefetch
+from apps.core.conditional import AsyncConditionalGetMixin, ConditionalGetMixin
+from apps.core.mixins import QueryPlanMixin
+from apps.core.pagination import KeysetPagination
+from apps.notifications.models import UnreadCounter
 
-from . import models, serializers
+from . import export, filters, models, search, serializers, sync, tasks, uploads
+
+SYNC_TOKEN_PARAMETER = OpenApiParameter(
+    "token",
+    str,
+    description="Token from the previous sync. Omit it to fetch every record.",
+)
 
 
 @extend_schema(tags=["Health Records"])
-class PatientHealthRecordListCreateView(generics.ListCreateAPIView):
+class PatientHealthRecordListCreateView(
+    ConditionalGetMixin, QueryPlanMixin, generics.ListCreateAPIView
+):
     """
     List and create health records for authenticated patients.
 
@@ -16,9 +43,17 @@ class PatientHealthRecordListCreateView(generics.ListCreateAPIView):
 
     POST: Creates a new health record for the patient. Requires selecting
     a doctor and can optionally include file uploads.
+
+    Send ``cursor`` to page through records by keyset instead of page number.
+    Send ``q`` to search descriptions and annotation notes, and see
+    ``RecordFilter`` for the other filters.
     """
 
+    counterpart_field = "doctor"
+    filter_backends = [filters.RecordFilter, search.RecordSearchFilter]
+    pagination_class = KeysetPagination
     permission_classes = [account_permissions.IsPatient]
+    version_scope = "records"
 
     def get_serializer_class(self):
         """
@@ -30,17 +65,46 @@ class PatientHealthRecordListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """
-        Return health records for the authenticated patient with optimized queries.
+        Return health records for the authenticated patient.
         """
-        return (
-            models.HealthRecord.objects.filter(patient=self.request.user)
-            .select_related("patient", "doctor")
-            .prefetch_related("files")
+        return models.HealthRecord.objects.filter(patient=self.request.user)
+
+
+@extend_schema(tags=["Health Records"])
+class PatientHealthRecordBulkCreateView(generics.CreateAPIView):
+    """
+    Import many health records for the authenticated patient at once.
+
+    POST: Creates every record in ``records`` or, if any is invalid, none.
+    Each doctor gets one notification for all of their new records.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.HealthRecordBulkCreateSerializer
+
+    @extend_schema(responses=serializers.HealthRecordSerializer(many=True))
+    def post(self, request, *args, **kwargs):
+        """
+        Create the records and return them.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        records = serializer.save()
+        queryset = prefetch.plan_for(serializers.HealthRecordSerializer).apply(
+            models.HealthRecord.objects.filter(pk__in=[record.pk for record in records])
+        )
+        return Response(
+            serializers.HealthRecordSerializer(
+                queryset, many=True, context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_201_CREATED,
         )
 
 
 @extend_schema(tags=["Health Records"])
-class PatientHealthRecordRetrieveUpdateView(generics.RetrieveUpdateAPIView):
+class PatientHealthRecordRetrieveUpdateView(
+    ConditionalGetMixin, QueryPlanMixin, generics.RetrieveUpdateAPIView
+):
     """
     Retrieve or update a specific health record for authenticated patients.
 
@@ -51,6 +115,7 @@ class PatientHealthRecordRetrieveUpdateView(generics.RetrieveUpdateAPIView):
     """
 
     permission_classes = [account_permissions.IsPatient]
+    version_scope = "records"
 
     def get_serializer_class(self):
         """
@@ -62,13 +127,9 @@ class PatientHealthRecordRetrieveUpdateView(generics.RetrieveUpdateAPIView):
 
     def get_queryset(self):
         """
-        Return health records for the authenticated patient with optimized queries.
+        Return health records for the authenticated patient.
         """
-        return (
-            models.HealthRecord.objects.filter(patient=self.request.user)
-            .select_related("patient", "doctor")
-            .prefetch_related("files")
-        )
+        return models.HealthRecord.objects.filter(patient=self.request.user)
 
 
 @extend_schema(tags=["Health Records"])
@@ -90,30 +151,352 @@ class HealthRecordFileDeleteView(generics.DestroyAPIView):
 
 
 @extend_schema(tags=["Health Records"])
-class DoctorHealthRecordListView(generics.ListAPIView):
+class HealthRecordFileDownloadView(generics.GenericAPIView):
+    """
+    Download a file from a health record.
+
+    Only the patient who owns the record and the doctor assigned to it can
+    download its files. With ``FILE_DOWNLOAD_ACCEL_REDIRECT`` enabled the
+    bytes are sent by nginx through ``X-Accel-Redirect``, which also
+    answers range requests; otherwise Django streams the file itself.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    file_field = "file"
+    as_attachment = True
+
+    def get_queryset(self):
+        """
+        Return files of health records the authenticated user takes part in.
+        """
+        user = self.request.user
+        return models.HealthRecordFile.objects.filter(
+            Q(record__patient=user) | Q(record__doctor=user)
+        ).only("id", "filename", self.file_field)
+
+    def get_filename(self, record_file):
+        """
+        Return the name the file is sent under.
+        """
+        return record_file.filename or os.path.basename(record_file.file.name)
+
+    @extend_schema(responses={(200, "application/octet-stream"): OpenApiTypes.BINARY})
+    def get(self, request, *args, **kwargs):
+        """
+        Send the file.
+        """
+        record_file = self.get_object()
+        field_file = getattr(record_file, self.file_field)
+        if not field_file:
+            raise Http404
+        filename = self.get_filename(record_file)
+        if not settings.FILE_DOWNLOAD_ACCEL_REDIRECT:
+            return FileResponse(
+                field_file.open("rb"),
+                as_attachment=self.as_attachment,
+                filename=filename,
+            )
+
+        content_type, encoding = mimetypes.guess_type(filename)
+        response = HttpResponse(content_type=content_type or "application/octet-stream")
+        if encoding:
+            response["Content-Encoding"] = encoding
+        response["Content-Disposition"] = content_disposition_header(
+            self.as_attachment, filename
+        )
+        response["X-Accel-Redirect"] = quote(f"{settings.MEDIA_URL}{field_file.name}")
+        return response
+
+
+@extend_schema(tags=["Health Records"])
+class HealthRecordFilePreviewView(HealthRecordFileDownloadView):
+    """
+    View a downscaled image of a health record file.
+
+    ``thumbnail`` and ``preview`` are JPEG renders of images and of the
+    first page of PDFs, generated in the background after upload. Returns
+    404 until they exist or for files that cannot be rendered.
+    """
+
+    as_attachment = False
+
+    def get_filename(self, record_file):
+        """
+        Name the image after the original file and the variant.
+        """
+        stem = os.path.splitext(super().get_filename(record_file))[0]
+        return f"{stem}-{self.file_field}.jpg"
+
+    @extend_schema(responses={(200, "image/jpeg"): OpenApiTypes.BINARY})
+    def get(self, request, *args, **kwargs):
+        """
+        Send the image inline.
+        """
+        return super().get(request, *args, **kwargs)
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", export.ndjson),
+    "csv": ("text/csv", export.csv_lines),
+}
+
+
+@extend_schema(tags=["Health Records"])
+class PatientHealthRecordExportView(generics.GenericAPIView):
+    """
+    Download the authenticated patient's complete health history.
+
+    Records are streamed with their annotations and file metadata as
+    NDJSON (one record per line, the default) or, with
+    ``export_format=csv``, as CSV. The response is generated while it is
+    sent, in constant memory. Use ``RecordExport`` for an archive that
+    includes the files themselves.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "export_format",
+                OpenApiTypes.STR,
+                enum=list(EXPORT_FORMATS),
+                description="ndjson (default) or csv.",
+            )
+        ],
+        responses={
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            (200, "text/csv"): OpenApiTypes.STR,
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        """
+        Stream the export.
+        """
+        export_format = request.query_params.get("export_format", "ndjson")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {"export_format": f"Expected one of {sorted(EXPORT_FORMATS)}."}
+            )
+        content_type, render = EXPORT_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            render(export.records(request.user)), content_type=content_type
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            True, f"health-records.{export_format}"
+        )
+        # Pass chunks straight through instead of buffering them in nginx.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+@extend_schema(tags=["Health Records"])
+class RecordExportListCreateView(generics.ListCreateAPIView):
+    """
+    List and start background exports for authenticated patients.
+
+    POST: Starts building a zip of the patient's records and files. Poll
+    the export until ``status`` is ``ready`` and download ``archive``.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.RecordExportSerializer
+
+    def get_queryset(self):
+        """
+        Return the authenticated patient's exports.
+        """
+        return models.RecordExport.objects.filter(patient=self.request.user)
+
+    @extend_schema(request=None)
+    def post(self, request, *args, **kwargs):
+        """
+        Start an export.
+        """
+        return super().post(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        """
+        Queue the archive to be built once the export is committed.
+        """
+        record_export = serializer.save(patient=self.request.user)
+        transaction.on_commit(
+            partial(tasks.build_record_export.delay, str(record_export.pk))
+        )
+
+
+@extend_schema(tags=["Health Records"])
+class RecordExportDetailView(generics.RetrieveDestroyAPIView):
+    """
+    Check on or delete a background export.
+
+    Deleting an export also deletes its archive.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.RecordExportSerializer
+
+    def get_queryset(self):
+        """
+        Return the authenticated patient's exports.
+        """
+        return models.RecordExport.objects.filter(patient=self.request.user)
+
+
+@extend_schema(tags=["Health Records"])
+class RecordExportDownloadView(HealthRecordFileDownloadView):
+    """
+    Download the archive of a finished export.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    file_field = "archive"
+
+    def get_queryset(self):
+        """
+        Return the authenticated patient's finished exports.
+        """
+        return models.RecordExport.objects.filter(
+            patient=self.request.user, status=models.ExportStatus.READY
+        ).only("id", "created_at", "archive")
+
+    def get_filename(self, record_export):
+        """
+        Name the archive after the day it was made.
+        """
+        return f"health-records-{record_export.created_at:%Y-%m-%d}.zip"
+
+
+@extend_schema(tags=["Health Records"])
+class FileUploadCreateView(generics.CreateAPIView):
+    """
+    Start a chunked upload of a file to a health record.
+
+    Returns the part size and count to use. Parts are then sent with PUT
+    to the part endpoint, in any order and in parallel, and the upload is
+    finished through the complete endpoint.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.FileUploadSerializer
+
+
+@extend_schema(tags=["Health Records"])
+class FileUploadDetailView(generics.RetrieveDestroyAPIView):
+    """
+    Inspect or abandon a chunked upload.
+
+    GET: Returns the upload with the numbers of the parts received so far,
+    so an interrupted upload can resume with the missing ones.
+
+    DELETE: Abandons the upload and discards its parts.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.FileUploadSerializer
+
+    def get_queryset(self):
+        """
+        Return uploads to the authenticated patient's health records.
+        """
+        return models.FileUpload.objects.filter(
+            record__patient=self.request.user
+        ).prefetch_related("parts")
+
+
+@extend_schema(tags=["Health Records"])
+class FileUploadPartView(generics.GenericAPIView):
+    """
+    Upload one part of a chunked upload.
+
+    The request body is the raw bytes of the part and is streamed to disk.
+    Every part but the last must be exactly ``part_size`` bytes. Sending a
+    part again replaces it.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.FileUploadPartSerializer
+
+    def get_queryset(self):
+        """
+        Return the authenticated patient's unfinished uploads.
+        """
+        return models.FileUpload.objects.filter(
+            record__patient=self.request.user, completed_at__isnull=True
+        )
+
+    @extend_schema(request={"application/octet-stream": OpenApiTypes.BINARY})
+    def put(self, request, *args, **kwargs):
+        """
+        Store the part from the request body.
+        """
+        part = uploads.write_part(self.get_object(), kwargs["number"], request.stream)
+        return Response(self.get_serializer(part).data)
+
+
+@extend_schema(tags=["Health Records"])
+class FileUploadCompleteView(generics.GenericAPIView):
+    """
+    Finish a chunked upload.
+
+    Joins the parts into a file on the health record and returns it. Fails
+    while parts are missing, and with 409 while another request is
+    completing the upload; completing again returns the same file.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    serializer_class = serializers.HealthRecordFileSerializer
+
+    def get_queryset(self):
+        """
+        Return uploads to the authenticated patient's health records.
+        """
+        return models.FileUpload.objects.filter(record__patient=self.request.user)
+
+    @extend_schema(request=None)
+    def post(self, request, *args, **kwargs):
+        """
+        Assemble the parts into a health record file.
+        """
+        record_file = uploads.complete(self.get_object())
+        return Response(
+            self.get_serializer(record_file).data, status=status.HTTP_201_CREATED
+        )
+
+
+@extend_schema(tags=["Health Records"])
+class DoctorHealthRecordListView(
+    ConditionalGetMixin, QueryPlanMixin, generics.ListAPIView
+):
     """
     List health records assigned to the authenticated doctor.
 
     Returns all health records where the authenticated doctor is assigned.
     Includes patient information, files, and any annotations made.
+
+    Send ``cursor`` to page through records by keyset instead of page number.
+    Send ``q`` to search descriptions and annotation notes, and see
+    ``RecordFilter`` for the other filters.
     """
 
+    counterpart_field = "patient"
+    filter_backends = [filters.RecordFilter, search.RecordSearchFilter]
+    pagination_class = KeysetPagination
     permission_classes = [account_permissions.IsDoctor]
     serializer_class = serializers.HealthRecordSerializer
+    version_scope = "records"
 
     def get_queryset(self):
         """
         Return health records assigned to the authenticated doctor.
         """
-        return (
-            models.HealthRecord.objects.filter(doctor=self.request.user)
-            .select_related("patient", "doctor")
-            .prefetch_related("files")
-        )
+        return models.HealthRecord.objects.filter(doctor=self.request.user)
 
 
 @extend_schema(tags=["Health Records"])
-class DoctorHealthRecordDetailView(generics.RetrieveAPIView):
+class DoctorHealthRecordDetailView(
+    ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView
+):
     """
     View details of a specific health record assigned to the doctor.
 
@@ -123,16 +506,50 @@ class DoctorHealthRecordDetailView(generics.RetrieveAPIView):
 
     permission_classes = [account_permissions.IsDoctor]
     serializer_class = serializers.HealthRecordSerializer
+    version_scope = "records"
 
     def get_queryset(self):
         """
         Return health records assigned to the authenticated doctor.
         """
-        return (
-            models.HealthRecord.objects.filter(doctor=self.request.user)
-            .select_related("patient", "doctor")
-            .prefetch_related("files")
+        return models.HealthRecord.objects.filter(doctor=self.request.user)
+
+
+@extend_schema(tags=["Health Records"])
+class DoctorDashboardView(generics.RetrieveAPIView):
+    """
+    Counts for the authenticated doctor's home screen.
+
+    Returns assigned records in total and by type, how many have no
+    annotation yet, and unread notifications. Served from counter rows
+    kept up to date on every write, so this is a single lookup however
+    many records the doctor has.
+    """
+
+    permission_classes = [account_permissions.IsDoctor]
+    serializer_class = serializers.DoctorDashboardSerializer
+
+    def get_object(self):
+        """
+        Return the doctor's dashboard with the unread count joined in.
+        """
+        user = self.request.user
+        unread = UnreadCounter.objects.filter(user=OuterRef("doctor")).values("unread")
+        dashboard = (
+            models.DoctorDashboard.objects.filter(doctor=user)
+            .annotate(unread_notifications=Coalesce(Subquery(unread), 0))
+            .first()
         )
+        if dashboard is None:
+            # Nothing has been assigned to the doctor yet.
+            dashboard = models.DoctorDashboard(doctor=user)
+            dashboard.unread_notifications = (
+                UnreadCounter.objects.filter(user=user)
+                .values_list("unread", flat=True)
+                .first()
+                or 0
+            )
+        return dashboard
 
 
 @extend_schema(tags=["Health Records"])
@@ -165,3 +582,122 @@ class DoctorAnnotationUpdateView(generics.UpdateAPIView):
         Return annotations made by the authenticated doctor.
         """
         return models.DoctorAnnotation.objects.filter(record__doctor=self.request.user)
+
+
+class HealthRecordSyncView(generics.GenericAPIView):
+    """
+    Base view returning the changes to a user's health records.
+
+    Subclasses set ``owner_field`` to the record field holding the user.
+    """
+
+    serializer_class = serializers.HealthRecordSyncSerializer
+    owner_field = None
+
+    def get_queryset(self):
+        """
+        Return the health records of the authenticated user.
+        """
+        return models.HealthRecord.objects.filter(
+            **{self.owner_field: self.request.user}
+        )
+
+    def get_tombstones(self):
+        """
+        Return the deletion markers of the authenticated user's records.
+        """
+        return models.Tombstone.objects.filter(
+            **{f"{self.owner_field}_id": self.request.user.pk}
+        )
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return records changed and objects deleted since ``token``.
+        """
+        changes = sync.changes(
+            self.get_queryset(),
+            self.get_tombstones(),
+            serializers.HealthRecordSerializer,
+            token=request.query_params.get("token"),
+        )
+        return Response(self.get_serializer(changes).data)
+
+
+@extend_schema(tags=["Health Records"], parameters=[SYNC_TOKEN_PARAMETER])
+class PatientHealthRecordSyncView(HealthRecordSyncView):
+    """
+    Sync the authenticated patient's health records.
+
+    Returns records created or updated since ``token`` with their files and
+    annotations, plus the ids of records, files and annotations deleted
+    since then. Pass the returned ``token`` on the next call, and call again
+    at once while ``has_more`` is set.
+    """
+
+    permission_classes = [account_permissions.IsPatient]
+    owner_field = "patient"
+
+
+@extend_schema(tags=["Health Records"], parameters=[SYNC_TOKEN_PARAMETER])
+class DoctorHealthRecordSyncView(HealthRecordSyncView):
+    """
+    Sync the health records assigned to the authenticated doctor.
+
+    Returns records created or updated since ``token`` with their files and
+    annotations, plus the ids of records, files and annotations deleted
+    since then. Pass the returned ``token`` on the next call, and call again
+    at once while ``has_more`` is set.
+    """
+
+    permission_classes = [account_permissions.IsDoctor]
+    owner_field = "doctor"
+
+
+class AsyncPatientHealthRecordListCreateView(
+    AsyncConditionalGetMixin,
+    asyncviews.AsyncListModelMixin,
+    PatientHealthRecordListCreateView,
+):
+    """
+    ``PatientHealthRecordListCreateView`` reading through the async ORM.
+
+    Served instead of it when ``ASYNC_VIEWS`` is set; creating a record
+    still runs synchronously, in a thread.
+    """
+
+
+class AsyncPatientHealthRecordRetrieveUpdateView(
+    AsyncConditionalGetMixin,
+    asyncviews.AsyncRetrieveModelMixin,
+    PatientHealthRecordRetrieveUpdateView,
+):
+    """
+    ``PatientHealthRecordRetrieveUpdateView`` reading through the async ORM.
+
+    Served instead of it when ``ASYNC_VIEWS`` is set; updates still run
+    synchronously, in a thread.
+    """
+
+
+class AsyncDoctorHealthRecordListView(
+    AsyncConditionalGetMixin,
+    asyncviews.AsyncListModelMixin,
+    DoctorHealthRecordListView,
+):
+    """
+    ``DoctorHealthRecordListView`` reading through the async ORM.
+
+    Served instead of it when ``ASYNC_VIEWS`` is set.
+    """
+
+
+class AsyncDoctorHealthRecordDetailView(
+    AsyncConditionalGetMixin,
+    asyncviews.AsyncRetrieveModelMixin,
+    DoctorHealthRecordDetailView,
+):
+    """
+    ``DoctorHealthRecordDetailView`` reading through the async ORM.
+
+    Served instead of it when ``ASYNC_VIEWS`` is set.
+    """
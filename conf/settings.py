@@ -72,6 +72,11 @@ WSGI_APPLICATION = "conf.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are either kept open per thread for DB_CONN_MAX_AGE seconds or,
+# with DB_POOL enabled, borrowed from a psycopg pool per worker process.
+# Django does not allow both at once.
+DB_POOL = env.bool("DB_POOL", default=False)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -80,8 +85,53 @@ DATABASES = {
         "PASSWORD": env("DB_PASSWORD", default="postgres"),
         "HOST": env("DB_HOST", default="localhost"),
         "PORT": env("DB_PORT", default=5432),
+        "CONN_MAX_AGE": 0 if DB_POOL else env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+        "OPTIONS": {},
+    }
+}
+
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+        "max_size": env.int("DB_POOL_MAX_SIZE", default=4),
+        "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+        "max_idle": env.float("DB_POOL_MAX_IDLE", default=600.0),
+        "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600.0),
     }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Authenticated users, without their password hash, are cached under the
+# "auth" alias and invalidated by signals. Point it at a shared cache (Redis)
+# when running several workers, otherwise a change made in one process is
+# only seen by the others once AUTH_USER_CACHE_TIMEOUT expires. The timeout
+# also bounds staleness after QuerySet.update() on users, which sends no
+# signals, so keep it short.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    "auth": env.cache(
+        "AUTH_CACHE_URL", default=env("CACHE_URL", default="locmemcache://auth")
+    ),
 }
+AUTH_USER_CACHE_TIMEOUT = env.int("AUTH_USER_CACHE_TIMEOUT", default=60)
+
+# Rendered record and notification pages are cached in the default cache
+# under the owner's collection version, which writes replace. The timeout
+# only bounds staleness of data the versions do not track, such as the
+# other party's name on a record. Versions never expire, so the default
+# cache must be shared between workers too: with the per-process locmem
+# default a worker that missed a write keeps serving its old pages and ETags.
+# "manage.py check --deploy" warns about this (core.W001).
+RESPONSE_CACHE_TIMEOUT = env.int("RESPONSE_CACHE_TIMEOUT", default=300)
+
+# Serve the record and notification list/detail views through the async
+# ORM. conf/asgi.py turns this on, so uvicorn gets the async views and
+# gunicorn the sync ones. Under ASGI each request runs its queries in its
+# own thread, so use DB_POOL rather than persistent connections there.
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
 
 
 # Password validation
@@ -124,6 +174,75 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "mediafiles")
 
+# Media is only reachable through the download endpoint. Enable this
+# behind nginx, whose internal /media/ location then sends the file.
+FILE_DOWNLOAD_ACCEL_REDIRECT = env.bool("FILE_DOWNLOAD_ACCEL_REDIRECT", default=False)
+
+# Chunked uploads keep their parts outside MEDIA_ROOT so they are never
+# served; on the same filesystem, finished files are moved rather than
+# copied into place.
+FILE_UPLOAD_PARTS_DIR = env(
+    "FILE_UPLOAD_PARTS_DIR", default=os.path.join(BASE_DIR, "uploads")
+)
+FILE_UPLOAD_PART_SIZE = env.int("FILE_UPLOAD_PART_SIZE", default=8 * 1024 * 1024)
+FILE_UPLOAD_MAX_SIZE = env.int("FILE_UPLOAD_MAX_SIZE", default=5 * 1024**3)
+
+# Longest side, in pixels, of the images generated for uploaded files.
+FILE_THUMBNAIL_SIZE = env.int("FILE_THUMBNAIL_SIZE", default=256)
+FILE_PREVIEW_SIZE = env.int("FILE_PREVIEW_SIZE", default=1024)
+
+# New notifications are published on Redis pub/sub and streamed to
+# connected clients as Server-Sent Events by the ASGI app. Leave unset to
+# disable push; clients then poll the notification list.
+NOTIFICATION_PUSH_REDIS_URL = env("NOTIFICATION_PUSH_REDIS_URL", default=None)
+# Seconds between keep-alive comments on an idle notification stream.
+NOTIFICATION_STREAM_KEEPALIVE = env.int("NOTIFICATION_STREAM_KEEPALIVE", default=15)
+
+# Most notification ids accepted by one read-receipt request. Receipts are
+# applied at once unless NOTIFICATION_READ_RECEIPTS_REDIS_URL is set; they
+# are then collected in Redis and applied every
+# NOTIFICATION_READ_RECEIPTS_FLUSH_INTERVAL seconds, one UPDATE per user.
+NOTIFICATION_READ_RECEIPTS_MAX = env.int("NOTIFICATION_READ_RECEIPTS_MAX", default=500)
+NOTIFICATION_READ_RECEIPTS_REDIS_URL = env(
+    "NOTIFICATION_READ_RECEIPTS_REDIS_URL", default=None
+)
+NOTIFICATION_READ_RECEIPTS_FLUSH_INTERVAL = env.float(
+    "NOTIFICATION_READ_RECEIPTS_FLUSH_INTERVAL", default=5.0
+)
+
+# Read notifications older than NOTIFICATION_RETENTION_DAYS are pruned by
+# Celery beat every NOTIFICATION_RETENTION_INTERVAL seconds, in
+# transactions of NOTIFICATION_RETENTION_BATCH_SIZE rows so locks stay
+# short. NOTIFICATION_RETENTION_ARCHIVE moves them to the archive table
+# instead of deleting them. 0 days keeps every notification.
+NOTIFICATION_RETENTION_DAYS = env.int("NOTIFICATION_RETENTION_DAYS", default=90)
+NOTIFICATION_RETENTION_BATCH_SIZE = env.int(
+    "NOTIFICATION_RETENTION_BATCH_SIZE", default=1000
+)
+NOTIFICATION_RETENTION_ARCHIVE = env.bool(
+    "NOTIFICATION_RETENTION_ARCHIVE", default=False
+)
+NOTIFICATION_RETENTION_INTERVAL = env.float(
+    "NOTIFICATION_RETENTION_INTERVAL", default=3600.0
+)
+
+# Partitioned tables (PostgreSQL only; currently notifications) have one
+# partition per month of created_at. manage_partitions, also run daily by
+# Celery beat, creates partitions PARTITION_MONTHS_AHEAD months ahead and,
+# when PARTITION_RETAIN_MONTHS is set, detaches partitions older than that
+# many months, keeping them as standalone tables to archive. 0 months
+# keeps every partition attached.
+PARTITION_MONTHS_AHEAD = env.int("PARTITION_MONTHS_AHEAD", default=3)
+PARTITION_RETAIN_MONTHS = env.int("PARTITION_RETAIN_MONTHS", default=0)
+
+# Deletion markers for record sync are pruned daily once they are older
+# than SYNC_TOMBSTONE_RETENTION_DAYS; sync tokens older than that are
+# refused so clients sync from scratch. 0 keeps every marker.
+SYNC_TOMBSTONE_RETENTION_DAYS = env.int("SYNC_TOMBSTONE_RETENTION_DAYS", default=90)
+
+# Most records accepted by one bulk import request.
+RECORD_BULK_CREATE_MAX = env.int("RECORD_BULK_CREATE_MAX", default=500)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -135,7 +254,7 @@ AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -152,10 +271,45 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "send-pending-notification-emails": {
+        "task": "apps.notifications.tasks.send_pending_notification_emails",
+        "schedule": env.float("NOTIFICATION_EMAIL_DRAIN_INTERVAL", default=60.0),
+    },
+    "prune-read-notifications": {
+        "task": "apps.notifications.tasks.prune_read_notifications",
+        "schedule": NOTIFICATION_RETENTION_INTERVAL,
+    },
+    "prune-tombstones": {
+        "task": "apps.records.tasks.prune_tombstones",
+        "schedule": 24 * 60 * 60.0,
+    },
+    "reconcile-file-blobs": {
+        "task": "apps.records.tasks.reconcile_file_blobs",
+        "schedule": 24 * 60 * 60.0,
+    },
+    "manage-partitions": {
+        "task": "apps.core.tasks.manage_partitions",
+        "schedule": 24 * 60 * 60.0,
+    },
+}
+if NOTIFICATION_READ_RECEIPTS_REDIS_URL:
+    CELERY_BEAT_SCHEDULE["flush-notification-read-receipts"] = {
+        "task": "apps.notifications.tasks.flush_read_receipts",
+        "schedule": NOTIFICATION_READ_RECEIPTS_FLUSH_INTERVAL,
+    }
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="noreply@healthrecords.com")
 
+# Notification emails are drained in chunks over one SMTP connection. A
+# non-zero digest window (seconds) holds emails back and sends one digest
+# per recipient instead.
+NOTIFICATION_EMAIL_BATCH_SIZE = env.int("NOTIFICATION_EMAIL_BATCH_SIZE", default=200)
+NOTIFICATION_EMAIL_DIGEST_WINDOW = env.int(
+    "NOTIFICATION_EMAIL_DIGEST_WINDOW", default=0
+)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -26,4 +26,8 @@ urlpatterns = [
         "api/notifications/",
         include("apps.notifications.urls"),
     ),
+    path(
+        "api/core/",
+        include("apps.core.urls"),
+    ),
 ]
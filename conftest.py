@@ -1,7 +1,8 @@
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
-from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.tokens import VersionedRefreshToken
 
 User = get_user_model()
 
@@ -37,7 +38,7 @@ def doctor_user(db):
 
 @pytest.fixture
 def authenticated_patient_client(api_client, patient_user):
-    refresh = RefreshToken.for_user(patient_user)
+    refresh = VersionedRefreshToken.for_user(patient_user)
     api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
     api_client.user = patient_user
     return api_client
@@ -45,7 +46,7 @@ def authenticated_patient_client(api_client, patient_user):
 
 @pytest.fixture
 def authenticated_doctor_client(api_client, doctor_user):
-    refresh = RefreshToken.for_user(doctor_user)
+    refresh = VersionedRefreshToken.for_user(doctor_user)
     api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
     api_client.user = doctor_user
     return api_client
@@ -85,4 +86,29 @@ def health_record(patient_user, doctor_user):
         doctor=doctor_user,
         record_type="consultation",
         description="Test health record",
-    )
\ No newline at end of file
+    )
+
+@pytest.fixture
+def assert_constant_queries(db):
+    """
+    Assert that ``fetch`` issues the same number of queries however many
+    rows ``populate`` has added before it runs.
+
+    ``fetch`` is called once up front so per-process caches, such as the
+    authentication cache, are warm for every measured call.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def check(fetch, populate, sizes=(1, 5, 20)):
+        fetch()
+        counts = []
+        for size in sizes:
+            populate(size)
+            with CaptureQueriesContext(connection) as context:
+                fetch()
+            counts.append(len(context.captured_queries))
+        assert len(set(counts)) == 1, f"Query count grew with page size: {counts}"
+        return counts[0]
+
+    return check